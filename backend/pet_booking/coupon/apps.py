@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CouponConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "pet_booking.coupon"
+
+    def ready(self):
+        import pet_booking.coupon.signals
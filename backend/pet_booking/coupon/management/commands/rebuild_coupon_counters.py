@@ -0,0 +1,17 @@
+# third-party
+from django.core.management.base import BaseCommand
+
+# app
+from pet_booking.coupon.models import CouponStoreUsage
+from pet_booking.coupon.quota import rebuild_coupon_counters
+
+
+class Command(BaseCommand):
+    help = '由優惠券資料重算活動剩餘額度、已使用數與各店家使用數（coupon_campaigns / coupon_store_usage）'
+
+    def handle(self, *args, **options):
+        campaign = rebuild_coupon_counters()
+        self.stdout.write(
+            f'{campaign.code}: remaining={campaign.remaining}/{campaign.quota} used={campaign.used_count} '
+            f'stores={CouponStoreUsage.objects.count()}'
+        )
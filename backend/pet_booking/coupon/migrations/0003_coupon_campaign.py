@@ -0,0 +1,91 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:51
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+# 建立 migration 時的活動代碼與額度
+REGISTRATION_CAMPAIGN = 'registration'
+REGISTRATION_COUPON_QUOTA = 84
+
+
+def build_coupon_counters(apps, schema_editor):
+    # 由既有優惠券計算剩餘額度與使用數
+    Coupon = apps.get_model('coupon', 'Coupon')
+    CouponStoreUsage = apps.get_model('coupon', 'CouponStoreUsage')
+    claimed = Coupon.objects.exclude(Q(reservation_id__isnull=True) | Q(reservation_id='')).count()
+    used = Coupon.objects.filter(status='used')
+    apps.get_model('coupon', 'CouponCampaign').objects.create(
+        code=REGISTRATION_CAMPAIGN, quota=REGISTRATION_COUPON_QUOTA,
+        remaining=max(0, REGISTRATION_COUPON_QUOTA - claimed), used_count=used.count(),
+    )
+    CouponStoreUsage.objects.bulk_create(
+        CouponStoreUsage(store_id=store_id, used_count=count)
+        for store_id, count in used.exclude(store_id__isnull=True).exclude(store_id='').values_list(
+            'store_id'
+        ).annotate(count=Count('id')).order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("coupon", "0002_coupon_store_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CouponStoreUsage",
+            fields=[
+                (
+                    "store_id",
+                    models.CharField(
+                        max_length=50,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="店家ID",
+                    ),
+                ),
+                (
+                    "used_count",
+                    models.PositiveIntegerField(default=0, verbose_name="已使用數"),
+                ),
+            ],
+            options={
+                "verbose_name": "店家優惠券使用數",
+                "verbose_name_plural": "店家優惠券使用數",
+                "db_table": "coupon_store_usage",
+            },
+        ),
+        migrations.CreateModel(
+            name="CouponCampaign",
+            fields=[
+                (
+                    "code",
+                    models.CharField(
+                        max_length=50,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="活動代碼",
+                    ),
+                ),
+                ("quota", models.PositiveIntegerField(verbose_name="額度")),
+                ("remaining", models.IntegerField(verbose_name="剩餘額度")),
+                (
+                    "used_count",
+                    models.PositiveIntegerField(default=0, verbose_name="已使用數"),
+                ),
+            ],
+            options={
+                "verbose_name": "優惠券活動",
+                "verbose_name_plural": "優惠券活動",
+                "db_table": "coupon_campaigns",
+                "constraints": [
+                    models.CheckConstraint(
+                        condition=models.Q(("remaining__gte", 0)),
+                        name="coupon_campaign_remaining_gte_0",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(build_coupon_counters, migrations.RunPython.noop),
+    ]
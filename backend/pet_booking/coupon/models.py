@@ -55,3 +55,36 @@ class Coupon(models.Model):
 
     def __str__(self):
         return f"{self.coupon_number} - {self.user_id.username} ({self.get_status_display()})"
+
+
+class CouponCampaign(models.Model):
+    """優惠券活動額度：綁定預約時以條件式 UPDATE 扣除剩餘額度，並累計已使用數"""
+    code = models.CharField(max_length=50, primary_key=True, verbose_name="活動代碼")
+    quota = models.PositiveIntegerField(verbose_name="額度")
+    remaining = models.IntegerField(verbose_name="剩餘額度")
+    used_count = models.PositiveIntegerField(default=0, verbose_name="已使用數")
+
+    class Meta:
+        verbose_name = "優惠券活動"
+        verbose_name_plural = "優惠券活動"
+        db_table = 'coupon_campaigns'
+        constraints = [
+            models.CheckConstraint(condition=models.Q(remaining__gte=0), name='coupon_campaign_remaining_gte_0'),
+        ]
+
+    def __str__(self):
+        return f"{self.code} ({self.remaining}/{self.quota})"
+
+
+class CouponStoreUsage(models.Model):
+    """各店家已使用的優惠券數"""
+    store_id = models.CharField(max_length=50, primary_key=True, verbose_name="店家ID")
+    used_count = models.PositiveIntegerField(default=0, verbose_name="已使用數")
+
+    class Meta:
+        verbose_name = "店家優惠券使用數"
+        verbose_name_plural = "店家優惠券使用數"
+        db_table = 'coupon_store_usage'
+
+    def __str__(self):
+        return f"{self.store_id} - {self.used_count}"
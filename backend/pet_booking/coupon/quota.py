@@ -0,0 +1,134 @@
+# origin
+from typing import Optional
+
+# third-party
+from django.apps import apps as global_apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+
+REGISTRATION_CAMPAIGN = 'registration'
+REGISTRATION_COUPON_QUOTA = 84
+
+
+class CouponQuotaExhausted(Exception):
+    pass
+
+
+def claimed_coupons(apps=global_apps):
+    """已綁定預約的優惠券（即佔用活動額度者）"""
+    Coupon = apps.get_model('coupon', 'Coupon')
+    return Coupon.objects.exclude(Q(reservation_id__isnull=True) | Q(reservation_id=''))
+
+
+def rebuild_coupon_counters(apps=global_apps):
+    """由優惠券資料重算活動剩餘額度、已使用數與各店家使用數，回傳活動列"""
+    Coupon = apps.get_model('coupon', 'Coupon')
+    CouponCampaign = apps.get_model('coupon', 'CouponCampaign')
+    CouponStoreUsage = apps.get_model('coupon', 'CouponStoreUsage')
+
+    used = Coupon.objects.filter(status='used')
+    with transaction.atomic():
+        campaign, _ = CouponCampaign.objects.update_or_create(code=REGISTRATION_CAMPAIGN, defaults={
+            'quota': REGISTRATION_COUPON_QUOTA,
+            'remaining': max(0, REGISTRATION_COUPON_QUOTA - claimed_coupons(apps).count()),
+            'used_count': used.count(),
+        })
+        CouponStoreUsage.objects.all().delete()
+        CouponStoreUsage.objects.bulk_create(
+            CouponStoreUsage(store_id=store_id, used_count=count)
+            for store_id, count in used.exclude(store_id__isnull=True).exclude(store_id='').values_list(
+                'store_id'
+            ).annotate(count=Count('id')).order_by()
+        )
+    return campaign
+
+
+def campaign_queryset():
+    return global_apps.get_model('coupon', 'CouponCampaign').objects.filter(code=REGISTRATION_CAMPAIGN)
+
+
+def get_campaign():
+    """取得活動列，尚未建立時由既有資料重算"""
+    return campaign_queryset().first() or rebuild_coupon_counters()
+
+
+def has_remaining_quota() -> bool:
+    return get_campaign().remaining > 0
+
+
+def remaining_coupons() -> int:
+    """額度扣除已使用數"""
+    campaign = get_campaign()
+    return campaign.quota - campaign.used_count
+
+
+def store_used_coupons(store_id: Optional[str]) -> int:
+    CouponStoreUsage = global_apps.get_model('coupon', 'CouponStoreUsage')
+    return CouponStoreUsage.objects.filter(store_id=store_id).values_list('used_count', flat=True).first() or 0
+
+
+def claim_coupon(coupon, reservation_id: str, store_id: str) -> bool:
+    """
+    將未使用的優惠券綁定預約；首次綁定時以條件式 UPDATE 扣除活動額度，額度用完時不綁定並回傳 False
+    已綁定過的優惠券改綁新預約時不重複扣除額度
+    """
+    Coupon = global_apps.get_model('coupon', 'Coupon')
+    get_campaign()
+    changes = {'reservation_id': reservation_id, 'store_id': store_id, 'updated_at': timezone.now()}
+    not_used = Coupon.objects.filter(pk=coupon.pk, status='not_used')
+    try:
+        with transaction.atomic():
+            if not_used.filter(Q(reservation_id__isnull=True) | Q(reservation_id='')).update(**changes):
+                if not campaign_queryset().filter(remaining__gt=0).update(remaining=F('remaining') - 1):
+                    raise CouponQuotaExhausted
+            elif not not_used.update(**changes):
+                return False
+    except CouponQuotaExhausted:
+        return False
+    coupon.reservation_id, coupon.store_id = reservation_id, store_id
+    return True
+
+
+def add_store_usage(store_id: Optional[str], delta: int):
+    CouponStoreUsage = global_apps.get_model('coupon', 'CouponStoreUsage')
+    if not store_id:
+        return
+    usage = CouponStoreUsage.objects.filter(store_id=store_id)
+    if delta < 0:
+        usage.filter(used_count__gte=-delta).update(used_count=F('used_count') + delta)
+        return
+    if usage.update(used_count=F('used_count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            CouponStoreUsage.objects.create(store_id=store_id, used_count=delta)
+    except IntegrityError:
+        # 其他請求已同時建立
+        usage.update(used_count=F('used_count') + delta)
+
+
+def use_coupon(reservation_id: str, order_id: str) -> bool:
+    """預約完成時將綁定的優惠券標記為已使用，並累計活動與店家的使用數"""
+    Coupon = global_apps.get_model('coupon', 'Coupon')
+    get_campaign()
+    with transaction.atomic():
+        coupon = Coupon.objects.filter(reservation_id=reservation_id, status='not_used').first()
+        if coupon is None or not Coupon.objects.filter(pk=coupon.pk, status='not_used').update(
+            status='used', order_id=order_id, updated_at=timezone.now()
+        ):
+            return False
+        campaign_queryset().update(used_count=F('used_count') + 1)
+        add_store_usage(coupon.store_id, 1)
+    return True
+
+
+def coupon_deleted(coupon):
+    """刪除優惠券時歸還其佔用的額度與使用數，與依資料計數的結果一致"""
+    campaign = campaign_queryset()
+    if coupon.reservation_id:
+        campaign.filter(remaining__lt=F('quota')).update(remaining=F('remaining') + 1)
+    if coupon.status == 'used':
+        campaign.filter(used_count__gt=0).update(used_count=F('used_count') - 1)
+        add_store_usage(coupon.store_id, -1)
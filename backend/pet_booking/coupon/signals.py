@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import Coupon
+from .quota import coupon_deleted
+
+
+@receiver(post_delete, sender=Coupon)
+def coupon_removed(sender, instance, **kwargs):
+    coupon_deleted(instance)
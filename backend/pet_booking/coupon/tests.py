@@ -1,3 +1,143 @@
-from django.test import TestCase
+from datetime import datetime, time
 
-# Create your tests here.
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from pet_booking.customers.models import CustomersProfile
+from pet_booking.reservations.models import ReservationGrooming
+from pet_booking.test_fixtures import api_client, create_store
+from pet_booking.users.models import User
+from .models import Coupon, CouponCampaign, CouponStatus, CouponStoreUsage
+from .quota import (
+    claim_coupon, get_campaign, has_remaining_quota, rebuild_coupon_counters, remaining_coupons,
+    store_used_coupons, use_coupon
+)
+
+
+class CouponQuotaTestCase(TestCase):
+    """優惠券活動額度與使用數計數測試"""
+
+    def setUp(self):
+        self.coupons = [
+            Coupon.objects.create(
+                user_id=User.objects.create(username=f'member{index}', role='member', user_id=f'M{index}'),
+                coupon_number=f'C{index}'
+            )
+            for index in range(3)
+        ]
+
+    def set_remaining(self, remaining):
+        CouponCampaign.objects.filter(code=get_campaign().code).update(remaining=remaining)
+
+    def test_claim_decrements_quota_once(self):
+        remaining = get_campaign().remaining
+        self.assertTrue(claim_coupon(self.coupons[0], 'GR1', 'S1'))
+        # 改綁其他預約不重複扣除額度
+        self.assertTrue(claim_coupon(self.coupons[0], 'GR2', 'S1'))
+        self.assertEqual(get_campaign().remaining, remaining - 1)
+        self.assertEqual(Coupon.objects.get(pk=self.coupons[0].pk).reservation_id, 'GR2')
+
+    def test_claim_stops_at_quota(self):
+        self.set_remaining(1)
+        self.assertTrue(claim_coupon(self.coupons[0], 'GR1', 'S1'))
+        self.assertFalse(claim_coupon(self.coupons[1], 'GR2', 'S1'))
+        self.assertFalse(has_remaining_quota())
+        # 額度用完時不綁定預約
+        self.assertIsNone(Coupon.objects.get(pk=self.coupons[1].pk).reservation_id)
+        self.assertEqual(get_campaign().remaining, 0)
+
+    def test_use_counts_per_store(self):
+        remaining = remaining_coupons()
+        claim_coupon(self.coupons[0], 'GR1', 'S1')
+        claim_coupon(self.coupons[1], 'GR2', 'S2')
+        self.assertTrue(use_coupon('GR1', '10'))
+        self.assertFalse(use_coupon('GR1', '10'))
+        self.assertFalse(use_coupon('GR9', '11'))
+        self.assertTrue(use_coupon('GR2', '12'))
+
+        self.assertEqual(remaining_coupons(), remaining - 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(store_used_coupons('S1'), 1)
+        self.assertEqual(store_used_coupons('S3'), 0)
+        # 不可再綁定已使用的優惠券
+        self.assertFalse(claim_coupon(Coupon.objects.get(pk=self.coupons[0].pk), 'GR3', 'S1'))
+
+    def test_counters_match_rebuild(self):
+        claim_coupon(self.coupons[0], 'GR1', 'S1')
+        claim_coupon(self.coupons[1], 'GR2', 'S1')
+        use_coupon('GR1', '10')
+        self.coupons[1].delete()
+
+        incremental = (get_campaign().remaining, get_campaign().used_count, list(CouponStoreUsage.objects.values_list()))
+        rebuild_coupon_counters()
+        self.assertEqual(
+            incremental,
+            (get_campaign().remaining, get_campaign().used_count, list(CouponStoreUsage.objects.values_list()))
+        )
+
+
+class CouponFinishActionTestCase(TestCase):
+    """完成預約時標記優惠券並回傳店家使用數"""
+
+    def test_grooming_complete_uses_coupon(self):
+        store = create_store()
+        owner = store.user_id
+        member = User.objects.create(username='member', role='member', user_id='M1')
+        CustomersProfile.objects.create(user_id=member, full_name='Amy', phone='0900000001', email='m@example.com')
+        ReservationGrooming.objects.create(
+            reservation_id='GR1', store_name='Test Store', user_name='Amy', user_phone='0900000001', pet_name='Bobo',
+            pet_type='dog', pet_size='small', total_price=500, grooming_period=60, status='confirmed',
+            reservation_time=timezone.make_aware(datetime.combine(timezone.localdate(), time(12))),
+            store_id=store, user_id=member
+        )
+        coupon = Coupon.objects.create(user_id=member, coupon_number='C1')
+        claim_coupon(coupon, 'GR1', 'S1')
+
+        client = api_client(owner)
+        response = client.patch('/api/reservations/grooming/actions/complete', {'reservation_id': 'GR1'}, format='json')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['used_coupons_count'], 1)
+        self.assertEqual(response.data['used_coupons_total_revenue'], 50)
+        self.assertEqual(Coupon.objects.get(pk=coupon.pk).status, CouponStatus.USED)
+
+
+class CouponCampaignMigrationTestCase(TransactionTestCase):
+    """建立活動計數表的 migration 需由既有優惠券計算剩餘額度與使用數"""
+
+    migrate_from = [('coupon', '0002_coupon_store_id')]
+    migrate_to = [('coupon', '0003_coupon_campaign')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_migration_counts_existing_coupons(self):
+        apps = self.migrate(self.migrate_from)
+        User = apps.get_model('users', 'User')
+        Coupon = apps.get_model('coupon', 'Coupon')
+        for index, (reservation_id, store_id, status) in enumerate([
+            (None, None, 'not_used'), ('GR1', 'S1', 'not_used'), ('GR2', 'S1', 'used'), ('GR3', 'S2', 'used')
+        ]):
+            Coupon.objects.create(
+                user_id=User.objects.create(username=f'member{index}', role='member', user_id=f'M{index}'),
+                coupon_number=f'C{index}', reservation_id=reservation_id, store_id=store_id, status=status
+            )
+
+        apps = self.migrate(self.migrate_to)
+
+        campaign = apps.get_model('coupon', 'CouponCampaign').objects.get()
+        self.assertEqual(
+            (campaign.code, campaign.quota, campaign.remaining, campaign.used_count), ('registration', 84, 81, 2)
+        )
+        self.assertEqual(
+            sorted(apps.get_model('coupon', 'CouponStoreUsage').objects.values_list('store_id', 'used_count')),
+            [('S1', 1), ('S2', 1)]
+        )
@@ -17,6 +17,7 @@ from .models import CustomersProfile, LikeStore, Pet
 from .serializers import RegisterSendCodeSerializer, RegisterConfirmCodeSerializer, CustomersProfileSerializer, LikeStoreSerializer, PetSerializer
 from pet_booking.users.models import User, UserRole
 from pet_booking.coupon.models import Coupon, CouponStatus
+from pet_booking.coupon.quota import has_remaining_quota
 # from pet_booking.users.serializers import UserSerializer
 
 # ----- 生成coupon序號 -----
@@ -109,12 +110,8 @@ class RegisterConfirmCodeAPIView(APIView):
                 full_name=cache_data['full_name']
                 # ...如有 gender, address 再補完整
             )
-            # 檢查 reservation_id 已有值的優惠券數量
-            coupons_with_reservation = Coupon.objects.filter(
-                reservation_id__isnull=False
-            ).exclude(reservation_id="").count()
-
-            if coupons_with_reservation < 84:
+            # 活動仍有剩餘額度（綁定預約時才原子扣除）才發放優惠券
+            if has_remaining_quota():
                 # 生成唯一優惠券碼並寫入 Coupon
                 coupon_number = generate_coupon_number(length=7)
                 # print(Coupon.objects.all())
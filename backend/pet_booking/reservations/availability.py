@@ -0,0 +1,202 @@
+# origin
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+import json
+import math
+
+# app
+from .models import GroomingSchedules
+
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES  # 96
+FULL_DAY_MASK = (1 << SLOTS_PER_DAY) - 1
+WEEKDAY_NAMES = ['星期一', '星期二', '星期三', '星期四', '星期五', '星期六', '星期日']
+
+
+def slot_index(slot_time: time) -> int:
+    """時間轉換為當日第幾個 15 分鐘時段"""
+    return (slot_time.hour * 60 + slot_time.minute) // SLOT_MINUTES
+
+
+def slot_time(index: int) -> time:
+    """時段索引轉換為時間"""
+    minutes = index * SLOT_MINUTES
+    return time(minutes // 60, minutes % 60)
+
+
+def slot_count(duration_minutes: int) -> int:
+    """服務時長需佔用的時段數（不足 15 分鐘以一個時段計）"""
+    return max(1, math.ceil(int(duration_minutes) / SLOT_MINUTES))
+
+
+def occupied_slots(start: time, duration_minutes: int) -> List[time]:
+    """列出 [start, start + duration) 佔用的所有時段"""
+    first = slot_index(start)
+    return [slot_time(index) for index in range(first, min(first + slot_count(duration_minutes), SLOTS_PER_DAY))]
+
+
+def build_mask(slot_times: Iterable[time]) -> int:
+    """將時段列表壓縮為 96 bits 的 bitmap"""
+    mask = 0
+    for value in slot_times:
+        mask |= 1 << slot_index(value)
+    return mask
+
+
+def window_mask(opening_time: time = None, closing_time: time = None) -> int:
+    """營業時間內的時段 bitmap，未設定營業時間則視為整天營業"""
+    first = slot_index(opening_time) if opening_time else 0
+    last = slot_index(closing_time) if closing_time else SLOTS_PER_DAY
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def run_starts(free_mask: int, slots: int) -> int:
+    """找出連續 slots 個時段皆空閒的起始位置（bit i 代表時段 i 可作為起點）"""
+    starts = free_mask
+    for offset in range(1, slots):
+        starts &= free_mask >> offset
+    return starts
+
+
+def closed_weekdays(close_day) -> Set[int]:
+    """解析店家公休日，回傳 date.weekday() 值的集合（支援「星期一」或 1~7 格式）"""
+    if not close_day:
+        return set()
+    if isinstance(close_day, str):
+        try:
+            close_day = json.loads(close_day)
+        except ValueError:
+            close_day = [close_day]
+    weekdays = set()
+    for value in close_day:
+        if value in WEEKDAY_NAMES:
+            weekdays.add(WEEKDAY_NAMES.index(value))
+        elif str(value).isdigit() and 1 <= int(value) <= 7:
+            weekdays.add(int(value) - 1)
+    return weekdays
+
+
+def iter_bits(mask: int) -> Iterable[int]:
+    """依序列出 bitmap 中為 1 的位置"""
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+class GroomingDayAvailability:
+    """單一店家單日的美容時段佔用 bitmap"""
+
+    def __init__(self, store_name: str, day: date, occupied_mask: int = 0):
+        self.store_name = store_name
+        self.day = day
+        self.occupied_mask = occupied_mask & FULL_DAY_MASK
+
+    @classmethod
+    def load(cls, store_name: str, day: date) -> 'GroomingDayAvailability':
+        """一次查詢載入店家當日所有已佔用時段"""
+        slot_times = GroomingSchedules.objects.filter(
+            store_name=store_name,
+            date=day
+        ).values_list('unavailable_time', flat=True)
+        return cls(store_name, day, build_mask(slot_times))
+
+    def is_free(self, start: time, duration_minutes: int) -> bool:
+        """檢查 [start, start + duration) 是否皆未被預約"""
+        first = slot_index(start)
+        slots = slot_count(duration_minutes)
+        if first + slots > SLOTS_PER_DAY:
+            return False
+        requested = ((1 << slots) - 1) << first
+        return not (self.occupied_mask & requested)
+
+    def free_starts(self, duration_minutes: int, opening_time: time = None,
+                    closing_time: time = None) -> List[time]:
+        """列出可容納 duration 的所有起始時間（限營業時間內）"""
+        free_mask = ~self.occupied_mask & window_mask(opening_time, closing_time)
+        starts = run_starts(free_mask, slot_count(duration_minutes))
+        return [slot_time(index) for index in iter_bits(starts)]
+
+
+class GroomingRangeAvailability:
+    """單一店家多日的美容時段 bitmap，每日 96 bits 依序串接成一個整數"""
+
+    def __init__(self, store_name: str, start_date: date, end_date: date,
+                 occupied_by_day: Dict[date, int] = None):
+        self.store_name = store_name
+        self.start_date = start_date
+        self.end_date = end_date
+        self.days = (end_date - start_date).days + 1
+        self.occupied_mask = 0
+        for day, mask in (occupied_by_day or {}).items():
+            offset = (day - start_date).days
+            if 0 <= offset < self.days:
+                self.occupied_mask |= (mask & FULL_DAY_MASK) << (offset * SLOTS_PER_DAY)
+
+    @classmethod
+    def load(cls, store_name: str, start_date: date, end_date: date) -> 'GroomingRangeAvailability':
+        """一次查詢載入日期區間內所有已佔用時段"""
+        return cls.load_many([store_name], start_date, end_date)[store_name]
+
+    @classmethod
+    def load_many(cls, store_names: Iterable[str], start_date: date,
+                  end_date: date) -> Dict[str, 'GroomingRangeAvailability']:
+        """一次查詢載入多家店家在日期區間內的已佔用時段"""
+        occupied = {store_name: {} for store_name in store_names}
+        rows = GroomingSchedules.objects.filter(
+            store_name__in=list(occupied),
+            date__range=(start_date, end_date)
+        ).values_list('store_name', 'date', 'unavailable_time')
+        for store_name, day, unavailable_time in rows:
+            occupied_by_day = occupied[store_name]
+            occupied_by_day[day] = occupied_by_day.get(day, 0) | (1 << slot_index(unavailable_time))
+        return {
+            store_name: cls(store_name, start_date, end_date, occupied_by_day)
+            for store_name, occupied_by_day in occupied.items()
+        }
+
+    def repeat_daily(self, day_mask: int, closed: Set[int] = frozenset()) -> int:
+        """將單日 bitmap 複製到區間內每一天，公休日留空"""
+        mask = 0
+        for offset in range(self.days):
+            if (self.start_date + timedelta(days=offset)).weekday() not in closed:
+                mask |= day_mask << (offset * SLOTS_PER_DAY)
+        return mask
+
+    def start_mask(self, duration_minutes: int, opening_time: time = None,
+                   closing_time: time = None, close_day=None) -> int:
+        """整段區間一次位元運算，bit (第幾天 * 96 + 時段) 代表可容納 duration 的起始時間"""
+        slots = slot_count(duration_minutes)
+        closed = closed_weekdays(close_day)
+        free_mask = ~self.occupied_mask & self.repeat_daily(window_mask(opening_time, closing_time), closed)
+        # 起點須讓服務在當日內結束，避免連續空閒跨到隔天
+        start_mask = self.repeat_daily((1 << max(0, SLOTS_PER_DAY - slots + 1)) - 1)
+        return run_starts(free_mask, slots) & start_mask
+
+    def free_starts(self, duration_minutes: int, opening_time: time = None,
+                    closing_time: time = None, close_day=None) -> Dict[date, List[time]]:
+        """列出每天可容納 duration 的起始時間"""
+        starts = self.start_mask(duration_minutes, opening_time, closing_time, close_day)
+
+        result = {self.start_date + timedelta(days=offset): [] for offset in range(self.days)}
+        for index in iter_bits(starts):
+            offset, slot = divmod(index, SLOTS_PER_DAY)
+            result[self.start_date + timedelta(days=offset)].append(slot_time(slot))
+        return result
+
+    def first_start(self, duration_minutes: int, opening_time: time = None, closing_time: time = None,
+                    close_day=None, after: datetime = None) -> Optional[datetime]:
+        """最早可容納 duration 的起始時間（晚於 after），不需展開整段區間"""
+        starts = self.start_mask(duration_minutes, opening_time, closing_time, close_day)
+        if after is not None:
+            offset = (after.date() - self.start_date).days
+            if offset >= 0:
+                # 清除 after 當下（含）之前的時段
+                starts &= ~((1 << (offset * SLOTS_PER_DAY + slot_index(after.time()) + 1)) - 1)
+        if not starts:
+            return None
+        offset, slot = divmod((starts & -starts).bit_length() - 1, SLOTS_PER_DAY)
+        return datetime.combine(self.start_date + timedelta(days=offset), slot_time(slot))
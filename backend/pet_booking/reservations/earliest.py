@@ -0,0 +1,80 @@
+# origin
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# app
+from .availability import GroomingRangeAvailability
+from pet_booking.services.pricing import GroomingPriceMatrix
+
+
+EARLIEST_SEARCH_WORKERS = 4
+
+
+def clamp_window(opening_time: Optional[time], closing_time: Optional[time],
+                 earliest_time: Optional[time], latest_time: Optional[time]) -> Tuple[Optional[time], Optional[time]]:
+    """店家營業時間與顧客指定時段的交集（None 代表不限）"""
+    if earliest_time and (opening_time is None or earliest_time > opening_time):
+        opening_time = earliest_time
+    if latest_time and (closing_time is None or latest_time < closing_time):
+        closing_time = latest_time
+    return opening_time, closing_time
+
+
+class EarliestGroomingSearch:
+    """
+    多家店家的最早可預約美容時段
+    價目表與時段佔用先以批次查詢載入，逐店的試算與 bitmap 運算再分派至執行緒池，執行緒內不存取資料庫
+    """
+
+    def __init__(self, selected_services: List[str], species: str, pet_size: str, fur_amount: str,
+                 start_date: date, end_date: date, now: datetime,
+                 earliest_time: Optional[time] = None, latest_time: Optional[time] = None):
+        self.selected_services = selected_services
+        self.species = species
+        self.pet_size = pet_size
+        self.fur_amount = fur_amount
+        self.start_date = start_date
+        self.end_date = end_date
+        self.now = now
+        self.earliest_time = earliest_time
+        self.latest_time = latest_time
+
+    def earliest_start(self, store, matrix: GroomingPriceMatrix,
+                       availability: GroomingRangeAvailability) -> Optional[Dict]:
+        """單一店家最早可開始的時間與試算結果，無法提供服務或區間內無空檔時回傳 None"""
+        total_price, duration, quote_error = matrix.quote(
+            self.selected_services, self.species, self.pet_size, self.fur_amount
+        )
+        if quote_error:
+            return None
+
+        opening_time, closing_time = clamp_window(
+            store.daily_opening_time, store.daily_closing_hours, self.earliest_time, self.latest_time
+        )
+        start = availability.first_start(duration, opening_time, closing_time, store.close_day, after=self.now)
+        if start is None:
+            return None
+        return {'store': store, 'start': start, 'total_price': total_price, 'grooming_duration': duration}
+
+    def run(self, stores: Iterable) -> List[Dict]:
+        """回傳依最早開始時間（相同時再依價格）排序的結果"""
+        stores = list(stores)
+        if not stores:
+            return []
+        matrices = GroomingPriceMatrix.for_stores({store.user_id_id for store in stores})
+        schedules = GroomingRangeAvailability.load_many(
+            {store.store_name for store in stores}, self.start_date, self.end_date
+        )
+
+        def check(chunk):
+            return [
+                self.earliest_start(store, matrices[store.user_id_id], schedules[store.store_name]) for store in chunk
+            ]
+
+        # 每個執行緒處理一段店家，避免逐店提交工作的額外成本
+        workers = min(EARLIEST_SEARCH_WORKERS, len(stores))
+        chunks = [stores[index::workers] for index in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = [result for chunk in executor.map(check, chunks) for result in chunk if result]
+        return sorted(results, key=lambda result: (result['start'], result['total_price'], result['store'].pk))
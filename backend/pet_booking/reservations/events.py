@@ -0,0 +1,125 @@
+# origin
+import abc
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Set, Tuple
+
+# third-party
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+# 預約狀態轉換對應的事件類型：建立時狀態為 pending
+EVENT_TYPES = {
+    'pending': 'created',
+    'confirmed': 'confirmed',
+    'cancelled': 'cancelled',
+    'finished': 'finished',
+}
+DEFAULT_BROKER = 'pet_booking.reservations.events.InProcessBroker'
+
+
+class ReservationEventBroker(abc.ABC):
+    """預約事件訊息代理介面
+
+    publish 由同步的 view 呼叫；subscribe 回傳 async context manager，
+    取得的訂閱物件以 `await subscription.get()` 逐筆取得事件。
+    """
+
+    @abc.abstractmethod
+    def publish(self, store_pk: int, event: Dict):
+        """發布店家的預約事件"""
+
+    @abc.abstractmethod
+    def subscribe(self, store_pk: int):
+        """訂閱店家的預約事件"""
+
+
+class InProcessBroker(ReservationEventBroker):
+    """單一程序內的 pub/sub：每個訂閱一個 asyncio.Queue，跨執行緒以 call_soon_threadsafe 投遞"""
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self.lock = threading.Lock()
+        self.subscribers: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def publish(self, store_pk: int, event: Dict):
+        with self.lock:
+            targets = list(self.subscribers.get(store_pk, ()))
+        for loop, queue in targets:
+            try:
+                loop.call_soon_threadsafe(self.deliver, queue, event)
+            except RuntimeError:
+                # 訂閱端的 event loop 已關閉
+                continue
+
+    @staticmethod
+    def deliver(queue: asyncio.Queue, event: Dict):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 連線消化太慢時丟棄事件，前端重新整理即可取得最新資料
+            pass
+
+    @asynccontextmanager
+    async def subscribe(self, store_pk: int) -> AsyncIterator[asyncio.Queue]:
+        entry = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.max_queue_size))
+        with self.lock:
+            self.subscribers.setdefault(store_pk, set()).add(entry)
+        try:
+            yield entry[1]
+        finally:
+            with self.lock:
+                subscribers = self.subscribers.get(store_pk)
+                if subscribers is not None:
+                    subscribers.discard(entry)
+                    if not subscribers:
+                        del self.subscribers[store_pk]
+
+
+@lru_cache(maxsize=None)
+def get_broker() -> ReservationEventBroker:
+    """依 RESERVATION_EVENT_BROKER 設定載入訊息代理（每個程序一個實例）"""
+    return import_string(getattr(settings, 'RESERVATION_EVENT_BROKER', DEFAULT_BROKER))()
+
+
+def build_event(reservation, service_type: str, status: str) -> Dict:
+    return {
+        'type': EVENT_TYPES.get(status, status),
+        'service_type': service_type,
+        'reservation_id': reservation.reservation_id,
+        'status': status,
+    }
+
+
+def publish_reservation_event(store_pk: int, event: Dict):
+    get_broker().publish(store_pk, event)
+
+
+def format_sse(event: Dict) -> str:
+    """轉為 text/event-stream 格式，事件名稱為 reservation.<type>"""
+    data = json.dumps(event, ensure_ascii=False)
+    return f'event: reservation.{event["type"]}\ndata: {data}\n\n'
+
+
+async def stream_events(store_pk: int, heartbeat: float) -> AsyncIterator[str]:
+    """
+    訂閱店家事件並輸出 SSE，閒置超過 heartbeat 秒送出註解行維持連線
+    連線中斷時產生器於 yield 處收到 GeneratorExit，於 finally 直接結束訂閱，不把例外再拋入訂閱的產生器
+    """
+    context = get_broker().subscribe(store_pk)
+    subscription = await context.__aenter__()
+    try:
+        yield 'retry: 3000\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield format_sse(event)
+    finally:
+        await context.__aexit__(None, None, None)
@@ -0,0 +1,89 @@
+# origin
+import os
+import threading
+import time
+
+# third-party
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+# 預約編號：前綴 2 碼 + 時間 9 碼 + 節點 6 碼 + 序號 3 碼 = 20 碼，皆為 Crockford base32
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+TIME_WIDTH = 9
+NODE_WIDTH = 6
+SEQUENCE_WIDTH = 3
+# 以 2025-01-01 UTC 為起點的毫秒數
+EPOCH_MS = 1735689600000
+# 時間欄位加上偏移，使首字元為字母：新編號一律排在舊格式（純數字時間戳）之後，可用約 770 年
+TIME_OFFSET = 10 * 32 ** (TIME_WIDTH - 1)
+# 節點 = 機器編號（8 bits）+ 程序 pid（22 bits，Linux pid 上限）
+PID_BITS = 22
+MAX_MACHINE_ID = (1 << (NODE_WIDTH * 5 - PID_BITS)) - 1
+MAX_SEQUENCE = 32 ** SEQUENCE_WIDTH - 1
+
+
+def encode(value: int, width: int) -> str:
+    chars = []
+    for _ in range(width):
+        value, remainder = divmod(value, 32)
+        chars.append(ALPHABET[remainder])
+    return ''.join(reversed(chars))
+
+
+def current_millis() -> int:
+    return time.time_ns() // 1_000_000 - EPOCH_MS
+
+
+class ReservationIdGenerator:
+    """
+    Snowflake 式的預約編號產生器：(毫秒時間, 節點, 序號)
+    同一程序內以鎖保證遞增；同一毫秒超過序號上限或時鐘倒退時沿用 / 借用下一毫秒，不會重複也不會倒序
+    不同程序以 pid 區分、不同機器以 RESERVATION_ID_MACHINE 設定區分
+    """
+
+    def __init__(self, machine_id: int = None):
+        self.machine_id = machine_id
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def get_machine_id(self) -> int:
+        machine_id = self.machine_id
+        if machine_id is None:
+            machine_id = getattr(settings, 'RESERVATION_ID_MACHINE', 0)
+        if not 0 <= machine_id <= MAX_MACHINE_ID:
+            raise ImproperlyConfigured(f'RESERVATION_ID_MACHINE 需介於 0 ~ {MAX_MACHINE_ID}')
+        return machine_id
+
+    def reset(self):
+        """初始化本程序的節點與序號"""
+        self.pid = os.getpid()
+        self.node = encode((self.get_machine_id() << PID_BITS) | (self.pid & ((1 << PID_BITS) - 1)), NODE_WIDTH)
+        self.last_millis = -1
+        self.sequence = 0
+
+    def after_fork(self):
+        """fork 後的子程序重建鎖（避免繼承父程序持有中的鎖），下次產生編號時重設狀態"""
+        self.lock = threading.Lock()
+        self.pid = None
+
+    def generate(self, prefix: str) -> str:
+        with self.lock:
+            if self.pid != os.getpid():
+                self.reset()
+            now = current_millis()
+            if now > self.last_millis:
+                self.last_millis, self.sequence = now, 0
+            else:
+                self.sequence += 1
+                if self.sequence > MAX_SEQUENCE:
+                    self.last_millis, self.sequence = self.last_millis + 1, 0
+            return (
+                f'{prefix}{encode(self.last_millis + TIME_OFFSET, TIME_WIDTH)}'
+                f'{self.node}{encode(self.sequence, SEQUENCE_WIDTH)}'
+            )
+
+
+reservation_ids = ReservationIdGenerator()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reservation_ids.after_fork)
@@ -0,0 +1,56 @@
+# third-party
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+# app
+from pet_booking.stores.models import Store
+from pet_booking.reservations.models import ReservationBoarding, ReservationGrooming
+from pet_booking.reservations.resolvers import CustomerPetResolver
+
+
+class Command(BaseCommand):
+    help = '依 store_name / user_name / user_phone / pet_name 回填預約的店家、會員與寵物外鍵'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='每批處理的預約筆數')
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options['chunk_size'])
+        for model in (ReservationGrooming, ReservationBoarding):
+            updated = self.backfill(model, chunk_size)
+            self.stdout.write(f'{model._meta.db_table}: {updated} reservations updated')
+
+    def backfill(self, model, chunk_size: int) -> int:
+        """以主鍵分批處理缺少外鍵的預約，每批固定查詢次數"""
+        queryset = model.objects.filter(
+            Q(store_id__isnull=True) | Q(user_id__isnull=True) | Q(pet_id__isnull=True)
+        ).order_by('pk')
+        last_pk = 0
+        updated = 0
+        while True:
+            chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                return updated
+            last_pk = chunk[-1].pk
+
+            stores = dict(Store.objects.filter(
+                store_name__in={reservation.store_name for reservation in chunk}
+            ).values_list('store_name', 'id'))
+            resolver = CustomerPetResolver(chunk)
+
+            changed = []
+            for reservation in chunk:
+                user_id, pet = resolver.lookup(reservation.user_name, reservation.user_phone, reservation.pet_name)
+                values = {
+                    'store_id_id': reservation.store_id_id or stores.get(reservation.store_name),
+                    'user_id_id': reservation.user_id_id or user_id,
+                    'pet_id_id': reservation.pet_id_id or (pet['id'] if pet else None),
+                }
+                if any(getattr(reservation, field) != value for field, value in values.items()):
+                    for field, value in values.items():
+                        setattr(reservation, field, value)
+                    changed.append(reservation)
+
+            if changed:
+                model.objects.bulk_update(changed, ['store_id', 'user_id', 'pet_id'])
+                updated += len(changed)
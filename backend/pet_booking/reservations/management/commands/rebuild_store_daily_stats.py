@@ -0,0 +1,13 @@
+# third-party
+from django.core.management.base import BaseCommand
+
+# app
+from pet_booking.reservations.stats import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = '由預約資料重新計算店家每日統計（store_daily_stats）'
+
+    def handle(self, *args, **options):
+        count = rebuild_daily_stats()
+        self.stdout.write(f'store_daily_stats: {count} rows rebuilt')
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:48
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservations", "0010_alter_reservationgrooming_pet_breed"),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="groomingschedules",
+            unique_together={("store_name", "date", "unavailable_time")},
+        ),
+    ]
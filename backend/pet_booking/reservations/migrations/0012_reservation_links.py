@@ -0,0 +1,92 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0010_alter_customersprofile_user_id"),
+        ("reservations", "0011_grooming_schedules_unique_slot"),
+        ("stores", "0003_alter_store_user_id"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reservationboarding",
+            name="pet_id",
+            field=models.ForeignKey(
+                blank=True,
+                db_column="pet_id",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="boarding_reservations",
+                to="customers.pet",
+            ),
+        ),
+        migrations.AddField(
+            model_name="reservationboarding",
+            name="store_id",
+            field=models.ForeignKey(
+                blank=True,
+                db_column="store_id",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="boarding_reservations",
+                to="stores.store",
+            ),
+        ),
+        migrations.AddField(
+            model_name="reservationboarding",
+            name="user_id",
+            field=models.ForeignKey(
+                blank=True,
+                db_column="user_id",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="boarding_reservations",
+                to=settings.AUTH_USER_MODEL,
+                to_field="user_id",
+            ),
+        ),
+        migrations.AddField(
+            model_name="reservationgrooming",
+            name="pet_id",
+            field=models.ForeignKey(
+                blank=True,
+                db_column="pet_id",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="grooming_reservations",
+                to="customers.pet",
+            ),
+        ),
+        migrations.AddField(
+            model_name="reservationgrooming",
+            name="store_id",
+            field=models.ForeignKey(
+                blank=True,
+                db_column="store_id",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="grooming_reservations",
+                to="stores.store",
+            ),
+        ),
+        migrations.AddField(
+            model_name="reservationgrooming",
+            name="user_id",
+            field=models.ForeignKey(
+                blank=True,
+                db_column="user_id",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="grooming_reservations",
+                to=settings.AUTH_USER_MODEL,
+                to_field="user_id",
+            ),
+        ),
+    ]
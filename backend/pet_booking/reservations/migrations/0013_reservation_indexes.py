@@ -0,0 +1,72 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0010_alter_customersprofile_user_id"),
+        ("reservations", "0012_reservation_links"),
+        ("stores", "0003_alter_store_user_id"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="boardingschedules",
+            index=models.Index(
+                fields=["store_name", "room_type", "unavailable_time"],
+                name="brd_sched_store_room_time",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="orders",
+            index=models.Index(
+                fields=["user_id", "blacklist"], name="orders_user_blacklist"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservationboarding",
+            index=models.Index(
+                fields=["store_name", "status", "checkin_date"],
+                name="rsv_brd_store_status_checkin",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservationboarding",
+            index=models.Index(
+                fields=["store_name", "status", "created_at"],
+                name="rsv_brd_store_status_created",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservationboarding",
+            index=models.Index(
+                fields=["store_name", "user_phone", "status"],
+                name="rsv_brd_store_phone_status",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservationgrooming",
+            index=models.Index(
+                fields=["store_name", "status", "reservation_time"],
+                name="rsv_grm_store_status_time",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservationgrooming",
+            index=models.Index(
+                fields=["store_name", "status", "created_at"],
+                name="rsv_grm_store_status_created",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservationgrooming",
+            index=models.Index(
+                fields=["store_name", "user_phone", "status"],
+                name="rsv_grm_store_phone_status",
+            ),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+# 各服務類型的預約模型與統計日期欄位（複製自 migration 當下的 reservations.stats）
+SERVICE_MODELS = (
+    ('grooming', 'ReservationGrooming', 'reservation_time'),
+    ('boarding', 'ReservationBoarding', 'checkin_date'),
+)
+STATUSES = ('pending', 'confirmed', 'cancelled', 'finished')
+
+
+def build_daily_stats(apps, schema_editor):
+    # 由既有預約計算每日統計，避免儀表板在下一次預約異動前顯示為 0
+    StoreDailyStats = apps.get_model('reservations', 'StoreDailyStats')
+    store_ids = dict(apps.get_model('stores', 'Store').objects.values_list('store_name', 'id'))
+    rows = {}
+    for service_type, model_name, date_field in SERVICE_MODELS:
+        groups = apps.get_model('reservations', model_name).objects.annotate(
+            day=TruncDate(date_field)
+        ).values('store_id', 'store_name', 'day', 'status').annotate(
+            count=Count('id'),
+            revenue=Sum('total_price')
+        ).order_by()
+        for group in groups:
+            store_pk = group['store_id'] or store_ids.get(group['store_name'])
+            if store_pk is None or group['status'] not in STATUSES:
+                continue
+            key = (store_pk, group['day'], service_type)
+            stats = rows.setdefault(key, StoreDailyStats(store_id_id=store_pk, date=group['day'], service_type=service_type))
+            setattr(stats, group['status'], getattr(stats, group['status']) + group['count'])
+            if group['status'] == 'finished':
+                stats.revenue += group['revenue'] or 0
+    StoreDailyStats.objects.bulk_create(rows.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservations", "0013_reservation_indexes"),
+        ("stores", "0003_alter_store_user_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoreDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "service_type",
+                    models.CharField(
+                        choices=[("grooming", "Grooming"), ("boarding", "Boarding")],
+                        max_length=10,
+                    ),
+                ),
+                ("pending", models.IntegerField(default=0)),
+                ("confirmed", models.IntegerField(default=0)),
+                ("finished", models.IntegerField(default=0)),
+                ("cancelled", models.IntegerField(default=0)),
+                ("revenue", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "store_id",
+                    models.ForeignKey(
+                        db_column="store_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="stores.store",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "store_daily_stats",
+                "unique_together": {("store_id", "date", "service_type")},
+            },
+        ),
+        migrations.RunPython(build_daily_stats, migrations.RunPython.noop),
+    ]
@@ -29,11 +29,44 @@ class ReservationGrooming(models.Model):
         choices=STATUS_CHOICES,
         default='pending'
     )
+    store_id = models.ForeignKey(
+        'stores.Store',
+        on_delete=models.SET_NULL,
+        db_column='store_id',
+        null=True,
+        blank=True,
+        related_name='grooming_reservations'
+    )
+    user_id = models.ForeignKey(
+        'users.User',
+        to_field='user_id',
+        on_delete=models.SET_NULL,
+        db_column='user_id',
+        null=True,
+        blank=True,
+        related_name='grooming_reservations'
+    )
+    pet_id = models.ForeignKey(
+        'customers.Pet',
+        on_delete=models.SET_NULL,
+        db_column='pet_id',
+        null=True,
+        blank=True,
+        related_name='grooming_reservations'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'reservation_grooming'
+        indexes = [
+            # 當日／近期預約：store_name + status，依預約時間範圍或排序
+            models.Index(fields=['store_name', 'status', 'reservation_time'], name='rsv_grm_store_status_time'),
+            # 待審核與歷史紀錄：依建立時間排序
+            models.Index(fields=['store_name', 'status', 'created_at'], name='rsv_grm_store_status_created'),
+            # 預約詳情：同一顧客在該店家的歷史預約
+            models.Index(fields=['store_name', 'user_phone', 'status'], name='rsv_grm_store_phone_status'),
+        ]
 
     def __str__(self):
         return self.reservation_id
@@ -52,6 +85,7 @@ class GroomingSchedules(models.Model):
 
     class Meta:
         db_table = 'grooming_schedules'
+        unique_together = ('store_name', 'date', 'unavailable_time')
 
     def __str__(self):
         return f'booking record for {self.reservation_grooming_id}'
@@ -76,11 +110,44 @@ class ReservationBoarding(models.Model):
         default='pending'
     )
     total_price = models.IntegerField()
+    store_id = models.ForeignKey(
+        'stores.Store',
+        on_delete=models.SET_NULL,
+        db_column='store_id',
+        null=True,
+        blank=True,
+        related_name='boarding_reservations'
+    )
+    user_id = models.ForeignKey(
+        'users.User',
+        to_field='user_id',
+        on_delete=models.SET_NULL,
+        db_column='user_id',
+        null=True,
+        blank=True,
+        related_name='boarding_reservations'
+    )
+    pet_id = models.ForeignKey(
+        'customers.Pet',
+        on_delete=models.SET_NULL,
+        db_column='pet_id',
+        null=True,
+        blank=True,
+        related_name='boarding_reservations'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'reservation_boarding'
+        indexes = [
+            # 房況、近期預約與佔用查詢：store_name + status，依入住日範圍或排序
+            models.Index(fields=['store_name', 'status', 'checkin_date'], name='rsv_brd_store_status_checkin'),
+            # 待審核與歷史紀錄：依建立時間排序
+            models.Index(fields=['store_name', 'status', 'created_at'], name='rsv_brd_store_status_created'),
+            # 預約詳情：同一顧客在該店家的歷史預約
+            models.Index(fields=['store_name', 'user_phone', 'status'], name='rsv_brd_store_phone_status'),
+        ]
 
     def __str__(self):
         return self.reservation_id
@@ -98,6 +165,9 @@ class BoardingSchedules(models.Model):
 
     class Meta:
         db_table = 'boarding_schedules'
+        indexes = [
+            models.Index(fields=['store_name', 'room_type', 'unavailable_time'], name='brd_sched_store_room_time'),
+        ]
 
     def __str__(self):
         return f'boarding schedule for {self.reservation_boarding_id}'
@@ -136,7 +206,41 @@ class Orders(models.Model):
     blacklist = models.BooleanField(default=False)
     class Meta:
         db_table = 'orders'
+        indexes = [
+            # 顧客的訂單與黑名單紀錄
+            models.Index(fields=['user_id', 'blacklist'], name='orders_user_blacklist'),
+        ]
         
     def __str__(self):
         service_type = "grooming" if self.reservation_grooming else "boarding"
-        return f'Order {self.id} - {service_type} (${self.total_price})'
\ No newline at end of file
+        return f'Order {self.id} - {service_type} (${self.total_price})'
+
+SERVICE_TYPE_CHOICES = [
+    ('grooming', 'Grooming'),
+    ('boarding', 'Boarding'),
+]
+
+
+class StoreDailyStats(models.Model):
+    """店家每日預約統計：日期為美容預約時間或住宿入住日（店家時區）"""
+    store_id = models.ForeignKey(
+        'stores.Store',
+        on_delete=models.CASCADE,
+        db_column='store_id',
+        related_name='daily_stats'
+    )
+    date = models.DateField()
+    service_type = models.CharField(max_length=10, choices=SERVICE_TYPE_CHOICES)
+    pending = models.IntegerField(default=0)
+    confirmed = models.IntegerField(default=0)
+    finished = models.IntegerField(default=0)
+    cancelled = models.IntegerField(default=0)
+    revenue = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'store_daily_stats'
+        unique_together = ('store_id', 'date', 'service_type')
+
+    def __str__(self):
+        return f'{self.store_id_id} {self.service_type} stats on {self.date}'
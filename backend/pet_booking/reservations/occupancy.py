@@ -0,0 +1,155 @@
+# origin
+from datetime import date, datetime, time, timedelta
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# third-party
+from django.utils import timezone
+
+# app
+from .models import ReservationBoarding
+
+
+# 佔用房間的預約狀態
+ACTIVE_STATUSES = ('pending', 'confirmed')
+
+
+def room_capacity(species: str, room_count: int, pet_available_amount: int) -> int:
+    """房型可容納數量：貓房以房數 × 每房可住隻數計，狗房以房數計"""
+    if species == 'cat':
+        return room_count * pet_available_amount
+    return room_count
+
+
+def ensure_aware(value: datetime) -> datetime:
+    """naive datetime 一律視為店家所在時區"""
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def day_start(day: date) -> datetime:
+    """店家時區當日 00:00；以 datetime 範圍取代 __date 查詢，讓複合索引可用於範圍掃描"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class BoardingOccupancy:
+    """住宿房型佔用區間，以掃描線計算區間內的最大同時佔用數"""
+
+    def __init__(self, intervals: Iterable[Tuple[datetime, datetime]] = ()):
+        self.intervals = [(ensure_aware(start), ensure_aware(end)) for start, end in intervals]
+
+    @classmethod
+    def load(cls, store_name: str, room_type: str, species: str, start: datetime, end: datetime) -> 'BoardingOccupancy':
+        """一次範圍查詢載入物種房型與 [start, end) 重疊的預約區間（含物種未知的同名房型預約）"""
+        return cls.for_room(cls.load_store(store_name, start, end, room_type), room_type, species)
+
+    @classmethod
+    def load_store(cls, store_name: str, start: datetime, end: datetime,
+                   room_type: Optional[str] = None) -> Dict[Tuple[Optional[str], str], 'BoardingOccupancy']:
+        """一次範圍查詢載入店家房型（未指定時為所有房型）與 [start, end) 重疊的預約區間，以 (物種, 房型) 分組"""
+        intervals_by_room: Dict[Tuple[Optional[str], str], List[Tuple[datetime, datetime]]] = {}
+        rows = ReservationBoarding.objects.filter(
+            store_name=store_name,
+            status__in=ACTIVE_STATUSES,
+            checkin_date__lt=ensure_aware(end),
+            checkout_date__gt=ensure_aware(start)
+        )
+        if room_type is not None:
+            rows = rows.filter(room_type=room_type)
+        rows = rows.values_list('pet_id__species', 'room_type', 'checkin_date', 'checkout_date')
+        for species, room_type, checkin, checkout in rows:
+            intervals_by_room.setdefault((species, room_type), []).append((checkin, checkout))
+        return {key: cls(intervals) for key, intervals in intervals_by_room.items()}
+
+    @classmethod
+    def for_room(cls, occupancy_by_room: Dict[Tuple[Optional[str], str], 'BoardingOccupancy'],
+                 room_type: str, species: str) -> 'BoardingOccupancy':
+        """物種房型的佔用：該物種的預約加上未關聯寵物（物種未知）的同名房型預約"""
+        return cls(
+            interval
+            for key in ((species, room_type), (None, room_type)) if key in occupancy_by_room
+            for interval in occupancy_by_room[key].intervals
+        )
+
+    def peak(self, start: datetime, end: datetime) -> Tuple[int, Optional[datetime]]:
+        """回傳 [start, end) 內的最大同時佔用數及首次達到該數量的時間"""
+        start, end = ensure_aware(start), ensure_aware(end)
+        events: List[Tuple[datetime, int]] = []
+        for interval_start, interval_end in self.intervals:
+            clipped_start, clipped_end = max(interval_start, start), min(interval_end, end)
+            if clipped_start < clipped_end:
+                events.append((clipped_start, 1))
+                events.append((clipped_end, -1))
+
+        # 同一時間點先處理退房再處理入住（區間為左閉右開）
+        events.sort(key=lambda event: (event[0], event[1]))
+
+        current = peak = 0
+        peak_at = None
+        for moment, delta in events:
+            current += delta
+            if current > peak:
+                peak, peak_at = current, moment
+        return peak, peak_at
+
+    def max_occupancy(self, start: datetime, end: datetime) -> int:
+        """[start, end) 內的最大同時佔用數"""
+        return self.peak(start, end)[0]
+
+
+class BoardingCalendar:
+    """住宿房型每日佔用數，以每日增減量的前綴和計算整段日期區間
+
+    佔用依 (物種, 房型) 分組，與 BoardingTariff.rooms 相同；
+    未關聯寵物的預約物種未知，計入所有同名房型（寧可少賣也不超賣）。
+    """
+
+    def __init__(self, start_date: date, end_date: date,
+                 stays: Iterable[Tuple[Optional[str], str, date, date]] = ()):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.days = (end_date - start_date).days + 1
+        self.deltas: Dict[Tuple[Optional[str], str], List[int]] = {}
+        for species, room_type, checkin, checkout in stays:
+            self.add_stay(species, room_type, checkin, checkout)
+
+    @classmethod
+    def load(cls, store_name: str, start_date: date, end_date: date) -> 'BoardingCalendar':
+        """一次查詢載入與日期區間重疊的所有預約（入住日至退房日皆計入佔用）"""
+        rows = ReservationBoarding.objects.filter(
+            store_name=store_name,
+            status__in=ACTIVE_STATUSES,
+            checkin_date__lt=day_start(end_date + timedelta(days=1)),
+            checkout_date__gte=day_start(start_date)
+        ).values_list('pet_id__species', 'room_type', 'checkin_date', 'checkout_date')
+        stays = (
+            (species, room_type, timezone.localtime(checkin).date(), timezone.localtime(checkout).date())
+            for species, room_type, checkin, checkout in rows
+        )
+        return cls(start_date, end_date, stays)
+
+    def add_stay(self, species: Optional[str], room_type: str, checkin: date, checkout: date):
+        """在入住日 +1、退房隔日 -1，超出區間的部分截斷"""
+        first = max((checkin - self.start_date).days, 0)
+        last = min((checkout - self.start_date).days, self.days - 1)
+        if first > last:
+            return
+        deltas = self.deltas.setdefault((species, room_type), [0] * (self.days + 1))
+        deltas[first] += 1
+        deltas[last + 1] -= 1
+
+    def dates(self) -> List[date]:
+        return [self.start_date + timedelta(days=offset) for offset in range(self.days)]
+
+    def used(self, room_type: str, species: Optional[str] = None) -> List[int]:
+        """房型每日佔用數：指定物種時只計該物種與物種未知的預約，未指定時合計所有物種"""
+        rows = [
+            deltas for (stay_species, stay_room_type), deltas in self.deltas.items()
+            if stay_room_type == room_type and (species is None or stay_species in (species, None))
+        ]
+        if not rows:
+            return [0] * self.days
+        return list(accumulate(sum(column) for column in zip(*rows)))[:-1]
+
+    def remaining(self, room_type: str, capacity: int, species: Optional[str] = None) -> List[int]:
+        """房型每日剩餘數量"""
+        return [max(0, capacity - used) for used in self.used(room_type, species)]
@@ -0,0 +1,101 @@
+# origin
+import base64
+import json
+from typing import Optional, Tuple
+
+# third-party
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class ReservationPagination(PageNumberPagination):
+    """預約列表分頁
+
+    預設為頁碼分頁；帶上 cursor 參數（第一頁可為空值）時改用 keyset 分頁，
+    以 (排序欄位, id) 作為游標往後取資料，不執行 COUNT 也不使用 OFFSET。
+    """
+    page_size = 5
+    page_size_query_param = 'page_size'
+    max_page_size = 10
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        field_name, descending = self.get_ordering(queryset)
+        field = queryset.model._meta.get_field(field_name)
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(f'{prefix}{field_name}', f'{prefix}id')
+
+        position = self.decode_cursor(request.query_params[self.cursor_query_param], field)
+        if position is not None:
+            value, pk = position
+            lookup = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{field_name}__{lookup}': value}) | Q(**{field_name: value, f'id__{lookup}': pk})
+            )
+
+        # 多取一筆判斷是否還有下一頁
+        rows = list(queryset[:page_size + 1])
+        page = rows[:page_size]
+        self.next_position = None
+        if len(rows) > page_size:
+            last = page[-1]
+            self.next_position = (field.value_to_string(last), last.pk)
+        return page
+
+    @staticmethod
+    def get_ordering(queryset) -> Tuple[str, bool]:
+        """取 queryset 的第一個排序欄位作為游標欄位，未排序時使用 created_at 由新到舊"""
+        ordering = queryset.query.order_by or ('-created_at',)
+        first = ordering[0]
+        return first.lstrip('-'), first.startswith('-')
+
+    def decode_cursor(self, cursor: str, field) -> Optional[Tuple]:
+        if not cursor:
+            return None
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            return field.to_python(value), int(pk)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def encode_cursor(position: Tuple) -> str:
+        return base64.urlsafe_b64encode(json.dumps(list(position)).encode()).decode()
+
+    @property
+    def total_count(self) -> Optional[int]:
+        """頁碼分頁時的總筆數（沿用分頁已查詢的 COUNT），游標分頁時為 None"""
+        if self.cursor_mode:
+            return None
+        return self.page.paginator.count
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data,
+        })
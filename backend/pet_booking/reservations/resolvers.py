@@ -0,0 +1,92 @@
+# origin
+from typing import Dict, Iterable, Optional, Tuple
+
+# third-party
+from django.db.models import Q
+
+# app
+from pet_booking.customers.models import CustomersProfile, Pet
+
+
+class CustomerPetResolver:
+    """批次解析預約的顧客與寵物：以兩次 IN 查詢取代逐筆的顧客與寵物查詢
+
+    已寫入 user_id / pet_id 外鍵的預約直接使用外鍵（建議搭配 select_related('pet_id')），
+    只有舊資料才以 (user_name, user_phone) 與 (user_id, pet_name) 字串比對。
+    """
+
+    def __init__(self, reservations: Iterable = ()):
+        self.user_ids: Dict[Tuple[str, str], str] = {}
+        self.pets: Dict[Tuple[str, str], Dict] = {}
+        self.load([
+            (reservation.user_name, reservation.user_phone, reservation.pet_name)
+            for reservation in reservations
+            if reservation.user_id_id is None or reservation.pet_id_id is None
+        ])
+
+    def load(self, keys: Iterable[Tuple[str, str, str]]):
+        """載入 (user_name, user_phone, pet_name) 對應的會員與寵物"""
+        keys = list(keys)
+        customer_keys = {(user_name, user_phone) for user_name, user_phone, _ in keys}
+        if not customer_keys:
+            return
+
+        # phone 為唯一值，以電話查詢後再比對姓名
+        profiles = CustomersProfile.objects.filter(
+            phone__in={phone for _, phone in customer_keys}
+        ).values_list('full_name', 'phone', 'user_id')
+        for full_name, phone, user_id in profiles:
+            if (full_name, phone) in customer_keys:
+                self.user_ids[(full_name, phone)] = user_id
+
+        pet_keys = {
+            (self.user_ids[(user_name, user_phone)], pet_name)
+            for user_name, user_phone, pet_name in keys
+            if (user_name, user_phone) in self.user_ids
+        }
+        if not pet_keys:
+            return
+
+        pets = Pet.objects.filter(
+            user_id__in={user_id for user_id, _ in pet_keys},
+            name__in={pet_name for _, pet_name in pet_keys}
+        ).order_by('id').values('id', 'user_id', 'name', 'breed', 'size')
+        for pet in pets:
+            key = (pet['user_id'], pet['name'])
+            if key in pet_keys:
+                self.pets.setdefault(key, pet)
+
+    def lookup(self, user_name: str, user_phone: str, pet_name: str) -> Tuple[Optional[str], Optional[Dict]]:
+        """以字串欄位查詢 (會員 user_id, 寵物資料)"""
+        user_id = self.user_ids.get((user_name, user_phone))
+        if user_id is None:
+            return None, None
+        return user_id, self.pets.get((user_id, pet_name))
+
+    def user_id(self, reservation) -> Optional[str]:
+        """預約顧客的 user_id，現場預約等無會員資料時回傳 None"""
+        if reservation.user_id_id is not None:
+            return reservation.user_id_id
+        return self.lookup(reservation.user_name, reservation.user_phone, reservation.pet_name)[0]
+
+    def pet(self, reservation) -> Optional[Dict]:
+        """預約寵物的 breed / size"""
+        if reservation.pet_id_id is not None:
+            pet = reservation.pet_id
+            return {'id': pet.id, 'user_id': pet.user_id_id, 'name': pet.name, 'breed': pet.breed, 'size': pet.size}
+        return self.lookup(reservation.user_name, reservation.user_phone, reservation.pet_name)[1]
+
+
+def resolve_customer_pet(user_name: str, user_phone: str, pet_name: str) -> Tuple[Optional[str], Optional[int]]:
+    """店家端預約以姓名與電話對應會員，回傳 (user_id, pet 主鍵)"""
+    resolver = CustomerPetResolver()
+    resolver.load([(user_name, user_phone, pet_name)])
+    user_id, pet = resolver.lookup(user_name, user_phone, pet_name)
+    return user_id, pet['id'] if pet else None
+
+
+def store_reservations(queryset, store):
+    """店家的預約：以 store_id 外鍵為準，尚未回填外鍵的舊資料以 store_name 比對"""
+    return queryset.filter(
+        Q(store_id=store) | Q(store_id__isnull=True, store_name=store.store_name)
+    )
@@ -0,0 +1,91 @@
+# origin
+from datetime import date
+from functools import partial
+from typing import Dict, Optional, Tuple
+
+# third-party
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+# app
+from pet_booking.stores.models import Store
+from .events import build_event, publish_reservation_event
+from .models import STATUS_CHOICES, ReservationBoarding, ReservationGrooming, StoreDailyStats
+
+
+STATUSES = tuple(value for value, _ in STATUS_CHOICES)
+# 各服務類型的預約模型與統計日期欄位
+SERVICE_MODELS = (
+    ('grooming', 'ReservationGrooming', 'reservation_time'),
+    ('boarding', 'ReservationBoarding', 'checkin_date'),
+)
+
+
+def reservation_key(reservation) -> Tuple[str, date]:
+    """預約所屬的 (服務類型, 統計日期)"""
+    if isinstance(reservation, ReservationGrooming):
+        return 'grooming', timezone.localtime(reservation.reservation_time).date()
+    return 'boarding', timezone.localtime(reservation.checkin_date).date()
+
+
+def get_daily_stats(store_pk: int, day: date, service_type: str) -> StoreDailyStats:
+    """以唯一鍵查詢當日統計，尚無資料時回傳全為 0 的未儲存物件"""
+    stats = StoreDailyStats.objects.filter(store_id=store_pk, date=day, service_type=service_type).first()
+    return stats or StoreDailyStats(store_id_id=store_pk, date=day, service_type=service_type)
+
+
+def record_status_change(reservation, old_status: Optional[str], new_status: str):
+    """預約建立（old_status 為 None）或狀態轉換時，以 F() 增減店家當日統計，並在交易提交後發布預約事件"""
+    store_pk = reservation.store_id_id
+    if store_pk is None:
+        store_pk = Store.objects.filter(store_name=reservation.store_name).values_list('id', flat=True).first()
+        if store_pk is None:
+            return
+
+    service_type, day = reservation_key(reservation)
+    changes = {new_status: F(new_status) + 1}
+    if old_status:
+        changes[old_status] = F(old_status) - 1
+    if new_status == 'finished':
+        changes['revenue'] = F('revenue') + reservation.total_price
+
+    with transaction.atomic():
+        StoreDailyStats.objects.get_or_create(store_id_id=store_pk, date=day, service_type=service_type)
+        StoreDailyStats.objects.filter(
+            store_id=store_pk, date=day, service_type=service_type
+        ).update(**changes)
+        transaction.on_commit(partial(
+            publish_reservation_event, store_pk, build_event(reservation, service_type, new_status)
+        ))
+
+
+def rebuild_daily_stats(apps=global_apps) -> int:
+    """由預約資料重新計算所有店家每日統計，回傳統計筆數"""
+    Store = apps.get_model('stores', 'Store')
+    StoreDailyStats = apps.get_model('reservations', 'StoreDailyStats')
+    store_ids = dict(Store.objects.values_list('store_name', 'id'))
+    rows: Dict[Tuple[int, date, str], StoreDailyStats] = {}
+    for service_type, model_name, date_field in SERVICE_MODELS:
+        groups = apps.get_model('reservations', model_name).objects.annotate(
+            day=TruncDate(date_field)
+        ).values('store_id', 'store_name', 'day', 'status').annotate(
+            count=Count('id'),
+            revenue=Sum('total_price')
+        ).order_by()
+        for group in groups:
+            store_pk = group['store_id'] or store_ids.get(group['store_name'])
+            if store_pk is None or group['status'] not in STATUSES:
+                continue
+            key = (store_pk, group['day'], service_type)
+            stats = rows.setdefault(key, StoreDailyStats(store_id_id=store_pk, date=group['day'], service_type=service_type))
+            setattr(stats, group['status'], getattr(stats, group['status']) + group['count'])
+            if group['status'] == 'finished':
+                stats.revenue += group['revenue'] or 0
+
+    with transaction.atomic():
+        StoreDailyStats.objects.all().delete()
+        StoreDailyStats.objects.bulk_create(rows.values())
+    return len(rows)
@@ -0,0 +1,157 @@
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from pet_booking.services.models import GroomingService, GroomingServicePricing
+from pet_booking.stores.models import Store
+from pet_booking.test_fixtures import api_client, create_store
+from pet_booking.users.models import User
+from .availability import (
+    GroomingDayAvailability, GroomingRangeAvailability, build_mask, closed_weekdays, occupied_slots
+)
+from .models import GroomingSchedules, ReservationGrooming
+
+
+class GroomingDayAvailabilityTestCase(SimpleTestCase):
+    """美容時段 bitmap 測試"""
+
+    def setUp(self):
+        # 10:00 ~ 11:00 已被預約
+        occupied = occupied_slots(time(10, 0), 60)
+        self.day = GroomingDayAvailability('Test Store', date(2025, 9, 1), build_mask(occupied))
+
+    def test_occupied_slots_round_up_partial_slot(self):
+        self.assertEqual(occupied_slots(time(9, 0), 50), [time(9, 0), time(9, 15), time(9, 30), time(9, 45)])
+
+    def test_is_free(self):
+        self.assertTrue(self.day.is_free(time(9, 0), 60))
+        self.assertFalse(self.day.is_free(time(9, 30), 45))
+        self.assertFalse(self.day.is_free(time(10, 45), 15))
+        self.assertTrue(self.day.is_free(time(11, 0), 30))
+
+    def test_is_free_rejects_overflow_past_midnight(self):
+        self.assertFalse(self.day.is_free(time(23, 30), 60))
+
+    def test_free_starts_within_business_hours(self):
+        starts = self.day.free_starts(60, time(9, 0), time(12, 0))
+        self.assertEqual(starts, [time(9, 0), time(11, 0)])
+
+
+class GroomingRangeAvailabilityTestCase(SimpleTestCase):
+    """美容多日時段 bitmap 測試"""
+
+    def test_closed_weekdays(self):
+        self.assertEqual(closed_weekdays(['星期一', '星期日']), {0, 6})
+        self.assertEqual(closed_weekdays('[1, 7]'), {0, 6})
+
+    def test_free_starts_across_days(self):
+        # 2025-09-01 為星期一
+        occupied = {date(2025, 9, 2): build_mask(occupied_slots(time(9, 0), 120))}
+        availability = GroomingRangeAvailability('Test Store', date(2025, 9, 1), date(2025, 9, 3), occupied)
+
+        free_starts = availability.free_starts(60, time(9, 0), time(11, 0), ['星期一'])
+
+        self.assertEqual(free_starts[date(2025, 9, 1)], [])
+        self.assertEqual(free_starts[date(2025, 9, 2)], [])
+        self.assertEqual(free_starts[date(2025, 9, 3)], [time(9, 0), time(9, 15), time(9, 30), time(9, 45), time(10, 0)])
+
+    def test_free_starts_do_not_cross_midnight(self):
+        availability = GroomingRangeAvailability('Test Store', date(2025, 9, 1), date(2025, 9, 2))
+        free_starts = availability.free_starts(60)
+        self.assertEqual(free_starts[date(2025, 9, 1)][-1], time(23, 0))
+
+
+class AvailableTimesApiTestCase(TestCase):
+    """美容可預約起始時間 API 測試"""
+
+    def setUp(self):
+        cache.clear()
+        self.store = create_store(daily_opening_time=time(9, 0), daily_closing_hours=time(18, 0), close_day=['星期一'])
+        for species, service_title, pricing, duration in [('dog', '洗澡', 500, 60), ('dog', '剪毛', 800, 90),
+                                                          ('cat', '洗澡', 600, 30)]:
+            service = GroomingService.objects.create(
+                store_id=self.store, species=species, service_title=service_title, introduction=''
+            )
+            GroomingServicePricing.objects.create(
+                grooming_service_id=service, pet_size='small', fur_amount='short', pricing=pricing,
+                grooming_duration=duration
+            )
+        self.client = api_client(User.objects.create(username='member', role='member', user_id='M1'))
+        today = timezone.localdate()
+        # 下一個星期一（公休）與星期二
+        self.monday = today + timedelta(days=7 - today.weekday())
+        self.tuesday = self.monday + timedelta(days=1)
+
+    def available_times(self, query='', species='dog', services='洗澡'):
+        return self.client.get(
+            f'/api/grooming/reservation/available_times?store_id=S1&species={species}&pet_size=small'
+            f'&fur_amount=short&selected_services={services}{query}'
+        )
+
+    def test_closed_weekday_has_no_times(self):
+        response = self.available_times(f'&start_date={self.monday}&end_date={self.tuesday}')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        times = response.data['available_times']
+        self.assertEqual(times[self.monday.isoformat()], [])
+        self.assertEqual(times[self.tuesday.isoformat()][0], '09:00')
+        self.assertEqual(times[self.tuesday.isoformat()][-1], '17:00')
+
+    def test_duration_from_selected_services_and_species(self):
+        reservation = ReservationGrooming.objects.create(
+            reservation_id='GR1', store_name='Test Store', user_name='Amy', user_phone='0900000001', pet_name='Bobo',
+            pet_type='dog', pet_size='small', total_price=500, grooming_period=60, store_id=self.store,
+            reservation_time=timezone.make_aware(datetime.combine(self.tuesday, time(10, 0)))
+        )
+        GroomingSchedules.objects.bulk_create(
+            GroomingSchedules(
+                store_name='Test Store', date=self.tuesday, unavailable_time=slot, reservation_grooming_id=reservation
+            )
+            for slot in occupied_slots(time(10, 0), 60)
+        )
+        query = f'&start_date={self.tuesday}&end_date={self.tuesday}'
+
+        response = self.available_times(query, services='洗澡,剪毛')
+        self.assertEqual(response.data['grooming_duration'], 150)
+        # 150 分鐘的服務無法在 10:00 前完成，最晚 15:30 開始
+        times = response.data['available_times'][self.tuesday.isoformat()]
+        self.assertEqual((times[0], times[-1]), ('11:00', '15:30'))
+
+        response = self.available_times(query, species='cat')
+        self.assertEqual(response.data['grooming_duration'], 30)
+        self.assertIn('09:30', response.data['available_times'][self.tuesday.isoformat()])
+        self.assertEqual(self.available_times(query, species='cat', services='剪毛').status_code, 404)
+
+    def test_past_slots_filtered_today(self):
+        Store.objects.filter(pk=self.store.pk).update(close_day=None)
+        now = timezone.make_aware(datetime.combine(timezone.localdate(), time(12, 5)))
+        with mock.patch('django.utils.timezone.localtime', return_value=now):
+            response = self.available_times()
+
+        self.assertEqual(response.status_code, 200, response.data)
+        today = now.date()
+        self.assertEqual(response.data['start_date'], today)
+        self.assertEqual(response.data['end_date'], today + timedelta(days=29))
+        self.assertEqual(response.data['available_times'][today.isoformat()][0], '12:15')
+        self.assertEqual(response.data['available_times'][(today + timedelta(days=1)).isoformat()][0], '09:00')
+
+    def test_past_start_date_clipped_to_today(self):
+        today = timezone.localdate()
+        response = self.available_times(f'&start_date=2000-01-01&end_date={today + timedelta(days=1)}')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['start_date'], today)
+        self.assertEqual(len(response.data['available_times']), 2)
+
+    def test_invalid_range(self):
+        today = timezone.localdate()
+        for query in (f'&start_date={today}&end_date={today + timedelta(days=30)}',
+                      f'&start_date={self.tuesday}&end_date={self.monday}',
+                      '&start_date=2000-01-01&end_date=2000-01-02',
+                      '&start_date=20250101'):
+            with self.subTest(query=query):
+                self.assertEqual(self.available_times(query).status_code, 400)
+        self.assertEqual(self.client.get('/api/grooming/reservation/available_times?store_id=S1').status_code, 400)
@@ -0,0 +1,137 @@
+from datetime import date, datetime, time, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from pet_booking.services.models import GroomingService, GroomingServicePricing
+from pet_booking.stores.models import Store
+from pet_booking.users.models import User
+from .availability import occupied_slots
+from .earliest import EarliestGroomingSearch
+from .models import GroomingSchedules, ReservationGrooming
+
+
+class EarliestAvailableTestCase(TestCase):
+    """最早可預約店家查詢測試"""
+
+    def setUp(self):
+        cache.clear()
+        member = User.objects.create(username='member', role='member', user_id='M1')
+        self.client = APIClient()
+        self.client.force_authenticate(member)
+        self.day = timezone.localdate() + timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.stores = [
+                self.create_store(1, '大安區', 500, opening=time(9, 0)),
+                self.create_store(2, '大安區', 400, opening=time(10, 0)),
+                self.create_store(3, '信義區', 300, opening=time(9, 0)),
+                # 只提供貓的美容服務
+                self.create_store(4, '大安區', 100, opening=time(8, 0), species='cat'),
+            ]
+
+    def create_store(self, index, district, pricing, opening, species='dog'):
+        owner = User.objects.create(username=f'owner{index}', role='store', user_id=f'S{index}')
+        store = Store.objects.create(
+            user_id=owner, store_name=f'Store {index}', owner_name='Owner', email=f'store{index}@example.com',
+            phone='0912345678', address={'county': '臺北市', 'district': district}, status='confirmed',
+            grooming_service=True, daily_opening_time=opening, daily_closing_hours=time(18, 0)
+        )
+        service = GroomingService.objects.create(store_id=store, species=species, service_title='洗澡', introduction='')
+        GroomingServicePricing.objects.create(
+            grooming_service_id=service, pet_size='small', fur_amount='short', pricing=pricing, grooming_duration=60
+        )
+        return store
+
+    def occupy(self, store, start, duration):
+        reservation = ReservationGrooming.objects.create(
+            reservation_id='GR1', store_name=store.store_name, user_name='Amy', user_phone='0900000001', pet_name='Bobo',
+            pet_type='dog', pet_size='small', total_price=500, grooming_period=duration, store_id=store,
+            reservation_time=timezone.make_aware(datetime.combine(self.day, start))
+        )
+        GroomingSchedules.objects.bulk_create(
+            GroomingSchedules(
+                store_name=store.store_name, date=self.day, unavailable_time=slot, reservation_grooming_id=reservation
+            )
+            for slot in occupied_slots(start, duration)
+        )
+
+    def earliest(self, query=''):
+        response = self.client.get(
+            '/api/grooming/reservation/earliest_available?species=dog&pet_size=small&fur_amount=short'
+            f'&selected_services=洗澡&county=臺北市&start_date={self.day}&end_date={self.day + timedelta(days=2)}{query}'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return [(store['store_id'], store['earliest_date'], store['earliest_time']) for store in response.data['results']]
+
+    def test_ranked_by_earliest_start_then_price(self):
+        day = self.day.isoformat()
+        self.assertEqual(self.earliest(), [('S3', day, '09:00'), ('S1', day, '09:00'), ('S2', day, '10:00')])
+
+        # S3 早上已被預約到 10:30，改由 S1 最早
+        self.occupy(self.stores[2], time(9, 0), 90)
+        self.assertEqual(self.earliest(), [('S1', day, '09:00'), ('S2', day, '10:00'), ('S3', day, '10:30')])
+
+    def test_area_and_time_window(self):
+        day = self.day.isoformat()
+        self.assertEqual(self.earliest('&district=信義區'), [('S3', day, '09:00')])
+        self.assertEqual(
+            self.earliest('&earliest_time=10:30&latest_time=12:00'),
+            [('S3', day, '10:30'), ('S2', day, '10:30'), ('S1', day, '10:30')]
+        )
+        # 服務需在指定時段內結束
+        self.assertEqual(self.earliest('&earliest_time=17:30'), [])
+
+    def test_excludes_stores_without_matching_pricing(self):
+        response = self.client.get(
+            '/api/grooming/reservation/earliest_available?species=dog&pet_size=large&fur_amount=short'
+            '&selected_services=洗澡&county=臺北市'
+        )
+        self.assertEqual(response.data['results'], [])
+
+    def test_invalid_parameters(self):
+        base = '/api/grooming/reservation/earliest_available?species=dog&pet_size=small&fur_amount=short&selected_services=洗澡'
+        for query in ('', '&county=臺北市&earliest_time=9點', '&county=臺北市&earliest_time=12:00&latest_time=10:00',
+                      '&county=臺北市&limit=abc', '&county=臺北市&start_date=2025-01-01&end_date=2025-03-01'):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(base + query).status_code, 400)
+
+    def test_query_count_independent_of_candidate_count(self):
+        # 候選店家、價目表（快取未命中）、時段佔用各一次查詢
+        for district in ('&district=信義區', ''):
+            cache.clear()
+            with self.assertNumQueries(3):
+                self.earliest(district)
+
+    def test_quotes_price_for_requested_species(self):
+        # S1 同時提供狗與貓的「洗澡」，貓的價格與時長不同
+        with self.captureOnCommitCallbacks(execute=True):
+            cat_bath = GroomingService.objects.create(
+                store_id=self.stores[0], species='cat', service_title='洗澡', introduction=''
+            )
+            GroomingServicePricing.objects.create(
+                grooming_service_id=cat_bath, pet_size='small', fur_amount='short', pricing=700, grooming_duration=90
+            )
+        cache.clear()
+        response = self.client.get(
+            '/api/grooming/reservation/earliest_available?species=cat&pet_size=small&fur_amount=short'
+            f'&selected_services=洗澡&county=臺北市&start_date={self.day}&end_date={self.day}'
+        )
+        self.assertEqual(
+            [(store['store_id'], store['total_price'], store['grooming_duration']) for store in response.data['results']],
+            [('S4', 100, 60), ('S1', 700, 90)]
+        )
+        dog_prices = {
+            store['store_id']: store['total_price'] for store in self.client.get(
+                '/api/grooming/reservation/earliest_available?species=dog&pet_size=small&fur_amount=short'
+                f'&selected_services=洗澡&county=臺北市&start_date={self.day}&end_date={self.day}'
+            ).data['results']
+        }
+        self.assertEqual(dog_prices['S1'], 500)
+
+    def test_skips_past_slots_today(self):
+        now = timezone.make_aware(datetime.combine(self.day, time(12, 5)))
+        results = EarliestGroomingSearch(['洗澡'], 'dog', 'small', 'short', self.day, self.day, now).run(self.stores[:1])
+        self.assertEqual(results[0]['start'], datetime.combine(self.day, time(12, 15)))
+        self.assertEqual(EarliestGroomingSearch(['洗澡'], 'dog', 'small', 'short', date(2000, 1, 1), date(2000, 1, 1), now).run([]), [])
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import threading
+from datetime import datetime, time, timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from pet_booking.test_fixtures import api_client, create_store
+from pet_booking.users.models import User
+from .events import InProcessBroker, ReservationEventBroker, get_broker, publish_reservation_event, stream_events
+from .models import ReservationGrooming
+
+
+class RecordingBroker(InProcessBroker):
+    """測試用：記錄所有發布的事件"""
+    events = []
+
+    def publish(self, store_pk, event):
+        self.events.append((store_pk, event))
+        super().publish(store_pk, event)
+
+
+class InProcessBrokerTestCase(SimpleTestCase):
+    """單一程序 pub/sub 測試"""
+
+    def test_broker_interface_is_abstract(self):
+        class PublishOnlyBroker(ReservationEventBroker):
+            def publish(self, store_pk, event):
+                pass
+
+        with self.assertRaises(TypeError):
+            PublishOnlyBroker()
+        self.assertIsInstance(InProcessBroker(), ReservationEventBroker)
+
+    def test_publish_from_other_thread(self):
+        broker = InProcessBroker()
+
+        async def receive():
+            async with broker.subscribe(1) as subscription:
+                thread = threading.Thread(target=broker.publish, args=(1, {'type': 'created'}))
+                thread.start()
+                broker.publish(2, {'type': 'other store'})
+                event = await asyncio.wait_for(subscription.get(), 1)
+                thread.join()
+                return event, subscription.qsize()
+
+        self.assertEqual(asyncio.run(receive()), ({'type': 'created'}, 0))
+        self.assertEqual(broker.subscribers, {})
+
+    def test_slow_subscriber_drops_events(self):
+        broker = InProcessBroker(max_queue_size=2)
+
+        async def receive():
+            async with broker.subscribe(1) as subscription:
+                for index in range(5):
+                    broker.publish(1, {'index': index})
+                await asyncio.sleep(0)
+                return [subscription.get_nowait()['index'] for _ in range(subscription.qsize())]
+
+        self.assertEqual(asyncio.run(receive()), [0, 1])
+
+
+class ReservationEventStreamTestCase(TestCase):
+    """店家預約事件串流測試"""
+
+    def setUp(self):
+        get_broker.cache_clear()
+        self.addCleanup(get_broker.cache_clear)
+        self.store = create_store(daily_opening_time=time(9, 0), daily_closing_hours=time(18, 0))
+        self.owner = self.store.user_id
+
+    async def test_stream_pushes_store_events(self):
+        await sync_to_async(self.async_client.force_login)(self.owner)
+        # streaming_content 為層層包裝的產生器，關閉外層不會關閉 stream_events，需另外取得以結束訂閱
+        generators = []
+
+        def capture_stream(*args):
+            generators.append(stream_events(*args))
+            return generators[-1]
+
+        with mock.patch('pet_booking.reservations.views.reservation_events.stream_events', capture_stream):
+            response = await self.async_client.get('/api/reservations/events')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+
+        event = {'type': 'confirmed', 'service_type': 'grooming', 'reservation_id': 'GR1', 'status': 'confirmed'}
+        await sync_to_async(publish_reservation_event)(self.store.pk, event)
+        chunk = (await asyncio.wait_for(anext(stream), 1)).decode()
+        name, data = chunk.strip().split('\n')
+        self.assertEqual(name, 'event: reservation.confirmed')
+        self.assertEqual(json.loads(data.removeprefix('data: ')), event)
+        await stream.aclose()
+        await generators[0].aclose()
+        self.assertEqual(get_broker().subscribers, {})
+
+    async def test_stream_requires_store_owner(self):
+        response = await self.async_client.get('/api/reservations/events')
+        self.assertEqual(response.status_code, 401)
+
+        member = await User.objects.acreate(username='member', role='member', user_id='M1')
+        await sync_to_async(self.async_client.force_login)(member)
+        response = await self.async_client.get('/api/reservations/events')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(RESERVATION_EVENT_BROKER='pet_booking.reservations.test_events.RecordingBroker')
+    def test_transitions_publish_after_commit(self):
+        RecordingBroker.events = []
+        ReservationGrooming.objects.create(
+            reservation_id='GR1', store_name='Test Store', user_name='Amy', user_phone='0900000001', pet_name='Bobo',
+            pet_type='dog', pet_size='small', total_price=500, grooming_period=60, store_id=self.store,
+            reservation_time=timezone.make_aware(datetime(2030, 1, 1, 10)) + timedelta(hours=1)
+        )
+        client = api_client(self.owner)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            client.patch('/api/reservations/grooming/actions/confirm', {'reservation_id': 'GR1'}, format='json')
+            self.assertEqual(RecordingBroker.events, [])
+        with self.captureOnCommitCallbacks(execute=True):
+            client.patch('/api/reservations/grooming/actions/cancel-confirmed', {'reservation_id': 'GR1'}, format='json')
+
+        self.assertEqual(
+            [(store_pk, event['type'], event['reservation_id']) for store_pk, event in RecordingBroker.events],
+            [(self.store.pk, 'confirmed', 'GR1'), (self.store.pk, 'cancelled', 'GR1')]
+        )
@@ -0,0 +1,70 @@
+import multiprocessing
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from . import identifiers
+from .identifiers import MAX_SEQUENCE, ReservationIdGenerator, reservation_ids
+from .views.create_reservations import create_reservation_id
+
+
+STRESS_PROCESSES = 4
+STRESS_IDS_PER_PROCESS = 10000
+
+
+def generate_batch(count):
+    """子程序：沿用 fork 前的產生器產生編號"""
+    return [reservation_ids.generate('GR') for _ in range(count)]
+
+
+class ReservationIdGeneratorTestCase(SimpleTestCase):
+    """預約編號產生器測試"""
+
+    def test_format(self):
+        grooming_id = create_reservation_id('grooming')
+        self.assertEqual(len(grooming_id), 20)
+        self.assertTrue(grooming_id.startswith('GR'))
+        self.assertTrue(create_reservation_id('boarding').startswith('BD'))
+        self.assertTrue(set(grooming_id[2:]) <= set(identifiers.ALPHABET))
+        with self.assertRaises(ValueError):
+            create_reservation_id('daycare')
+
+    def test_monotonic_and_after_legacy_ids(self):
+        ids = [reservation_ids.generate('GR') for _ in range(20000)]
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids, sorted(ids))
+        # 舊格式：GR + 年月日時分秒 + 4 位微秒
+        self.assertLess('GR999912312359599999', ids[0])
+
+        time.sleep(0.002)
+        self.assertLess(ids[-1], reservation_ids.generate('GR'))
+
+    def test_sequence_overflow_and_clock_rollback(self):
+        generator = ReservationIdGenerator(machine_id=1)
+        with mock.patch.object(identifiers, 'current_millis', return_value=1000):
+            ids = [generator.generate('BD') for _ in range(MAX_SEQUENCE + 2)]
+        with mock.patch.object(identifiers, 'current_millis', return_value=500):
+            ids.append(generator.generate('BD'))
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids, sorted(ids))
+
+    def test_machine_id_distinguishes_nodes(self):
+        with mock.patch.object(identifiers, 'current_millis', return_value=1000):
+            first = ReservationIdGenerator(machine_id=1).generate('GR')
+            second = ReservationIdGenerator(machine_id=2).generate('GR')
+        self.assertNotEqual(first, second)
+
+    def test_multi_process_stress(self):
+        """多程序同時產生：零碰撞，各程序內依序遞增"""
+        reservation_ids.generate('GR')
+        context = multiprocessing.get_context('fork')
+        with context.Pool(STRESS_PROCESSES) as pool:
+            batches = pool.map(generate_batch, [STRESS_IDS_PER_PROCESS] * STRESS_PROCESSES)
+
+        all_ids = [reservation_id for ids in batches for reservation_id in ids]
+        self.assertEqual(len(all_ids), STRESS_PROCESSES * STRESS_IDS_PER_PROCESS)
+        self.assertEqual(len(set(all_ids)), len(all_ids))
+        self.assertEqual(len({reservation_id[11:17] for reservation_id in all_ids}), STRESS_PROCESSES)
+        for ids in batches:
+            self.assertEqual(ids, sorted(ids))
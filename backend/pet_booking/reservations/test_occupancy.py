@@ -0,0 +1,161 @@
+from datetime import date, datetime
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from pet_booking.customers.models import CustomersProfile, Pet
+from pet_booking.services.models import BoardingService, BoardingServicePricing
+from pet_booking.test_fixtures import api_client, create_store
+from pet_booking.users.models import User
+from .models import ReservationBoarding
+from .occupancy import BoardingCalendar, BoardingOccupancy, room_capacity
+
+
+class BoardingOccupancyTestCase(SimpleTestCase):
+    """住宿佔用掃描線測試"""
+
+    def setUp(self):
+        self.occupancy = BoardingOccupancy([
+            (datetime(2025, 9, 1, 14), datetime(2025, 9, 3, 11)),
+            (datetime(2025, 9, 2, 14), datetime(2025, 9, 5, 11)),
+            (datetime(2025, 9, 3, 11), datetime(2025, 9, 4, 11)),
+        ])
+
+    def test_peak_counts_overlapping_stays(self):
+        occupied, peak_at = self.occupancy.peak(datetime(2025, 9, 1), datetime(2025, 9, 10))
+        self.assertEqual(occupied, 2)
+        self.assertEqual(peak_at.replace(tzinfo=None), datetime(2025, 9, 2, 14))
+
+    def test_checkout_and_checkin_at_same_time_do_not_overlap(self):
+        self.assertEqual(self.occupancy.max_occupancy(datetime(2025, 9, 3, 11), datetime(2025, 9, 3, 12)), 2)
+        self.assertEqual(self.occupancy.max_occupancy(datetime(2025, 9, 5, 11), datetime(2025, 9, 6)), 0)
+
+
+class BoardingCalendarTestCase(SimpleTestCase):
+    """住宿每日佔用前綴和測試"""
+
+    def test_daily_usage_is_clipped_to_range(self):
+        calendar = BoardingCalendar(date(2025, 9, 1), date(2025, 9, 5), [
+            ('dog', 'Std', date(2025, 8, 30), date(2025, 9, 2)),
+            ('dog', 'Std', date(2025, 9, 2), date(2025, 9, 3)),
+            ('dog', 'Std', date(2025, 9, 5), date(2025, 9, 9)),
+            ('cat', 'Cat', date(2025, 9, 4), date(2025, 9, 4)),
+        ])
+        self.assertEqual(calendar.used('Std', 'dog'), [1, 2, 1, 0, 1])
+        self.assertEqual(calendar.remaining('Std', 2, 'dog'), [1, 0, 1, 2, 1])
+        self.assertEqual(calendar.used('Cat', 'cat'), [0, 0, 0, 1, 0])
+        self.assertEqual(calendar.used('Deluxe', 'dog'), [0, 0, 0, 0, 0])
+
+    def test_usage_keyed_by_species_and_room_type(self):
+        calendar = BoardingCalendar(date(2025, 9, 1), date(2025, 9, 3), [
+            ('dog', 'Std', date(2025, 9, 1), date(2025, 9, 1)),
+            ('cat', 'Std', date(2025, 9, 2), date(2025, 9, 2)),
+            # 未關聯寵物，物種未知
+            (None, 'Std', date(2025, 9, 3), date(2025, 9, 3)),
+        ])
+        self.assertEqual(calendar.used('Std', 'dog'), [1, 0, 1])
+        self.assertEqual(calendar.used('Std', 'cat'), [0, 1, 1])
+        self.assertEqual(calendar.used('Std'), [1, 1, 1])
+
+    def test_room_capacity(self):
+        self.assertEqual(room_capacity('cat', 3, 2), 6)
+        self.assertEqual(room_capacity('dog', 3, 2), 3)
+
+
+class BoardingCalendarApiTestCase(TestCase):
+    """住宿月曆 API 測試"""
+
+    def setUp(self):
+        self.store = create_store()
+        owner = self.store.user_id
+        # 狗與貓各有一個同名的 Standard 房型
+        BoardingService.objects.create(
+            store_id=self.store, species='dog', cleaning_frequency='daily', room_type='Standard', room_count=2,
+            pet_available_amount=1
+        )
+        BoardingService.objects.create(
+            store_id=self.store, species='cat', cleaning_frequency='daily', room_type='Standard', room_count=1,
+            pet_available_amount=3
+        )
+        member = User.objects.create(username='member', role='member', user_id='M1')
+        dog = Pet.objects.create(user_id=member, species='dog', name='Bobo', gender='male', size='small', fur_amount='short')
+        cat = Pet.objects.create(user_id=member, species='cat', name='Mimi', gender='female', size='small', fur_amount='long')
+        for index, (pet, checkin_day, checkout_day, status) in enumerate([
+            (dog, 1, 2, 'confirmed'),
+            (cat, 2, 3, 'pending'),
+            # 店家代客建立、未關聯寵物的預約
+            (None, 3, 3, 'confirmed'),
+            (dog, 1, 4, 'cancelled'),
+        ]):
+            ReservationBoarding.objects.create(
+                reservation_id=f'BD{index}', store_name='Test Store', user_name='Amy', user_phone='0900000001',
+                pet_name='Bobo', room_type='Standard', boarding_durations=1, total_price=1000, status=status,
+                checkin_date=timezone.make_aware(datetime(2030, 1, checkin_day, 14)),
+                checkout_date=timezone.make_aware(datetime(2030, 1, checkout_day, 11)),
+                store_id=self.store, pet_id=pet
+            )
+        self.client = api_client(owner)
+
+    def test_calendar_by_species_and_room_type(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                '/api/reservations/boarding/availability/calendar?store_id=S1&start_date=2030-01-01&end_date=2030-01-04'
+            )
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['dates'], ['2030-01-01', '2030-01-02', '2030-01-03', '2030-01-04'])
+        rooms = {(room['species'], room['room_type']): room for room in response.data['room_types']}
+        self.assertEqual(rooms[('dog', 'Standard')]['used'], [1, 1, 1, 0])
+        self.assertEqual(rooms[('dog', 'Standard')]['remaining'], [1, 1, 1, 2])
+        self.assertEqual(rooms[('cat', 'Standard')]['capacity'], 3)
+        self.assertEqual(rooms[('cat', 'Standard')]['used'], [0, 1, 2, 0])
+        self.assertEqual(rooms[('cat', 'Standard')]['remaining'], [3, 2, 1, 3])
+
+    def test_invalid_range(self):
+        for query in ('', '?store_id=S1&start_date=2030-01-05&end_date=2030-01-01', '?store_id=S1&start_date=2030/01/01'):
+            with self.subTest(query=query):
+                self.assertEqual(
+                    self.client.get(f'/api/reservations/boarding/availability/calendar{query}').status_code, 400
+                )
+
+
+class BoardingReservationAvailabilityTestCase(TestCase):
+    """建立住宿預約時依 (物種, 房型) 與房型容量檢查空房"""
+
+    def setUp(self):
+        self.store = create_store()
+        # 狗房 1 間；貓房 1 間、每間可住 2 隻，兩者同名
+        for species, pet_available_amount in (('dog', 1), ('cat', 2)):
+            service = BoardingService.objects.create(
+                store_id=self.store, species=species, cleaning_frequency='daily', room_type='Standard', room_count=1,
+                pet_available_amount=pet_available_amount
+            )
+            BoardingServicePricing.objects.create(
+                boarding_service=service, duration=1, duration_unit='day', pricing=1000
+            )
+        member = User.objects.create(username='member', role='member', user_id='M1')
+        CustomersProfile.objects.create(user_id=member, full_name='Amy', phone='0900000001', email='m@example.com')
+        for name, species in (('Bobo', 'dog'), ('Lucky', 'dog'), ('Mimi', 'cat'), ('Kiki', 'cat'), ('Coco', 'cat')):
+            Pet.objects.create(user_id=member, species=species, name=name, gender='male', size='small', fur_amount='short')
+        self.client = api_client(member)
+
+    def book(self, pet_name):
+        return self.client.post('/api/boarding/reservation/user?store_id=S1&service_type=boarding', {
+            'store_name': 'Test Store', 'pet_name': pet_name, 'room_type': 'Standard',
+            'check_in_date': '2030-01-01', 'check_in_time': '14:00',
+            'check_out_date': '2030-01-03', 'check_out_time': '11:00'
+        }, format='json')
+
+    def test_same_room_name_does_not_block_other_species(self):
+        self.assertEqual(self.book('Bobo').status_code, 201)
+        # 狗房已滿不影響同名貓房，貓房容量為房數 × 每房可住隻數
+        self.assertEqual(self.book('Mimi').status_code, 201)
+        self.assertEqual(self.book('Kiki').status_code, 201)
+
+        response = self.book('Coco')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('已額滿', response.data['error'])
+        self.assertEqual(self.book('Lucky').status_code, 400)
+        self.assertEqual(
+            sorted(ReservationBoarding.objects.values_list('pet_name', flat=True)), ['Bobo', 'Kiki', 'Mimi']
+        )
@@ -0,0 +1,77 @@
+from datetime import datetime, time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from pet_booking.customers.models import CustomersProfile, Pet
+from pet_booking.stores.models import Store
+from pet_booking.test_fixtures import api_client, create_store
+from pet_booking.users.models import User
+from .models import ReservationBoarding
+
+
+class BoardingOverviewQueryCountTestCase(TestCase):
+    """住宿預約總覽查詢次數測試"""
+
+    def setUp(self):
+        self.owner = create_store(daily_opening_time=time(9, 0), daily_closing_hours=time(18, 0)).user_id
+        self.client = api_client(self.owner)
+        self.count = 0
+
+    def add_reservations(self, count):
+        checkin = timezone.make_aware(datetime(2030, 1, 1, 14))
+        for _ in range(count):
+            self.count += 1
+            member = User.objects.create(username=f'member{self.count}', role='member', user_id=f'M{self.count}')
+            CustomersProfile.objects.create(
+                user_id=member, full_name=f'Amy{self.count}', phone=f'09{self.count:08d}', email=f'm{self.count}@example.com'
+            )
+            Pet.objects.create(user_id=member, species='dog', name='Bobo', gender='male', breed='柴犬', size='small', fur_amount='short')
+            for status in ('pending', 'confirmed'):
+                ReservationBoarding.objects.create(
+                    reservation_id=f'BD{self.count}{status}', store_name='Test Store', user_name=f'Amy{self.count}',
+                    user_phone=f'09{self.count:08d}', pet_name='Bobo', room_type='Standard', boarding_durations=1,
+                    status=status, total_price=1000, checkin_date=checkin, checkout_date=checkin + timedelta(days=1)
+                )
+        # 現場預約：無會員資料
+        ReservationBoarding.objects.create(
+            reservation_id=f'BDwalkin{self.count}', store_name='Test Store', user_name='Walk-in', user_phone='0200000000',
+            pet_name='Lucky', room_type='Standard', boarding_durations=1, status='pending', total_price=1000,
+            checkin_date=checkin, checkout_date=checkin + timedelta(days=1)
+        )
+
+    def test_query_count_independent_of_reservation_count(self):
+        for count in (1, 10):
+            self.add_reservations(count)
+            with self.assertNumQueries(5):
+                response = self.client.get('/api/reservations/boarding/overview')
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(response.data['confirmed_count'], 11)
+        breeds = {row['user_name']: row['pet_breed'] for row in response.data['pending_reservations']}
+        self.assertEqual(breeds['Amy1'], '柴犬')
+        self.assertIsNone(breeds['Walk-in'])
+
+    def test_backfill_links_legacy_reservations(self):
+        self.add_reservations(3)
+        call_command('backfill_reservation_links', chunk_size=2, stdout=StringIO())
+
+        store = Store.objects.get(store_name='Test Store')
+        linked = ReservationBoarding.objects.exclude(user_name='Walk-in')
+        self.assertFalse(linked.filter(store_id__isnull=True).exists())
+        self.assertEqual(
+            set(linked.values_list('user_id', 'pet_id__user_id')),
+            {(f'M{i}', f'M{i}') for i in range(1, 4)}
+        )
+        walk_in = ReservationBoarding.objects.get(user_name='Walk-in')
+        self.assertEqual(walk_in.store_id, store)
+        self.assertIsNone(walk_in.user_id)
+
+        # 回填後總覽改走外鍵，查詢次數不變
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/reservations/boarding/overview')
+        self.assertEqual(response.data['confirmed_count'], 3)
+        breeds = {row['user_name']: row['pet_breed'] for row in response.data['pending_reservations']}
+        self.assertEqual(breeds['Amy1'], '柴犬')
@@ -0,0 +1,91 @@
+from datetime import datetime, time, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from pet_booking.test_fixtures import api_client, create_store
+from .models import ReservationBoarding, ReservationGrooming
+
+
+class ReservationPaginationTestCase(TestCase):
+    """預約列表頁碼與游標分頁測試"""
+
+    def setUp(self):
+        self.store = create_store(daily_opening_time=time(9, 0), daily_closing_hours=time(18, 0))
+        self.owner = self.store.user_id
+        self.client = api_client(self.owner)
+
+        reservation_time = timezone.make_aware(datetime(2030, 1, 1, 10))
+        for index in range(12):
+            ReservationGrooming.objects.create(
+                reservation_id=f'GR{index:02d}', store_name='Test Store', user_name='Amy', user_phone='0900000001',
+                pet_name='Bobo', pet_type='dog', pet_size='small', total_price=500, grooming_period=60,
+                status='finished', reservation_time=reservation_time + timedelta(hours=index // 3)
+            )
+            ReservationBoarding.objects.create(
+                reservation_id=f'BD{index:02d}', store_name='Test Store', user_name='Amy', user_phone='0900000001',
+                pet_name='Bobo', room_type='Standard', boarding_durations=1, total_price=1000, status='pending',
+                checkin_date=reservation_time, checkout_date=reservation_time + timedelta(days=1)
+            )
+        # 建立時間相同時以 id 決定順序
+        created_at = timezone.make_aware(datetime(2029, 12, 1))
+        ReservationGrooming.objects.update(created_at=created_at)
+        ReservationBoarding.objects.update(created_at=created_at)
+
+    def collect(self, url):
+        """依 next 連結走完所有頁面，回傳 (預約編號, 每頁查詢)"""
+        reservation_ids, queries = [], []
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            queries.append([query['sql'] for query in context.captured_queries])
+            reservation_ids += [row['reservation_id'] for row in self.rows(response.data['results'])]
+            url = response.data['next']
+        return reservation_ids, queries
+
+    @staticmethod
+    def rows(results):
+        # 歷史紀錄以 results 回傳，待審核／近期預約以 reservations 回傳
+        return results.get('results', results.get('reservations'))
+
+    def test_page_number_mode_is_default(self):
+        response = self.client.get(f'/api/reservations/grooming/history?store_id={self.store.id}')
+        self.assertEqual(response.data['count'], 12)
+        self.assertEqual(len(response.data['results']['results']), 5)
+
+    def test_cursor_mode_walks_all_rows_without_count(self):
+        reservation_ids, queries = self.collect(f'/api/reservations/grooming/history?store_id={self.store.id}&cursor=')
+
+        expected = list(ReservationGrooming.objects.order_by('-created_at', '-id').values_list('reservation_id', flat=True))
+        self.assertEqual(reservation_ids, expected)
+        self.assertEqual(len(queries), 3)
+        for page_queries in queries:
+            self.assertFalse([sql for sql in page_queries if 'COUNT(' in sql])
+            self.assertFalse([sql for sql in page_queries if 'OFFSET' in sql])
+
+    def test_cursor_mode_follows_view_ordering(self):
+        reservation_ids, _ = self.collect(
+            f'/api/reservations/grooming/history?store_id={self.store.id}&cursor=&page_size=4'
+        )
+        self.assertEqual(len(reservation_ids), 12)
+
+        ReservationGrooming.objects.update(status='confirmed')
+        reservation_ids, _ = self.collect(f'/api/reservations/grooming/upcoming?store_id={self.store.id}&cursor=')
+        expected = list(ReservationGrooming.objects.order_by('reservation_time', 'id').values_list('reservation_id', flat=True))
+        self.assertEqual(reservation_ids, expected)
+
+    def test_boarding_pending_paginates(self):
+        response = self.client.get('/api/reservations/boarding/pending')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 12)
+        self.assertEqual(response.data['results']['total_count'], 12)
+
+        reservation_ids, _ = self.collect('/api/reservations/boarding/pending?cursor=')
+        self.assertEqual(len(set(reservation_ids)), 12)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f'/api/reservations/grooming/history?store_id={self.store.id}&cursor=bogus')
+        self.assertEqual(response.status_code, 404)
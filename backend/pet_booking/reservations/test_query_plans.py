@@ -0,0 +1,109 @@
+import re
+import unittest
+from datetime import time, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from pet_booking.customers.models import CustomersProfile, Pet
+from pet_booking.services.models import BoardingService
+from pet_booking.test_fixtures import api_client, create_store
+from pet_booking.users.models import User
+from .models import Orders, ReservationBoarding, ReservationGrooming
+
+
+# 需以索引查詢的資料表
+HOT_TABLES = (
+    'reservation_grooming', 'reservation_boarding', 'grooming_schedules', 'boarding_schedules', 'orders',
+    'store_daily_stats',
+)
+FULL_SCAN = re.compile(r'^SCAN (%s)\b' % '|'.join(HOT_TABLES))
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN 格式僅適用於 SQLite')
+class ManagementQueryPlanTestCase(TestCase):
+    """預約管理頁面的熱門查詢不可退化為全表掃描"""
+
+    def setUp(self):
+        self.store = create_store(daily_opening_time=time(9, 0), daily_closing_hours=time(18, 0))
+        self.owner = self.store.user_id
+        BoardingService.objects.create(
+            store_id=self.store, species='dog', cleaning_frequency='daily', room_type='Standard', room_count=2,
+            pet_available_amount=1
+        )
+        member = User.objects.create(username='member', role='member', user_id='M1')
+        CustomersProfile.objects.create(user_id=member, full_name='Amy', phone='0900000001', email='m@example.com')
+        pet = Pet.objects.create(
+            user_id=member, species='dog', name='Bobo', gender='male', breed='柴犬', size='small', fur_amount='short'
+        )
+
+        now = timezone.now()
+        for status in ('pending', 'confirmed', 'finished'):
+            grooming = ReservationGrooming.objects.create(
+                reservation_id=f'GR{status}', store_name='Test Store', user_name='Amy', user_phone='0900000001',
+                pet_name='Bobo', pet_type='dog', pet_size='small', reservation_time=now, total_price=500,
+                grooming_period=60, status=status
+            )
+            # 舊資料：未關聯外鍵
+            boarding = ReservationBoarding.objects.create(
+                reservation_id=f'BD{status}', store_name='Test Store', user_name='Amy', user_phone='0900000001',
+                pet_name='Bobo', room_type='Standard', checkin_date=now, checkout_date=now + timedelta(days=1),
+                boarding_durations=1, total_price=1000, status=status
+            )
+            if status == 'finished':
+                Orders.objects.create(reservation_grooming=grooming, user_id=member, total_price=500)
+                Orders.objects.create(reservation_boarding=boarding, user_id=member, total_price=1000)
+        ReservationBoarding.objects.create(
+            reservation_id='BDlinked', store_name='Test Store', user_name='Amy', user_phone='0900000001',
+            pet_name='Bobo', room_type='Standard', checkin_date=now, checkout_date=now + timedelta(days=1),
+            boarding_durations=1, total_price=1000, status='confirmed', store_id=self.store, user_id=member, pet_id=pet
+        )
+
+        self.client = api_client(self.owner)
+
+    def endpoints(self):
+        store_pk = self.store.id
+        return [
+            f'/api/reservations/grooming/today?store_id={store_pk}',
+            f'/api/reservations/grooming/overview?store_id={store_pk}',
+            f'/api/reservations/grooming/pending?store_id={store_pk}',
+            f'/api/reservations/grooming/upcoming?store_id={store_pk}',
+            '/api/reservations/grooming/details?reservation_id=GRconfirmed',
+            f'/api/reservations/grooming/history?store_id={store_pk}',
+            f'/api/reservations/grooming/history?store_id={store_pk}&cursor=',
+            f'/api/reservations/risk/grooming?store_id={store_pk}',
+            '/api/reservations/boarding/availability?store_id=S1',
+            '/api/reservations/boarding/availability/calendar?store_id=S1',
+            '/api/reservations/boarding/overview',
+            '/api/reservations/boarding/pending',
+            '/api/reservations/boarding/pending?cursor=',
+            '/api/reservations/boarding/upcoming',
+            '/api/reservations/boarding/details?reservation_id=BDconfirmed',
+            '/api/reservations/boarding/pending/detail?reservation_id=BDpending',
+            f'/api/reservations/boarding/history?store_id={store_pk}',
+            f'/api/reservations/risk/boarding?store_id={store_pk}',
+            '/api/reservations/details?reservation_id=BDfinished',
+        ]
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_hot_queries_use_indexes(self):
+        for url in self.endpoints():
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200, response.data)
+
+                selects = [
+                    query['sql'] for query in context.captured_queries
+                    if query['sql'].startswith('SELECT') and any(f'"{table}"' in query['sql'] for table in HOT_TABLES)
+                ]
+                self.assertTrue(selects)
+                for sql in selects:
+                    full_scans = [detail for detail in self.explain(sql) if FULL_SCAN.match(detail)]
+                    self.assertEqual(full_scans, [], sql)
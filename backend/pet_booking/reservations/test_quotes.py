@@ -0,0 +1,113 @@
+from datetime import datetime, time
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from pet_booking.services.models import (
+    BoardingService, BoardingServicePricing, GroomingService, GroomingServicePricing
+)
+from pet_booking.test_fixtures import api_client, create_store
+from pet_booking.users.models import User
+from .models import ReservationBoarding
+
+
+class QuoteTestCase(TestCase):
+    """試算 API 測試的共用資料"""
+
+    def setUp(self):
+        cache.clear()
+        member = User.objects.create(username='member', role='member', user_id='M1')
+        self.store = create_store(daily_opening_time=time(9, 0), daily_closing_hours=time(18, 0))
+        self.client = api_client(member)
+
+
+class GroomingBatchQuoteTestCase(QuoteTestCase):
+    """美容批次試算測試"""
+
+    def setUp(self):
+        super().setUp()
+        for service_title, pricing, duration in [('洗澡', 500, 60), ('剪毛', 800, 90)]:
+            service = GroomingService.objects.create(
+                store_id=self.store, species='dog', service_title=service_title, introduction=''
+            )
+            GroomingServicePricing.objects.create(
+                grooming_service_id=service, pet_size='small', fur_amount='short', pricing=pricing, grooming_duration=duration
+            )
+
+    def post_batch(self, items):
+        return self.client.post('/api/grooming/calculation/calculate_batch?store_id=S1', {'items': items}, format='json')
+
+    def test_batch_quote(self):
+        pet_data = {'name': 'Bobo', 'species': 'dog', 'fur_amount': 'short', 'size': 'small'}
+        response = self.post_batch([
+            {'pet_data': pet_data, 'selected_services': ['洗澡', '剪毛']},
+            {'pet_data': dict(pet_data, size='large'), 'selected_services': ['洗澡']},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['items'][0]['total_price'], 1300)
+        self.assertEqual(response.data['items'][0]['grooming_duration'], 150)
+        self.assertIn('error', response.data['items'][1])
+        self.assertEqual(response.data['total_price'], 1300)
+
+    def test_query_count_independent_of_batch_size(self):
+        pet_data = {'name': 'Bobo', 'species': 'dog', 'fur_amount': 'short', 'size': 'small'}
+        for size in (1, 10):
+            cache.clear()
+            with self.assertNumQueries(2):
+                self.post_batch([{'pet_data': pet_data, 'selected_services': ['洗澡', '剪毛']}] * size)
+
+
+class BoardingQuoteGridTestCase(QuoteTestCase):
+    """住宿費用試算表測試"""
+
+    def setUp(self):
+        super().setUp()
+        standard = BoardingService.objects.create(
+            store_id=self.store, species='dog', cleaning_frequency='daily', room_type='Standard', room_count=1,
+            pet_available_amount=1
+        )
+        BoardingServicePricing.objects.create(boarding_service=standard, duration=1, duration_unit='day', pricing=1000)
+        BoardingServicePricing.objects.create(
+            boarding_service=standard, duration=3, duration_unit='day', pricing=900, overtime_rate=100
+        )
+        # 貓房 1 間可住 2 隻，超時不加收
+        cat_room = BoardingService.objects.create(
+            store_id=self.store, species='cat', cleaning_frequency='daily', room_type='Cat Room', room_count=1,
+            pet_available_amount=2
+        )
+        BoardingServicePricing.objects.create(
+            boarding_service=cat_room, duration=1, duration_unit='day', pricing=600, overtime_rate=50,
+            overtime_charging=True
+        )
+        for reservation_id, room_type in [('BD1', 'Standard'), ('BD2', 'Cat Room')]:
+            ReservationBoarding.objects.create(
+                reservation_id=reservation_id, store_name='Test Store', user_name='Amy', user_phone='0912345678',
+                pet_name='Bobo', room_type=room_type, boarding_durations=2, status='confirmed', total_price=2000,
+                checkin_date=timezone.make_aware(datetime(2030, 1, 1, 14)),
+                checkout_date=timezone.make_aware(datetime(2030, 1, 3, 11))
+            )
+
+    def test_quote_grid(self):
+        stays = [
+            {'check_in_date': '2030-01-02', 'check_in_time': '14:00', 'check_out_date': '2030-01-04', 'check_out_time': '11:00'},
+            # 3 晚，退房晚於入住時刻 1.5 小時，以 2 小時計超時
+            {'check_in_date': '2030-01-02', 'check_in_time': '14:00', 'check_out_date': '2030-01-05', 'check_out_time': '15:30'},
+            {'check_in_date': '2030-01-03', 'check_in_time': '14:00', 'check_out_date': '2030-01-06', 'check_out_time': '11:00'},
+        ]
+        with self.assertNumQueries(4):
+            response = self.client.post(
+                '/api/boarding/calculation/calculate_grid?store_id=S1', {'stays': stays}, format='json'
+            )
+
+        self.assertEqual(response.status_code, 200)
+        grid = {row['room_type']: row for row in response.data['room_types']}
+        standard, cat_room = grid['Standard']['quotes'], grid['Cat Room']['quotes']
+        self.assertEqual([quote['total_boarding_cost'] for quote in standard], [2000, 2900, 2700])
+        self.assertEqual([quote['remaining_rooms'] for quote in standard], [0, 0, 1])
+        self.assertEqual([quote['available'] for quote in standard], [False, False, True])
+
+        self.assertEqual([quote['total_boarding_cost'] for quote in cat_room], [1200, 1800, 1800])
+        self.assertEqual(grid['Cat Room']['capacity'], 2)
+        self.assertEqual([quote['remaining_rooms'] for quote in cat_room], [1, 1, 2])
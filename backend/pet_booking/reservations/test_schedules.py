@@ -0,0 +1,100 @@
+from datetime import time, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from pet_booking.services.models import GroomingService, GroomingServicePricing
+from pet_booking.test_fixtures import api_client, create_store
+from .availability import occupied_slots
+from .models import GroomingSchedules, ReservationGrooming
+from .views.create_reservations import GroomingReservationViewSet
+
+
+class GroomingScheduleWriteTestCase(TestCase):
+    """美容預約時段寫入與釋放測試"""
+
+    def setUp(self):
+        cache.clear()
+        self.store = create_store()
+        owner = self.store.user_id
+        service = GroomingService.objects.create(store_id=self.store, species='dog', service_title='洗澡', introduction='')
+        GroomingServicePricing.objects.create(
+            grooming_service_id=service, pet_size='small', fur_amount='short', pricing=500, grooming_duration=60
+        )
+        self.client = api_client(owner)
+        self.day = timezone.localdate() + timedelta(days=1)
+
+    def store_create(self, reservation_time, user_name='Amy'):
+        return self.client.post('/api/grooming/reservation/store_create?store_id=S1&service_type=grooming', {
+            'user_name': user_name, 'user_phone': '0900000001', 'pet_name': 'Bobo', 'pet_type': 'dog',
+            'pet_breed': '柴犬', 'pet_size': 'small', 'fur_amount': 'short', 'selected_services': ['洗澡'],
+            'pick_up_service': True, 'reservation_date': self.day.isoformat(), 'reservation_time': reservation_time,
+            'store_note': '現場預約'
+        }, format='json')
+
+    def slots(self):
+        return list(
+            GroomingSchedules.objects.filter(store_name='Test Store', date=self.day)
+            .order_by('unavailable_time').values_list('unavailable_time', flat=True)
+        )
+
+    def test_create_writes_schedules(self):
+        response = self.store_create('10:00')
+
+        self.assertEqual(response.status_code, 201, response.data)
+        reservation = ReservationGrooming.objects.get()
+        self.assertEqual(self.slots(), occupied_slots(time(10, 0), 60))
+        self.assertEqual(
+            set(GroomingSchedules.objects.values_list('reservation_grooming_id', flat=True)), {reservation.pk}
+        )
+
+    def test_overlapping_slot_returns_conflict(self):
+        self.assertEqual(self.store_create('10:00').status_code, 201)
+        self.assertEqual(self.store_create('10:30', user_name='Ben').status_code, 409)
+        self.assertEqual(ReservationGrooming.objects.count(), 1)
+
+    def test_constraint_conflict_rolls_back_reservation(self):
+        """事前檢查通過（模擬併發）時，由 unique constraint 擋下並回滾預約"""
+        self.assertEqual(self.store_create('10:00').status_code, 201)
+        with mock.patch.object(GroomingReservationViewSet, 'check_time_slot_availability', return_value=None):
+            response = self.store_create('10:45', user_name='Ben')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(list(ReservationGrooming.objects.values_list('user_name', flat=True)), ['Amy'])
+        self.assertEqual(self.slots(), occupied_slots(time(10, 0), 60))
+
+    def test_unique_slot_constraint(self):
+        self.store_create('10:00')
+        reservation = ReservationGrooming.objects.get()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            GroomingSchedules.objects.create(
+                store_name='Test Store', date=self.day, unavailable_time=time(10, 15), reservation_grooming_id=reservation
+            )
+
+    def test_cancel_releases_schedules(self):
+        self.store_create('10:00')
+        reservation_id = ReservationGrooming.objects.get().reservation_id
+
+        response = self.client.patch(
+            '/api/reservations/grooming/actions/cancel', {'reservation_id': reservation_id}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.slots(), [])
+        # 釋放後同一時段可再次預約
+        self.assertEqual(self.store_create('10:00', user_name='Ben').status_code, 201)
+
+    def test_cancel_confirmed_releases_schedules(self):
+        self.store_create('10:00')
+        ReservationGrooming.objects.update(status='confirmed')
+        reservation_id = ReservationGrooming.objects.get().reservation_id
+
+        response = self.client.patch(
+            '/api/reservations/grooming/actions/cancel-confirmed', {'reservation_id': reservation_id}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.slots(), [])
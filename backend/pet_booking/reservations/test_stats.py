@@ -0,0 +1,163 @@
+from datetime import datetime, time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from pet_booking.customers.models import CustomersProfile, Pet
+from pet_booking.services.models import BoardingService
+from pet_booking.test_fixtures import api_client, create_store
+from pet_booking.users.models import User
+from .models import ReservationBoarding, ReservationGrooming, StoreDailyStats
+from .stats import rebuild_daily_stats
+
+
+STATS_FIELDS = ('store_id', 'date', 'service_type', 'pending', 'confirmed', 'finished', 'cancelled', 'revenue')
+
+
+class StoreDailyStatsTestCase(TestCase):
+    """店家每日統計增量更新與儀表板測試"""
+
+    def setUp(self):
+        self.store = create_store(daily_opening_time=time(9, 0), daily_closing_hours=time(18, 0))
+        self.owner = self.store.user_id
+        BoardingService.objects.create(
+            store_id=self.store, species='dog', cleaning_frequency='daily', room_type='Standard', room_count=3,
+            pet_available_amount=1
+        )
+        self.member = User.objects.create(username='member', role='member', user_id='M1')
+        CustomersProfile.objects.create(user_id=self.member, full_name='Amy', phone='0900000001', email='m@example.com')
+        self.pet = Pet.objects.create(
+            user_id=self.member, species='dog', name='Bobo', gender='male', breed='柴犬', size='small', fur_amount='short'
+        )
+        self.client = api_client(self.owner)
+        self.today = timezone.localdate()
+        self.now = timezone.make_aware(datetime.combine(self.today, time(12)))
+
+    def create_grooming(self, reservation_id, status='pending', days=0, linked=True):
+        return ReservationGrooming.objects.create(
+            reservation_id=reservation_id, store_name='Test Store', user_name='Amy', user_phone='0900000001',
+            pet_name='Bobo', pet_type='dog', pet_size='small', total_price=500, grooming_period=60, status=status,
+            reservation_time=self.now + timedelta(days=days),
+            store_id=self.store if linked else None, user_id=self.member if linked else None
+        )
+
+    def create_boarding(self, reservation_id, status='pending', days=0):
+        return ReservationBoarding.objects.create(
+            reservation_id=reservation_id, store_name='Test Store', user_name='Amy', user_phone='0900000001',
+            pet_name='Bobo', room_type='Standard', boarding_durations=1, total_price=1000, status=status,
+            checkin_date=self.now + timedelta(days=days), checkout_date=self.now + timedelta(days=days + 1),
+            store_id=self.store, user_id=self.member, pet_id=self.pet
+        )
+
+    def snapshot(self):
+        return sorted(StoreDailyStats.objects.values_list(*STATS_FIELDS))
+
+    def assert_matches_rebuild(self):
+        incremental = self.snapshot()
+        rebuild_daily_stats()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_transitions_match_rebuild(self):
+        for index in range(4):
+            self.create_grooming(f'GR{index}', linked=index != 3)
+            self.create_boarding(f'BD{index}', days=index)
+        self.create_boarding('BDold', status='finished', days=-3)
+        call_command('rebuild_store_daily_stats', stdout=StringIO())
+
+        actions = [
+            ('grooming', 'confirm', 'GR0'), ('grooming', 'complete', 'GR0'),
+            ('grooming', 'cancel', 'GR1'),
+            ('grooming', 'confirm', 'GR3'), ('grooming', 'cancel-confirmed', 'GR3'),
+            ('boarding', 'confirm', 'BD0'), ('boarding', 'complete', 'BD0'),
+            ('boarding', 'cancel', 'BD1'),
+            ('boarding', 'confirm', 'BD2'), ('boarding', 'cancel-confirmed', 'BD2'),
+            ('boarding', 'confirm', 'BD3'),
+        ]
+        for service_type, action, reservation_id in actions:
+            response = self.client.patch(
+                f'/api/reservations/{service_type}/actions/{action}', {'reservation_id': reservation_id}, format='json'
+            )
+            self.assertEqual(response.status_code, 200, response.data)
+            self.assert_matches_rebuild()
+
+        grooming = StoreDailyStats.objects.get(store_id=self.store, date=self.today, service_type='grooming')
+        self.assertEqual(
+            (grooming.pending, grooming.confirmed, grooming.finished, grooming.cancelled, grooming.revenue),
+            (1, 0, 1, 2, 500)
+        )
+
+    def test_grooming_dashboard_reads_stats(self):
+        self.create_grooming('GR0')
+        self.create_grooming('GR1', status='confirmed')
+        self.create_grooming('GR2', status='confirmed', days=1)
+        rebuild_daily_stats()
+
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/reservations/grooming/today?store_id={self.store.id}')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['confirmed_reservations']), 1)
+        self.assertEqual(response.data['pending_reservations_count'], 1)
+        self.assertEqual(response.data['confirmed_reservations_count'], 1)
+
+    def test_boarding_dashboard_reads_stats(self):
+        self.create_boarding('BD0', status='confirmed')
+        self.create_boarding('BD1', status='confirmed', days=2)
+        self.create_boarding('BD2', status='confirmed', days=-1)
+        self.create_boarding('BD3')
+        self.create_boarding('BD4', days=1)
+        rebuild_daily_stats()
+
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/reservations/boarding/availability?store_id=S1')
+            self.assertEqual(response.status_code, 200)
+        # 只取今日（店家時區）入住的統計列
+        self.assertEqual(response.data['date'], self.today.isoformat())
+        self.assertEqual(response.data['pending_count'], 1)
+        self.assertEqual(response.data['confirmed_count'], 1)
+        self.assertEqual(
+            response.data['species_data'], {'dog': {'room_types': [{'room_type': 'Standard', 'total_count': 3}]}}
+        )
+
+
+class StoreDailyStatsMigrationTestCase(TransactionTestCase):
+    """建立統計表的 migration 需由既有預約回填統計"""
+
+    migrate_from = [('reservations', '0013_reservation_indexes')]
+    migrate_to = [('reservations', '0014_store_daily_stats')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_migration_seeds_existing_reservations(self):
+        apps = self.migrate(self.migrate_from)
+        owner = apps.get_model('users', 'User').objects.create(username='owner', role='store', user_id='S1')
+        store = apps.get_model('stores', 'Store').objects.create(
+            user_id=owner, store_name='Test Store', owner_name='Owner', email='store@example.com', phone='0912345678',
+            address={'county': '臺北市', 'district': '大安區', 'detail': ''}, status='confirmed'
+        )
+        now = timezone.make_aware(datetime(2030, 1, 1, 12))
+        ReservationGrooming = apps.get_model('reservations', 'ReservationGrooming')
+        for reservation_id, status in [('GR1', 'pending'), ('GR2', 'finished'), ('GR3', 'finished')]:
+            ReservationGrooming.objects.create(
+                reservation_id=reservation_id, store_name='Test Store', user_name='Amy', user_phone='0900000001',
+                pet_name='Bobo', pet_type='dog', pet_size='small', total_price=500, grooming_period=60,
+                status=status, reservation_time=now, store_id=store
+            )
+
+        apps = self.migrate(self.migrate_to)
+
+        stats = apps.get_model('reservations', 'StoreDailyStats').objects.get()
+        self.assertEqual(
+            (stats.store_id_id, stats.date, stats.service_type, stats.pending, stats.finished, stats.revenue),
+            (store.pk, now.date(), 'grooming', 1, 2, 1000)
+        )
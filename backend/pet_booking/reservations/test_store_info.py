@@ -0,0 +1,86 @@
+from datetime import time
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from pet_booking.customers.models import Pet
+from pet_booking.services.models import (
+    BoardingService, BoardingServicePricing, GroomingService, GroomingServicePricing
+)
+from pet_booking.test_fixtures import api_client, create_store
+from pet_booking.users.models import User
+
+
+class StoreInfoQueryCountTestCase(TestCase):
+    """店家資訊 storedata1 / storedata2 查詢次數與快取測試"""
+
+    def setUp(self):
+        cache.clear()
+        self.member = User.objects.create(username='member', role='member', user_id='M1')
+        self.store = create_store(daily_opening_time=time(9, 0), daily_closing_hours=time(18, 0))
+        Pet.objects.create(user_id=self.member, species='dog', name='Bobo', gender='male', size='small', fur_amount='short')
+        self.client = api_client(self.member)
+
+    def add_services(self, count):
+        for index in range(count):
+            grooming_service = GroomingService.objects.create(
+                store_id=self.store, species='dog', service_title=f'服務{index}', introduction=''
+            )
+            GroomingServicePricing.objects.create(
+                grooming_service_id=grooming_service, pet_size='small', fur_amount='short', pricing=500, grooming_duration=60
+            )
+            boarding_service = BoardingService.objects.create(
+                store_id=self.store, species='dog', cleaning_frequency='daily', room_type=f'房型{index}', room_count=2
+            )
+            for duration_unit, pricing in [('day', 1000), ('month', 20000)]:
+                BoardingServicePricing.objects.create(
+                    boarding_service=boarding_service, duration=1, duration_unit=duration_unit, pricing=pricing
+                )
+
+    def assert_query_count_fixed(self, url, expected):
+        for count in (1, 5):
+            self.add_services(count)
+            cache.clear()
+            with self.assertNumQueries(expected):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.data)
+
+    def test_storedata2_boarding(self):
+        self.assert_query_count_fixed('/api/store-info/storedata2?store_id=S1&service_type=boarding', 4)
+
+    def test_storedata2_grooming(self):
+        self.assert_query_count_fixed('/api/store-info/storedata2?store_id=S1&service_type=grooming', 3)
+
+    def test_storedata1_boarding(self):
+        self.assert_query_count_fixed('/api/store-info/storedata1?store_id=S1&service_type=boarding', 3)
+
+    def test_boarding_pricings_are_included(self):
+        self.add_services(1)
+        response = self.client.get('/api/store-info/storedata1?store_id=S1&service_type=boarding')
+        room_type_info = response.data['boarding_services'][0]['room_type_info']
+        self.assertEqual(room_type_info['pricing_info']['pricing'], 1000)
+        self.assertEqual([pricing['pricing'] for pricing in room_type_info['pricings']], [1000, 20000])
+    def test_snapshot_cached_until_store_data_changes(self):
+        self.add_services(1)
+        url = '/api/store-info/storedata2?store_id=S1&service_type=boarding'
+        self.client.get(url)
+
+        # 快取命中時只查詢用戶寵物
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['boarding_services']), 1)
+        self.assertEqual(len(response.data['user_pets']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BoardingServicePricing.objects.filter(pricing=1000).first().save()
+        with self.assertNumQueries(4):
+            self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_services(1)
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['boarding_services']), 2)
+
+        Pet.objects.create(user_id=self.member, species='cat', name='Mimi', gender='female', size='small', fur_amount='long')
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['user_pets']), 2)
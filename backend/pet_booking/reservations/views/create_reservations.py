@@ -1,35 +1,52 @@
 # origin
 from datetime import datetime, timedelta, date, time
 from typing import Dict, List, Optional, Tuple
-import math
 
 # third-party
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.db.models import QuerySet
+from django.utils import timezone
 
 # app
-from ..models import GroomingSchedules, BoardingSchedules, ReservationBoarding
-from pet_booking.services.models import GroomingService, GroomingServicePricing, BoardingService, BoardingServicePricing
+from ..models import GroomingSchedules, ReservationBoarding, ReservationGrooming
+from ..availability import GroomingDayAvailability, GroomingRangeAvailability, occupied_slots
+from ..earliest import EarliestGroomingSearch
+from ..identifiers import reservation_ids
+from ..occupancy import BoardingOccupancy, room_capacity
+from ..resolvers import resolve_customer_pet
+from ..stats import record_status_change
+from pet_booking.services.models import GroomingService, BoardingService, BoardingServicePricing
+from pet_booking.services.pricing import BoardingTariff, GroomingPriceMatrix, RoomTariff, overtime_hours
 from pet_booking.stores.models import Store
+from pet_booking.stores.cache import get_store_version
+from pet_booking.stores.views import CustomerStoreFilter, CustomerStoreViewSet
 from pet_booking.coupon.models import Coupon, CouponStatus
+from pet_booking.coupon.quota import claim_coupon
 from ..serializers import ReservationGroomingSerializer, ReservationBoardingSerializer
 from pet_booking.customers.serializers import PetSerializer
 from pet_booking.customers.models import CustomersProfile, Pet
 
 
+MAX_AVAILABILITY_DAYS = 30
+MAX_BATCH_QUOTE_ITEMS = 20
+MAX_EARLIEST_CANDIDATES = 200
+EARLIEST_RESULTS_LIMIT = 10
+MAX_EARLIEST_RESULTS_LIMIT = 50
+STORE_SNAPSHOT_CACHE_KEY = 'store_snapshot:{store_id}:{service_type}:{version}'
+STORE_SNAPSHOT_TIMEOUT = 60 * 60
+
+
 def create_reservation_id(service_type: str) -> str:
-    """創建預約ID"""
-    now = datetime.now()
-    timestamp = now.strftime("%Y%m%d%H%M%S")
-    microsecond_part = f"{now.microsecond:06d}"[-4:]
-    
+    """創建預約ID（跨程序不重複、依時間排序）"""
     if service_type == 'grooming':
-        return f"GR{timestamp}{microsecond_part}"
+        return reservation_ids.generate('GR')
     elif service_type == 'boarding':
-        return f"BD{timestamp}{microsecond_part}"
+        return reservation_ids.generate('BD')
     else:
         raise ValueError(f"Invalid service_type: {service_type}")
 
@@ -45,13 +62,13 @@ class StoreInfoViewSet(viewsets.ReadOnlyModelViewSet):
         """獲取用戶寵物 QuerySet"""
         return Pet.objects.filter(user_id=user_id)
 
-    def get_grooming_services_queryset(self, store_id: str) -> QuerySet:
+    def get_grooming_services_queryset(self, store: Store) -> QuerySet:
         """獲取美容服務 QuerySet"""
-        return GroomingService.objects.filter(store_id=store_id)
+        return GroomingService.objects.filter(store_id=store)
 
-    def get_boarding_services_queryset(self, store_id: str) -> QuerySet:
-        """獲取住宿服務 QuerySet"""
-        return BoardingService.objects.filter(store_id=store_id)
+    def get_boarding_services_queryset(self, store: Store) -> QuerySet:
+        """獲取住宿服務 QuerySet（預先載入定價）"""
+        return BoardingService.objects.filter(store_id=store).prefetch_related('boardingservicepricing_set')
 
     def create_pet_info_dict(self, pet: Pet) -> Dict:
         """創建寵物資訊字典"""
@@ -88,65 +105,48 @@ class StoreInfoViewSet(viewsets.ReadOnlyModelViewSet):
 
     def create_grooming_services_list(self, grooming_services_queryset: QuerySet) -> List[str]:
         """創建美容服務標題列表"""
-        return [service.service_title for service in grooming_services_queryset]
+        return list(grooming_services_queryset.values_list('service_title', flat=True))
 
-    def create_boarding_pricing_info(self, room_type: BoardingService) -> Optional[Dict]:
+    def create_boarding_pricing_info(self, boarding_pricing: BoardingServicePricing) -> Dict:
         """創建住宿定價資訊"""
-        try:
-            boarding_pricing = BoardingServicePricing.objects.get(room_type=room_type)
-            return {
-                'duration': boarding_pricing.duration,
-                'duration_unit': boarding_pricing.duration_unit,
-                'pricing': boarding_pricing.pricing,
-                'overtime_price': boarding_pricing.overtime_rate,
-                'overtime_charging': boarding_pricing.overtime_charging
-            }
-        except BoardingServicePricing.DoesNotExist:
-            return None
+        return {
+            'duration': boarding_pricing.duration,
+            'duration_unit': boarding_pricing.duration_unit,
+            'pricing': boarding_pricing.pricing,
+            'overtime_price': boarding_pricing.overtime_rate,
+            'overtime_charging': boarding_pricing.overtime_charging
+        }
 
-    def create_boarding_room_type_data(self, boarding_service: BoardingService) -> Optional[Dict]:
-        """創建住宿房間類型資料"""
-        try:
-            boarding_room_type = BoardingService.objects.get(boarding_service=boarding_service)
-            pricing_info = self.create_boarding_pricing_info(boarding_room_type)
-            
-            return {
-                'id': boarding_room_type.id,
-                'species': boarding_room_type.species,
-                'room_type': boarding_room_type.room_type,
-                'room_count': boarding_room_type.room_count,
-                'pet_available_amount': boarding_room_type.pet_available_amount,
-                'pricing_info': pricing_info
-            }
-        except BoardingService.DoesNotExist:
-            return None
+    def create_boarding_room_type_data(self, boarding_service: BoardingService) -> Dict:
+        """創建住宿房間類型資料（使用預先載入的定價，不額外查詢）"""
+        pricings = [
+            self.create_boarding_pricing_info(boarding_pricing)
+            for boarding_pricing in boarding_service.boardingservicepricing_set.all()
+        ]
+
+        return {
+            'id': boarding_service.id,
+            'species': boarding_service.species,
+            'room_type': boarding_service.room_type,
+            'room_count': boarding_service.room_count,
+            'pet_available_amount': boarding_service.pet_available_amount,
+            'pricing_info': pricings[0] if pricings else None,
+            'pricings': pricings
+        }
 
     def create_boarding_services_list(self, boarding_services_queryset: QuerySet) -> List[Dict]:
         """創建住宿服務列表"""
-        boarding_data = []
-        
-        for boarding_service in boarding_services_queryset:
-            room_type_data = self.create_boarding_room_type_data(boarding_service)
-            
-            boarding_data.append({
+        return [
+            {
                 'id': boarding_service.id,
                 'cleaning_frequency': boarding_service.cleaning_frequency,
                 'introduction': boarding_service.introduction,
                 'created_at': boarding_service.created_at,
                 'updated_at': boarding_service.updated_at,
-                'room_type_info': room_type_data
-            })
-        
-        return boarding_data
-
-    def create_grooming_response_data(self, store: Store, service_titles: List[str], user_pets: Dict, user_id: int) -> Dict:
-        """創建美容服務回應資料"""
-        return {
-            'store': self.create_store_info_dict(store),
-            'service_titles': service_titles,
-            'user_pets': user_pets,
-            'user_id': user_id,
-        }
+                'room_type_info': self.create_boarding_room_type_data(boarding_service)
+            }
+            for boarding_service in boarding_services_queryset
+        ]
 
     def create_boarding_response_data(self, store: Store, boarding_data: List[Dict], user_pets: Dict = None) -> Dict:
         """創建住宿服務回應資料"""
@@ -164,6 +164,36 @@ class StoreInfoViewSet(viewsets.ReadOnlyModelViewSet):
             
         return response_data
 
+    def create_store_snapshot(self, store: Store, service_type: str) -> Dict:
+        """創建店家端資料（店家資訊與服務選項，不含用戶資料）"""
+        if service_type == 'grooming':
+            grooming_services_queryset = self.get_grooming_services_queryset(store)
+            return {
+                'store': self.create_store_info_dict(store),
+                'service_titles': self.create_grooming_services_list(grooming_services_queryset)
+            }
+
+        boarding_services_queryset = self.get_boarding_services_queryset(store)
+        boarding_data = self.create_boarding_services_list(boarding_services_queryset)
+        return self.create_boarding_response_data(store, boarding_data)
+
+    def get_store_snapshot(self, store_id: str, service_type: str) -> Tuple[Optional[Dict], Optional[Response]]:
+        """獲取店家端資料快照，依店家資料版本號快取"""
+        cache_key = STORE_SNAPSHOT_CACHE_KEY.format(
+            store_id=store_id, service_type=service_type, version=get_store_version(store_id)
+        )
+        snapshot = cache.get(cache_key)
+        if snapshot is None:
+            store = self.get_store_queryset(store_id).first()
+            if not store:
+                return None, Response({
+                    'error': '店家不存在或已停用'
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            snapshot = self.create_store_snapshot(store, service_type)
+            cache.set(cache_key, snapshot, STORE_SNAPSHOT_TIMEOUT)
+        return snapshot, None
+
     @action(detail=False, methods=['get'], url_path='storedata2')
     def get_store_data_userside(self, request):
         """獲取店家資訊和服務選項(客戶端)"""
@@ -174,37 +204,22 @@ class StoreInfoViewSet(viewsets.ReadOnlyModelViewSet):
             return Response({
                 'error': '缺少店家ID參數'
             }, status=status.HTTP_400_BAD_REQUEST)
+        if service_type not in ('grooming', 'boarding'):
+            return Response({
+                'error': '服務項目非美容或住宿'
+            }, status=status.HTTP_400_BAD_REQUEST)
         try:
-            store_queryset = self.get_store_queryset(store_id)
-            store = store_queryset.first()
-            
-            if not store:
-                return Response({
-                    'error': '店家不存在或已停用'
-                }, status=status.HTTP_404_NOT_FOUND)
+            response_data, snapshot_error = self.get_store_snapshot(store_id, service_type)
+            if snapshot_error:
+                return snapshot_error
 
-            # 獲取用戶寵物資訊
+            # 用戶寵物資訊每次重新查詢，不進快取
             pets_queryset = self.get_user_pets_queryset(user_id)
-            user_pets = self.create_user_pets_list(pets_queryset)
-            
+            response_data = dict(response_data, user_pets=self.create_user_pets_list(pets_queryset))
             if service_type == 'grooming':
-                grooming_services_queryset = self.get_grooming_services_queryset(store_id)
-                service_titles = self.create_grooming_services_list(grooming_services_queryset)
-                response_data = self.create_grooming_response_data(store, service_titles, user_pets, user_id)
-                
-                return Response(response_data, status=status.HTTP_200_OK)
-            
-            elif service_type == 'boarding':
-                boarding_services_queryset = self.get_boarding_services_queryset(store_id)
-                boarding_data = self.create_boarding_services_list(boarding_services_queryset)
-                response_data = self.create_boarding_response_data(store, boarding_data, user_pets)
-                
-                return Response(response_data, status=status.HTTP_200_OK)
+                response_data['user_id'] = user_id
 
-            else:
-                return Response({
-                    'error': '服務項目非美容或住宿'
-                }, status=status.HTTP_400_BAD_REQUEST)
+            return Response(response_data, status=status.HTTP_200_OK)
             
         except Exception as e:
             return Response({
@@ -221,39 +236,17 @@ class StoreInfoViewSet(viewsets.ReadOnlyModelViewSet):
             return Response({
                 'error': '缺少店家ID參數'
             }, status=status.HTTP_400_BAD_REQUEST)
+        if service_type not in ('grooming', 'boarding'):
+            return Response({
+                'error': '服務項目非美容或住宿'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            store_queryset = self.get_store_queryset(store_id)
-            store = store_queryset.first()
-            
-            if not store:
-                return Response({
-                    'error': '店家不存在或已停用'
-                }, status=status.HTTP_404_NOT_FOUND)
-            else:
-                store_id = store.id
-                
-            if service_type == 'grooming':
-                grooming_services_queryset = self.get_grooming_services_queryset(store_id)
-                
-                service_titles = self.create_grooming_services_list(grooming_services_queryset)
-                response_data = {
-                    'store': self.create_store_info_dict(store),
-                    'service_titles': service_titles                
-                }
-                return Response(response_data, status=status.HTTP_200_OK)
-            
-            elif service_type == 'boarding':
-                boarding_services_queryset = self.get_boarding_services_queryset(store_id)
-                boarding_data = self.create_boarding_services_list(boarding_services_queryset)
-                response_data = self.create_boarding_response_data(store, boarding_data)
-                
-                return Response(response_data, status=status.HTTP_200_OK)
+            response_data, snapshot_error = self.get_store_snapshot(store_id, service_type)
+            if snapshot_error:
+                return snapshot_error
 
-            else:
-                return Response({
-                    'error': '服務項目非美容或住宿'
-                }, status=status.HTTP_400_BAD_REQUEST)
+            return Response(response_data, status=status.HTTP_200_OK)
             
         except Exception as e:
             return Response({
@@ -422,21 +415,9 @@ class GroomingCalculationViewSet(viewsets.ModelViewSet):
     def get_store_queryset(self, store_id: str) -> QuerySet:
         """獲取店家 QuerySet"""
         return Store.objects.filter(user_id__user_id=store_id)
-    def get_grooming_service_queryset(self, service_title: str, store_id: str) -> QuerySet:
-        """獲取美容服務 QuerySet"""
-        store = Store.objects.filter(user_id__user_id=store_id).first()
-        return GroomingService.objects.filter(
-            service_title=service_title, 
-            store_id=store.id
-        )
-
-    def get_grooming_pricing_queryset(self, grooming_service: GroomingService, pet_size: str, pet_fur_amount: str) -> QuerySet:
-        """獲取美容服務定價 QuerySet"""
-        return GroomingServicePricing.objects.filter(
-            grooming_service_id=grooming_service,
-            pet_size=pet_size,
-            fur_amount=pet_fur_amount
-        )
+    def get_price_matrix(self, store_id: str) -> GroomingPriceMatrix:
+        """獲取店家美容價目表（快取）"""
+        return GroomingPriceMatrix.for_store(store_id)
 
     def create_pet_data_dict(self, pet_data: Dict) -> Dict:
         """創建寵物資料字典，提取必要欄位"""
@@ -491,23 +472,22 @@ class GroomingCalculationViewSet(viewsets.ModelViewSet):
             )
         return None
 
-    def calculate_service_price(self, service_title: str, store_id: str, pet_size: str, pet_fur_amount: str) -> Tuple[int, Optional[Response]]:
+    def calculate_service_price(self, service_title: str, store_id: str, species: str, pet_size: str,
+                                pet_fur_amount: str) -> Tuple[int, Optional[Response]]:
         """計算單項服務價格"""
-        grooming_service_queryset = self.get_grooming_service_queryset(service_title, store_id)
-        grooming_service = grooming_service_queryset.first()
-        
-        if not grooming_service:
+        price_matrix = self.get_price_matrix(store_id)
+
+        if not price_matrix.has_service(service_title):
             error_response = self.create_error_response(
                 f'服務項目 "{service_title}" 不存在或不屬於此店家', 
                 status.HTTP_404_NOT_FOUND
             )
             return 0, error_response
 
-        pricing_queryset = self.get_grooming_pricing_queryset(grooming_service, pet_size, pet_fur_amount)
-        pricing_result = pricing_queryset.first()
+        pricing_result = price_matrix.lookup(service_title, species, pet_size, pet_fur_amount)
 
         if pricing_result:
-            return int(pricing_result.pricing), None
+            return pricing_result[0], None
         else:
             error_response = self.create_error_response(
                 f'找不到服務 "{service_title}" 對應此寵物類型的定價資訊', 
@@ -515,12 +495,13 @@ class GroomingCalculationViewSet(viewsets.ModelViewSet):
             )
             return 0, error_response
 
-    def calculate_total_price(self, selected_services: List[str], store_id: str, pet_size: str, pet_fur_amount: str) -> Tuple[int, Optional[Response]]:
+    def calculate_total_price(self, selected_services: List[str], store_id: str, species: str, pet_size: str,
+                              pet_fur_amount: str) -> Tuple[int, Optional[Response]]:
         """計算所有服務的總價格"""
         total_price = 0
         for service_title in selected_services:
             service_price, error_response = self.calculate_service_price(
-                service_title, store_id, pet_size, pet_fur_amount
+                service_title, store_id, species, pet_size, pet_fur_amount
             )
             
             if error_response:
@@ -560,6 +541,7 @@ class GroomingCalculationViewSet(viewsets.ModelViewSet):
             total_price, calculation_error = self.calculate_total_price(
                 selected_services, 
                 store_id, 
+                pet_data_dict['species'], 
                 pet_data_dict['size'], 
                 pet_data_dict['fur_amount']
             )
@@ -576,6 +558,69 @@ class GroomingCalculationViewSet(viewsets.ModelViewSet):
                 status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def calculate_batch_item(self, price_matrix: GroomingPriceMatrix, item: Dict) -> Dict:
+        """以同一份價目表計算單筆寵物的服務總價與總時長"""
+        pet_data_dict = self.create_pet_data_dict(item.get('pet_data') or {})
+        selected_services = item.get('selected_services') or []
+        result = {'pet_name': pet_data_dict['name'], 'selected_services': selected_services}
+
+        if not selected_services:
+            result['error'] = '請選擇至少一項服務'
+            return result
+        if not all(pet_data_dict.get(field) for field in ['name', 'species', 'fur_amount', 'size']):
+            result['error'] = '寵物資料不完整，需要提供: name, species, fur_amount, size'
+            return result
+
+        total_price, total_duration, quote_error = price_matrix.quote(
+            selected_services, pet_data_dict['species'], pet_data_dict['size'], pet_data_dict['fur_amount']
+        )
+        if quote_error:
+            result['error'] = quote_error
+            return result
+
+        result['total_price'] = total_price
+        result['grooming_duration'] = total_duration
+        return result
+
+    @action(detail=False, methods=['post'], url_path='calculate_batch')
+    def calculate_grooming_cost_batch(self, request):
+        """批次計算多隻寵物的美容服務總時間和總價格"""
+
+        try:
+            store_id = request.query_params.get('store_id')
+            items = request.data.get('items', [])
+
+            if not store_id:
+                return self.create_error_response('缺少店家ID參數', status.HTTP_400_BAD_REQUEST)
+            if not isinstance(items, list) or not items:
+                return self.create_error_response('請提供至少一筆寵物與服務資料', status.HTTP_400_BAD_REQUEST)
+            if len(items) > MAX_BATCH_QUOTE_ITEMS:
+                return self.create_error_response(
+                    f'單次最多計算 {MAX_BATCH_QUOTE_ITEMS} 筆資料', 
+                    status.HTTP_400_BAD_REQUEST
+                )
+
+            store = self.get_store_queryset(store_id).first()
+            if not store:
+                return self.create_error_response('店家不存在', status.HTTP_404_NOT_FOUND)
+
+            # 所有項目共用同一份價目表，查詢次數與筆數無關
+            price_matrix = self.get_price_matrix(store_id)
+            results = [self.calculate_batch_item(price_matrix, item) for item in items]
+
+            return Response({
+                'store_id': store_id,
+                'store_name': store.store_name,
+                'items': results,
+                'total_price': sum(result.get('total_price', 0) for result in results),
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.create_error_response(
+                f'顧客總花費計算出現錯誤: {str(e)}', 
+                status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
 
 class GroomingReservationViewSet(viewsets.ModelViewSet):
     """美容預約管理ViewSet"""
@@ -597,29 +642,9 @@ class GroomingReservationViewSet(viewsets.ModelViewSet):
         """獲取寵物 QuerySet"""
         return Pet.objects.filter(user_id=user_id, name=pet_name)
 
-    def get_grooming_service_queryset(self, service_title: str, store_id: str) -> QuerySet:
-        """獲取美容服務 QuerySet"""
-        store = Store.objects.filter(user_id__user_id=store_id).first()
-        return GroomingService.objects.filter(
-            service_title=service_title,
-            store_id=store.id
-        )
-
-    def get_grooming_pricing_queryset(self, grooming_service: GroomingService, pet_size: str, pet_fur_amount: str) -> QuerySet:
-        """獲取美容服務定價 QuerySet"""
-        return GroomingServicePricing.objects.filter(
-            grooming_service_id=grooming_service,
-            pet_size=pet_size,
-            fur_amount=pet_fur_amount
-        )
-
-    def get_grooming_schedules_queryset(self, store_name: str, date: date, time_slot: time) -> QuerySet:
-        """獲取美容時間表 QuerySet"""
-        return GroomingSchedules.objects.filter(
-            store_name=store_name,
-            date=date,
-            unavailable_time=time_slot
-        )
+    def get_price_matrix(self, store_id: str) -> GroomingPriceMatrix:
+        """獲取店家美容價目表（快取）"""
+        return GroomingPriceMatrix.for_store(store_id)
 
     def get_user_coupon_queryset(self, user_id: int) -> QuerySet:
         """獲取用戶優惠券 QuerySet"""
@@ -651,7 +676,8 @@ class GroomingReservationViewSet(viewsets.ModelViewSet):
     def create_reservation_data_dict(self, reservation_id: str, store_name: str, user_name: str, user_phone: str, 
                                    selected_services: List[str], pet: Pet, pet_size: str, pick_up_service: bool,
                                    reservation_datetime: datetime, customer_note: str, store_note: str,
-                                   total_price: int, total_grooming_duration: int) -> Dict:
+                                   total_price: int, total_grooming_duration: int,
+                                   store: Optional[Store] = None, user_id: Optional[str] = None) -> Dict:
         
         """創建預約資料字典"""
         return {
@@ -670,7 +696,10 @@ class GroomingReservationViewSet(viewsets.ModelViewSet):
             'store_note': store_note,
             'total_price': total_price,
             'grooming_period': total_grooming_duration,
-            'status': 'pending'
+            'status': 'pending',
+            'store_id': store.id if store else None,
+            'user_id': user_id,
+            'pet_id': pet.id
         }
 
     def create_success_response_data(self, reservation_id: str, user_name: str, reservation_date: str,
@@ -734,62 +763,69 @@ class GroomingReservationViewSet(viewsets.ModelViewSet):
             )
             return None, error_response
 
-    def calculate_service_duration_and_price(self, selected_services: List[str], store_id: str, 
+    def calculate_service_duration_and_price(self, selected_services: List[str], store_id: str, species: str,
                                            pet_size: str, pet_fur_amount: str) -> Tuple[int, int, Optional[Response]]:
-        """計算服務持續時間和價格"""
-        total_grooming_duration = 0
-        total_price = 0
-
-        for service_title in selected_services:
-            grooming_service_queryset = self.get_grooming_service_queryset(service_title, store_id)
-            grooming_service = grooming_service_queryset.first()
-
-            if not grooming_service:
-                error_response = self.create_error_response(
-                    f'服務項目 "{service_title}" 不存在或不屬於此店家', 
-                    status.HTTP_404_NOT_FOUND
-                )
-                return 0, 0, error_response
-
-            pricing_queryset = self.get_grooming_pricing_queryset(grooming_service, pet_size, pet_fur_amount)
-            grooming_result = pricing_queryset.first()
+        """計算服務持續時間和價格（查詢快取的店家價目表）"""
+        total_price, total_grooming_duration, quote_error = self.get_price_matrix(store_id).quote(
+            selected_services, species, pet_size, pet_fur_amount
+        )
 
-            if grooming_result:
-                total_grooming_duration += int(grooming_result.grooming_duration)
-                total_price += int(grooming_result.pricing)
-            else:
-                error_response = self.create_error_response(
-                    f'找不到服務 "{service_title}" 對應此寵物類型的定價資訊', 
-                    status.HTTP_404_NOT_FOUND
-                )
-                return 0, 0, error_response
+        if quote_error:
+            return 0, 0, self.create_error_response(quote_error, status.HTTP_404_NOT_FOUND)
 
         return total_grooming_duration, total_price, None
 
     def create_unavailable_time_slots(self, reservation_datetime: datetime, total_grooming_duration: int) -> List[time]:
         """創建不可用時間段列表"""
-        total_grooming_duration_count = int(round(total_grooming_duration / 15 - 1, 0))
-        grooming_unavailable_time = []
-        current_time = reservation_datetime
-        
-        for i in range(total_grooming_duration_count + 1):
-            grooming_unavailable_time.append(current_time.time())
-            current_time += timedelta(minutes=15)
-        
-        return grooming_unavailable_time
-
-    def check_time_slot_availability(self, unavailable_times: List[time], store_name: str, 
-                                   reservation_date: date) -> Optional[Response]:
-        """檢查時間段可用性"""
-        for time_slot in unavailable_times:
-            schedule_queryset = self.get_grooming_schedules_queryset(store_name, reservation_date, time_slot)
-            if schedule_queryset.exists():
-                return self.create_error_response(
-                    '您預約的服務時段與其他客人重複，請先與店家確認後再進行預約', 
-                    status.HTTP_409_CONFLICT
-                )
+        return occupied_slots(reservation_datetime.time(), total_grooming_duration)
+
+    def check_time_slot_availability(self, store_name: str, reservation_datetime: datetime,
+                                   total_grooming_duration: int) -> Optional[Response]:
+        """檢查時間段可用性（單次查詢載入當日 bitmap）"""
+        day_availability = GroomingDayAvailability.load(store_name, reservation_datetime.date())
+        if not day_availability.is_free(reservation_datetime.time(), total_grooming_duration):
+            return self.create_error_response(
+                '您預約的服務時段與其他客人重複，請先與店家確認後再進行預約', 
+                status.HTTP_409_CONFLICT
+            )
         return None
 
+    def create_grooming_schedules(self, reservation: ReservationGrooming) -> List[GroomingSchedules]:
+        """寫入預約佔用的所有時段"""
+        reservation_datetime = reservation.reservation_time
+        return GroomingSchedules.objects.bulk_create([
+            GroomingSchedules(
+                reservation_grooming_id=reservation,
+                store_name=reservation.store_name,
+                date=reservation_datetime.date(),
+                unavailable_time=slot
+            )
+            for slot in self.create_unavailable_time_slots(reservation_datetime, reservation.grooming_period)
+        ])
+
+    def save_reservation_with_schedules(self, reservation_data: Dict) -> Tuple[Optional[ReservationGrooming], Optional[Response]]:
+        """在同一交易內建立預約與時段，時段衝突由 unique constraint 擋下"""
+        serializer = ReservationGroomingSerializer(data=reservation_data)
+
+        if not serializer.is_valid():
+            return None, self.create_validation_error_response(
+                '預約資料驗證失敗',
+                serializer.errors
+            )
+
+        try:
+            with transaction.atomic():
+                reservation = serializer.save()
+                self.create_grooming_schedules(reservation)
+                record_status_change(reservation, None, reservation.status)
+        except IntegrityError:
+            return None, self.create_error_response(
+                '您預約的服務時段與其他客人重複，請先與店家確認後再進行預約', 
+                status.HTTP_409_CONFLICT
+            )
+
+        return reservation, None
+
     def check_and_process_user_coupon(self, user_id: int, reservation_id: str, store_id: str) -> Tuple[Optional[str], Optional[Response]]:
         """檢查並處理用戶優惠券"""
         try:
@@ -803,10 +839,9 @@ class GroomingReservationViewSet(viewsets.ModelViewSet):
             
             # 檢查優惠券狀態
             if coupon.status == CouponStatus.NOT_USED:
-                # 將預約ID存入優惠券的reservation_id欄位
-                coupon.reservation_id = reservation_id
-                coupon.store_id = store_id
-                coupon.save()
+                # 將預約ID存入優惠券的reservation_id欄位（首次綁定時扣除活動額度）
+                if not claim_coupon(coupon, reservation_id, store_id):
+                    return '優惠券名額已用完', None
                 # 返回優惠券號碼
                 return coupon.coupon_number, None
             else:
@@ -820,6 +855,211 @@ class GroomingReservationViewSet(viewsets.ModelViewSet):
             )
             return None, error_response
 
+    def parse_date_range(self, start_date: Optional[str], end_date: Optional[str]) -> Tuple[Optional[date], Optional[date], Optional[Response]]:
+        """解析查詢日期區間（預設自今日起 30 天，早於今日的開始日期以今日計）"""
+        today = timezone.localdate()
+        try:
+            start = max(datetime.strptime(start_date, "%Y-%m-%d").date(), today) if start_date else today
+            end = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else start + timedelta(days=MAX_AVAILABILITY_DAYS - 1)
+        except ValueError:
+            return None, None, self.create_error_response(
+                '日期格式錯誤，請使用 YYYY-MM-DD 格式', 
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        if end < start:
+            return None, None, self.create_error_response(
+                '結束日期不可早於開始日期', 
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        if (end - start).days + 1 > MAX_AVAILABILITY_DAYS:
+            return None, None, self.create_error_response(
+                f'查詢區間最多 {MAX_AVAILABILITY_DAYS} 天', 
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        return start, end, None
+
+    def get_selected_services(self, request) -> List[str]:
+        """服務項目可重複帶參數或以逗號分隔"""
+        selected_services = request.query_params.getlist('selected_services')
+        if len(selected_services) == 1 and ',' in selected_services[0]:
+            selected_services = [title for title in selected_services[0].split(',') if title]
+        return selected_services
+
+    def parse_time_window(self, earliest_time: Optional[str], latest_time: Optional[str]) -> Tuple[Optional[time], Optional[time], Optional[Response]]:
+        """解析每日可接受的時段（HH:MM），未提供時不限"""
+        try:
+            earliest = datetime.strptime(earliest_time, "%H:%M").time() if earliest_time else None
+            latest = datetime.strptime(latest_time, "%H:%M").time() if latest_time else None
+        except ValueError:
+            return None, None, self.create_error_response(
+                '時間格式錯誤，請使用 HH:MM 格式', 
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        if earliest and latest and latest <= earliest:
+            return None, None, self.create_error_response(
+                '結束時間需晚於開始時間', 
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        return earliest, latest, None
+
+    @action(detail=False, methods=['get'], url_path='available_times')
+    def get_available_times(self, request):
+        """查詢美容服務可預約的起始時間"""
+        
+        try:
+            store_id = request.query_params.get('store_id')
+            species = request.query_params.get('species')
+            pet_size = request.query_params.get('pet_size')
+            pet_fur_amount = request.query_params.get('fur_amount')
+            selected_services = self.get_selected_services(request)
+
+            # 驗證必要欄位
+            validation_error = self.validate_required_fields([
+                store_id, species, pet_size, pet_fur_amount, selected_services
+            ])
+            if validation_error:
+                return validation_error
+
+            start, end, date_error = self.parse_date_range(
+                request.query_params.get('start_date'), request.query_params.get('end_date')
+            )
+            if date_error:
+                return date_error
+
+            # 獲取店家資訊
+            store = self.get_store_by_id_queryset(store_id).first()
+            if not store:
+                return self.create_error_response(
+                    '店家不存在', 
+                    status.HTTP_404_NOT_FOUND
+                )
+
+            # 計算服務持續時間
+            total_grooming_duration, _, calculation_error = self.calculate_service_duration_and_price(
+                selected_services, store_id, species, pet_size, pet_fur_amount
+            )
+            if calculation_error:
+                return calculation_error
+
+            # 單次查詢載入整段區間的時段佔用
+            range_availability = GroomingRangeAvailability.load(store.store_name, start, end)
+            free_starts = range_availability.free_starts(
+                total_grooming_duration, store.daily_opening_time,
+                store.daily_closing_hours, store.close_day
+            )
+
+            # 排除今日已過的時段
+            now = timezone.localtime()
+            if now.date() in free_starts:
+                free_starts[now.date()] = [
+                    start_time for start_time in free_starts[now.date()] if start_time > now.time()
+                ]
+
+            return Response({
+                'store_id': store_id,
+                'store_name': store.store_name,
+                'grooming_duration': total_grooming_duration,
+                'start_date': start,
+                'end_date': end,
+                'available_times': {
+                    day.isoformat(): [start_time.strftime("%H:%M") for start_time in start_times]
+                    for day, start_times in free_starts.items()
+                }
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.create_error_response(
+                f'查詢可預約時段時發生錯誤: {str(e)}', 
+                status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    @action(detail=False, methods=['get'], url_path='earliest_available')
+    def get_earliest_available(self, request):
+        """
+        依最早可開始時間排序的店家：篩選縣市 / 區域內提供該物種美容服務的店家，
+        批次試算所選服務並比對時段，回傳前 limit 家（預設 10，最多 50）
+        """
+        
+        try:
+            species = request.query_params.get('species')
+            pet_size = request.query_params.get('pet_size')
+            pet_fur_amount = request.query_params.get('fur_amount')
+            county = request.query_params.get('county')
+            selected_services = self.get_selected_services(request)
+
+            # 驗證必要欄位
+            validation_error = self.validate_required_fields([
+                species, pet_size, pet_fur_amount, county, selected_services
+            ])
+            if validation_error:
+                return validation_error
+
+            start, end, date_error = self.parse_date_range(
+                request.query_params.get('start_date'), request.query_params.get('end_date')
+            )
+            if date_error:
+                return date_error
+
+            earliest_time, latest_time, time_error = self.parse_time_window(
+                request.query_params.get('earliest_time'), request.query_params.get('latest_time')
+            )
+            if time_error:
+                return time_error
+
+            try:
+                limit = min(max(int(request.query_params.get('limit', EARLIEST_RESULTS_LIMIT)), 1), MAX_EARLIEST_RESULTS_LIMIT)
+            except ValueError:
+                return self.create_error_response(
+                    'limit 需為整數', 
+                    status.HTTP_400_BAD_REQUEST
+                )
+
+            # 沿用顧客店家列表的篩選（搜尋索引），候選店家數有上限
+            store_filter = CustomerStoreFilter({
+                'service_type': 'grooming',
+                'species': species,
+                'county': county,
+                'district': request.query_params.get('district', ''),
+            }, queryset=CustomerStoreViewSet.queryset)
+            if not store_filter.is_valid():
+                return self.create_validation_error_response('查詢條件錯誤', store_filter.errors)
+            stores = store_filter.qs[:MAX_EARLIEST_CANDIDATES]
+
+            results = EarliestGroomingSearch(
+                selected_services, species, pet_size, pet_fur_amount, start, end,
+                timezone.localtime(), earliest_time, latest_time
+            ).run(stores)
+
+            return Response({
+                'count': len(results),
+                'start_date': start,
+                'end_date': end,
+                'results': [
+                    {
+                        'id': result['store'].pk,
+                        'store_id': result['store'].user_id_id,
+                        'store_name': result['store'].store_name,
+                        'address': result['store'].address,
+                        'earliest_date': result['start'].date().isoformat(),
+                        'earliest_time': result['start'].strftime("%H:%M"),
+                        'total_price': result['total_price'],
+                        'grooming_duration': result['grooming_duration'],
+                    }
+                    for result in results[:limit]
+                ]
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.create_error_response(
+                f'查詢最早可預約店家時發生錯誤: {str(e)}', 
+                status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
     @action(detail=False, methods=['post'], url_path='user_create')
     def create_reservation(self, request):
         """建立美容預約(客戶端)"""
@@ -884,7 +1124,7 @@ class GroomingReservationViewSet(viewsets.ModelViewSet):
 
             # 計算服務持續時間和價格
             total_grooming_duration, total_price, calculation_error = self.calculate_service_duration_and_price(
-                selected_services, store_id, pet_info['pet_size'], pet_info['pet_fur_amount']
+                selected_services, store_id, pet_info['pet_type'], pet_info['pet_size'], pet_info['pet_fur_amount']
             )
 
             if calculation_error:
@@ -895,12 +1135,9 @@ class GroomingReservationViewSet(viewsets.ModelViewSet):
             if datetime_error:
                 return datetime_error
 
-            # 創建不可用時間段
-            unavailable_times = self.create_unavailable_time_slots(reservation_datetime, total_grooming_duration)
-            
             # 檢查時間段可用性
             availability_error = self.check_time_slot_availability(
-                unavailable_times, store_name, reservation_datetime.date()
+                store_name, reservation_datetime, total_grooming_duration
             )
             if availability_error:
                 return availability_error
@@ -909,31 +1146,25 @@ class GroomingReservationViewSet(viewsets.ModelViewSet):
             reservation_data = self.create_reservation_data_dict(
                 reservation_id, store_name, customer_info['user_name'], customer_info['user_phone'],
                 selected_services, pet, pet_info['pet_size'], pick_up_service,
-                reservation_datetime, customer_note, '', total_price, total_grooming_duration
+                reservation_datetime, customer_note, '', total_price, total_grooming_duration,
+                store, user_id
             )
 
-            serializer = ReservationGroomingSerializer(data=reservation_data)
-
-            if serializer.is_valid():
-                serializer.save()
+            reservation, save_error = self.save_reservation_with_schedules(reservation_data)
+            if save_error:
+                return save_error
 
-                coupon_number, coupon_error = self.check_and_process_user_coupon(user_id, reservation_id, store_id)
-                if coupon_error:
-                    return coupon_error
+            coupon_number, coupon_error = self.check_and_process_user_coupon(user_id, reservation_id, store_id)
+            if coupon_error:
+                return coupon_error
 
-                response_data = self.create_success_response_data(
-                    reservation_id, customer_info['user_name'], reservation_date, reservation_time,
-                    selected_services, pet.name, pet.species, store_id, store_info['store_phone'], coupon_number,
-                    
-                )
+            response_data = self.create_success_response_data(
+                reservation_id, customer_info['user_name'], reservation_date, reservation_time,
+                selected_services, pet.name, pet.species, store_id, store_info['store_phone'], coupon_number,
+                
+            )
 
-                return Response(response_data, status=status.HTTP_201_CREATED)
-            
-            else:
-                return self.create_validation_error_response(
-                    '預約資料驗證失敗',
-                    serializer.errors
-                )
+            return Response(response_data, status=status.HTTP_201_CREATED)
 
         except Exception as e:
             return self.create_error_response(
@@ -985,7 +1216,7 @@ class GroomingReservationViewSet(viewsets.ModelViewSet):
 
             # 計算服務持續時間
             total_grooming_duration, total_price, calculation_error = self.calculate_service_duration_and_price(
-                selected_services, store_id, pet_size, pet_fur_amount
+                selected_services, store_id, pet_type, pet_size, pet_fur_amount
             )
             if calculation_error:
                 return calculation_error
@@ -995,25 +1226,17 @@ class GroomingReservationViewSet(viewsets.ModelViewSet):
             if datetime_error:
                 return datetime_error
             
-            # 創建不可用時間段（店家端計算方式略有不同）
-            total_grooming_duration_count = math.ceil(total_grooming_duration / 15) - 1
-            grooming_unavailable_time = []
-            current_time = reservation_datetime
-
-            for i in range(total_grooming_duration_count + 1):
-                grooming_unavailable_time.append(current_time.time())
-                current_time += timedelta(minutes=15)
-
             # 檢查時間段可用性
             availability_error = self.check_time_slot_availability(
-                grooming_unavailable_time, store_info['store_name'], reservation_datetime.date()
+                store_info['store_name'], reservation_datetime, total_grooming_duration
             )
 
             if availability_error:
                 return availability_error
 
-            # 創建預約資料（店家端不計算價格）
+            # 創建預約資料（店家端不計算價格），顧客為會員時一併關聯會員與寵物
             reservation_id = create_reservation_id(service_type)
+            customer_user_id, pet_pk = resolve_customer_pet(user_name, user_phone, pet_name)
             reservation_data = {
                 'reservation_id': reservation_id,
                 'store_name': store_info['store_name'],
@@ -1030,26 +1253,23 @@ class GroomingReservationViewSet(viewsets.ModelViewSet):
                 'grooming_period': total_grooming_duration,
                 'customer_note': '',
                 'store_note': store_note,
-                'status': 'pending'
+                'status': 'pending',
+                'store_id': store.id,
+                'user_id': customer_user_id,
+                'pet_id': pet_pk
             }
 
-            # 序列化和保存
-            serializer = ReservationGroomingSerializer(data=reservation_data)
+            # 序列化和保存（含時段）
+            reservation, save_error = self.save_reservation_with_schedules(reservation_data)
+            if save_error:
+                return save_error
 
-            if serializer.is_valid():
-                serializer.save()
-                response_data = self.create_success_response_data(
-                    reservation_id, user_name, reservation_date, reservation_time,
-                    selected_services, pet_name, pet_type, store_id, store_info['store_phone']
-                )
+            response_data = self.create_success_response_data(
+                reservation_id, user_name, reservation_date, reservation_time,
+                selected_services, pet_name, pet_type, store_id, store_info['store_phone']
+            )
 
-                return Response(response_data, status=status.HTTP_201_CREATED)
-            
-            else:
-                return self.create_validation_error_response(
-                    '預約資料驗證失敗',
-                    serializer.errors
-                )
+            return Response(response_data, status=status.HTTP_201_CREATED)
 
         except Exception as e:
             return self.create_error_response(
@@ -1236,7 +1456,8 @@ class BoardingCalculationViewSet(viewsets.ModelViewSet):
             'pricing': room_pricing.pricing
         }
 
-        if room_pricing.overtime_charging:
+        # overtime_charging 為「不加收」超時費
+        if not room_pricing.overtime_charging and room_pricing.overtime_rate:
             service_detail['overtime_price'] = room_pricing.overtime_rate
         
         return service_detail
@@ -1333,63 +1554,33 @@ class BoardingCalculationViewSet(viewsets.ModelViewSet):
         return duration_in_days
 
 
-    def process_multiple_boarding_services(self, boarding_services_queryset: QuerySet, room_type: any) -> List[Dict]:
-        """處理多個住宿服務"""
-        service_details = []
-        
-        for boarding_service in boarding_services_queryset:
-            try:
-                if boarding_service.room_type == room_type:
-                    pricing_queryset = BoardingServicePricing.objects.filter(boarding_service_id=boarding_service.id)
-                    
-                    for pricing in pricing_queryset:
-                        if pricing.duration_unit == 'week':
-                            pricing.duration = int(pricing.duration) * 7
-
-                        elif pricing.duration_unit == 'month':
-                            pricing.duration = int(pricing.duration) * 30
-
-                        elif pricing.duration_unit == 'day':
-                            pass
-
-                        service_details.append({
-                            "duration_in_days": int(pricing.duration),
-                            "duration_unit": 'day',
-                            "pricing": pricing.pricing,
-                            "overtime_charging": pricing.overtime_charging,
-                            "overtime_rate": pricing.overtime_rate
-                            })
+    def get_room_tariff(self, store_id: str, room_type: str, pet_species: Optional[str] = None) -> Optional[RoomTariff]:
+        """獲取房型價目（店家住宿價目快取）"""
+        return BoardingTariff.for_store(store_id).room(room_type, pet_species)
 
-            except BoardingService.DoesNotExist:
-                continue
-
-        return service_details
+    def parse_overtime_hours(self, check_in_date: str, check_in_time: str,
+                             check_out_date: str, check_out_time: str) -> Tuple[int, Optional[Response]]:
+        """解析入住、退房時刻並計算超時時數"""
+        try:
+            checkin_datetime = datetime.strptime(f'{check_in_date} {check_in_time}', "%Y-%m-%d %H:%M")
+            checkout_datetime = datetime.strptime(f'{check_out_date} {check_out_time}', "%Y-%m-%d %H:%M")
+        except ValueError:
+            return 0, self.create_date_validation_error_response('時間格式錯誤，請使用 HH:MM 格式')
+        return overtime_hours(checkin_datetime, checkout_datetime), None
 
-    def select_best_pricing_option(self, service_details: List[Dict], boarding_duration: int) -> Tuple[Dict, int, Optional[Response]]:
-        """選擇最佳定價選項"""
-        # 驗證價格選項
-        valid_pricing_options = [detail for detail in service_details if 'pricing' in detail]
+    def select_best_pricing_option(self, room_tariff: RoomTariff, boarding_duration: int,
+                                   overtime: int = 0) -> Tuple[Dict, int, Optional[Response]]:
+        """選擇總價最低的定價方案（每晚價格 × 晚數 + 超時費）"""
+        best_pricing_option = room_tariff.plan(boarding_duration, overtime)
 
-        if not valid_pricing_options:
+        if best_pricing_option is None:
             error_response = self.create_error_response(
                 '沒有找到有效的價格資訊', 
                 status.HTTP_404_NOT_FOUND
             )
             return {}, 0, error_response
-        
-        # 選擇最適合的價格選項
-        suitable_options = [
-            option for option in valid_pricing_options 
-            if option['duration_in_days'] <= boarding_duration
-        ]
-        
-        if suitable_options:
-            best_pricing_option = max(suitable_options, key=lambda x: x['duration_in_days'])
-        else:
-            best_pricing_option = min(valid_pricing_options, key=lambda x: x['duration_in_days'])
-        
-        total_cost = boarding_duration * best_pricing_option['pricing']
-        return best_pricing_option, total_cost, None
+
+        return best_pricing_option, best_pricing_option['total_cost'], None
     
     @action(detail=False, methods=['post'], url_path='calculate')
     def calculate_boarding_cost(self, request):
@@ -1420,6 +1611,10 @@ class BoardingCalculationViewSet(viewsets.ModelViewSet):
             if date_error:
                 return date_error
 
+            overtime, overtime_error = self.parse_overtime_hours(check_in_date, check_in_time, check_out_date, check_out_time)
+            if overtime_error:
+                return overtime_error
+
             # 獲取店家資訊
             store_queryset = self.get_store_queryset(store_id)
             store = store_queryset.first()
@@ -1430,26 +1625,18 @@ class BoardingCalculationViewSet(viewsets.ModelViewSet):
                     status.HTTP_404_NOT_FOUND
                 )
 
-            # 獲取住宿服務
-            boarding_services_queryset = self.get_boarding_services_queryset(store_id)
-            # 建立過濾條件
-            room_type_filters = {
-                'room_type': room_type
-            }
-            
-            if pet_species:
-                room_type_filters['species'] = pet_species
-            
-            # 處理住宿服務
-            service_details = self.process_multiple_boarding_services(boarding_services_queryset, room_type)
-            if not service_details:
+            # 獲取房型價目
+            room_tariff = self.get_room_tariff(store_id, room_type, pet_species)
+            if not room_tariff:
                 return self.create_error_response(
                     f'該店家沒有提供 "{room_type}" 房型的住宿服務', 
                     status.HTTP_404_NOT_FOUND
                 )
     
             # 選擇最佳定價選項
-            best_pricing_option, total_cost, pricing_error = self.select_best_pricing_option(service_details, boarding_duration)
+            best_pricing_option, total_cost, pricing_error = self.select_best_pricing_option(
+                room_tariff, boarding_duration, overtime
+            )
             if pricing_error:
                 return pricing_error
 
@@ -1460,6 +1647,7 @@ class BoardingCalculationViewSet(viewsets.ModelViewSet):
                 'store_name': store.store_name,
                 'pricing_option': best_pricing_option,
                 'boarding_duration_days': boarding_duration,
+                'overtime_hours': overtime,
                 'duration_unit': 'day',
                 'total_boarding_cost': total_cost,
             }
@@ -1502,6 +1690,117 @@ class BoardingCalculationViewSet(viewsets.ModelViewSet):
                 status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def parse_candidate_stays(self, stays: List[Dict]) -> Tuple[List[Tuple[datetime, datetime, int]], Optional[Response]]:
+        """解析候選住宿區間，回傳 (入住時間, 退房時間, 住宿晚數) 列表"""
+        manager = BoardingReservationManager()
+        parsed_stays = []
+        for index, stay in enumerate(stays):
+            data_validation_error = self.validate_required_data(
+                stay.get('check_in_date'), stay.get('check_in_time'),
+                stay.get('check_out_date'), stay.get('check_out_time')
+            )
+            if data_validation_error:
+                return [], data_validation_error
+
+            checkin_datetime, checkout_datetime, boarding_duration, datetime_error = \
+                manager.parse_datetime_from_strings(
+                    stay['check_in_date'], stay['check_in_time'],
+                    stay['check_out_date'], stay['check_out_time']
+                )
+            if datetime_error:
+                return [], self.create_date_validation_error_response(f'第 {index + 1} 筆住宿區間: {datetime_error}')
+
+            parsed_stays.append((checkin_datetime, checkout_datetime, max(1, boarding_duration)))
+        return parsed_stays, None
+
+    @action(detail=False, methods=['post'], url_path='calculate_grid')
+    def calculate_boarding_cost_grid(self, request):
+        """一次試算所有房型 × 候選住宿區間的費用與剩餘房間數"""
+
+        try:
+            store_id = request.query_params.get('store_id')
+            pet_species = request.data.get('pet_species') or request.query_params.get('pet_species')
+            room_types = request.data.get('room_types') or []
+            stays = request.data.get('stays', [])
+
+            if not store_id:
+                return self.create_missing_parameter_error_response('店家ID')
+            if not isinstance(stays, list) or not stays:
+                return self.create_date_validation_error_response('請提供至少一筆住宿區間')
+            if len(stays) > MAX_BATCH_QUOTE_ITEMS:
+                return self.create_date_validation_error_response(f'單次最多試算 {MAX_BATCH_QUOTE_ITEMS} 筆住宿區間')
+
+            parsed_stays, stay_error = self.parse_candidate_stays(stays)
+            if stay_error:
+                return stay_error
+
+            store = self.get_store_queryset(store_id).first()
+            if not store:
+                return self.create_error_response('店家不存在', status.HTTP_404_NOT_FOUND)
+
+            boarding_services = BoardingService.objects.filter(store_id=store)
+            if pet_species:
+                boarding_services = boarding_services.filter(species=pet_species)
+            if room_types:
+                boarding_services = boarding_services.filter(room_type__in=room_types)
+
+            # 一次載入價目、一次掃描所有候選區間涵蓋的預約
+            tariff = BoardingTariff.for_store(store_id)
+            occupancy_by_room = BoardingOccupancy.load_store(
+                store.store_name,
+                min(checkin for checkin, _, _ in parsed_stays),
+                max(checkout for _, checkout, _ in parsed_stays)
+            )
+
+            grid = []
+            for boarding_service in boarding_services.values('room_type', 'species', 'room_count', 'pet_available_amount'):
+                room_type = boarding_service['room_type']
+                room_tariff = tariff.room(room_type, boarding_service['species'])
+                occupancy = BoardingOccupancy.for_room(occupancy_by_room, room_type, boarding_service['species'])
+                # 與住宿月曆相同的容量計算（貓房以房數 × 每房可住隻數計）
+                capacity = room_capacity(
+                    boarding_service['species'], boarding_service['room_count'], boarding_service['pet_available_amount']
+                )
+                quotes = []
+                for checkin_datetime, checkout_datetime, boarding_duration in parsed_stays:
+                    occupied_rooms = occupancy.max_occupancy(checkin_datetime, checkout_datetime)
+                    remaining_rooms = max(0, capacity - occupied_rooms)
+                    quotes.append({
+                        'total_boarding_cost': room_tariff.quote(
+                            boarding_duration, overtime_hours(checkin_datetime, checkout_datetime)
+                        ) if room_tariff else None,
+                        'remaining_rooms': remaining_rooms,
+                        'available': remaining_rooms > 0,
+                    })
+                grid.append({
+                    'room_type': room_type,
+                    'species': boarding_service['species'],
+                    'room_count': boarding_service['room_count'],
+                    'capacity': capacity,
+                    'quotes': quotes,
+                })
+
+            return Response({
+                'success': True,
+                'store_id': store.id,
+                'store_name': store.store_name,
+                'stays': [
+                    {
+                        'check_in': checkin_datetime.strftime('%Y-%m-%d %H:%M'),
+                        'check_out': checkout_datetime.strftime('%Y-%m-%d %H:%M'),
+                        'boarding_duration_days': boarding_duration,
+                    }
+                    for checkin_datetime, checkout_datetime, boarding_duration in parsed_stays
+                ],
+                'room_types': grid,
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.create_error_response(
+                f'計算住宿費用時發生未預期錯誤: {str(e)}', 
+                status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
 
 class BoardingReservationManager:
     """住宿預約管理器"""
@@ -1538,18 +1837,12 @@ class BoardingReservationManager:
             room_type=room_type
         )
     
-    def get_boarding_schedules_queryset(self, store_name: str, room_type: str, time_slot: datetime) -> QuerySet:
-        """獲取住宿時間表 QuerySet"""
-        return BoardingSchedules.objects.filter(
-            store_name=store_name,
-            room_type=room_type,
-            unavailable_time=time_slot
-        )
-    
     def create_reservation_data_dict(self, reservation_id: str, store_name: str, user_name: str, 
                                    user_phone: str, pet_name: str, room_type: str,
                                    checkin_datetime: datetime, checkout_datetime: datetime,
-                                   total_price, customer_note: str = '', store_note: str = '') -> Dict:
+                                   total_price, customer_note: str = '', store_note: str = '',
+                                   store: Optional[Store] = None, user_id: Optional[str] = None,
+                                   pet_pk: Optional[int] = None) -> Dict:
         """創建預約資料字典"""
         return {
             'reservation_id': reservation_id,
@@ -1564,7 +1857,10 @@ class BoardingReservationManager:
             'customer_note': customer_note,
             'store_note': store_note,
             'status': 'pending',
-            'total_price': total_price
+            'total_price': total_price,
+            'store_id': store.id if store else None,
+            'user_id': user_id,
+            'pet_id': pet_pk
         }
     
     def create_success_response_data(self, user_name: str, checkin_datetime: datetime,
@@ -1612,39 +1908,40 @@ class BoardingReservationManager:
         except ValueError:
             return None, None, 0, '日期或時間格式錯誤，請使用 YYYY-MM-DD 和 HH:MM 格式'
     
-    def generate_time_slots(self, checkin_datetime: datetime, checkout_datetime: datetime) -> List[datetime]:
-        """生成時間段列表（每30分鐘一個時間段）"""
-        time_slots = []
-        current_datetime = checkin_datetime
-        
-        while current_datetime < checkout_datetime:
-            time_slots.append(current_datetime)
-            current_datetime += timedelta(minutes=30)
-        
-        return time_slots
-    
-    def validate_room_availability(self, store_name: str, room_type: str, 
-                                 time_slots: List[datetime], room_count: int) -> Optional[str]:
-        """驗證房間可用性"""
-        for time_slot in time_slots:
-            occupied_rooms_queryset = self.get_boarding_schedules_queryset(store_name, room_type, time_slot)
-            occupied_rooms = occupied_rooms_queryset.count()
-            
-            if occupied_rooms >= room_count:
-                return f'房型 "{room_type}" 在 {time_slot.strftime("%Y-%m-%d %H:%M")} 時段已額滿'
+    def validate_room_availability(self, store_name: str, room_type: str, species: str, checkin_datetime: datetime,
+                                 checkout_datetime: datetime, capacity: int) -> Optional[str]:
+        """驗證房間可用性（單次範圍查詢 + 掃描線計算最大同時佔用數），與住宿月曆相同以 (物種, 房型) 計算"""
+        occupancy = BoardingOccupancy.load(store_name, room_type, species, checkin_datetime, checkout_datetime)
+        occupied_rooms, peak_at = occupancy.peak(checkin_datetime, checkout_datetime)
+
+        if occupied_rooms >= capacity:
+            peak_at = timezone.localtime(peak_at) if peak_at else checkin_datetime
+            return f'房型 "{room_type}" 在 {peak_at.strftime("%Y-%m-%d %H:%M")} 時段已額滿'
         
         return None
     
-    def find_room_type_info(self, boarding_services_queryset: QuerySet, room_type: str) -> Tuple[Optional[BoardingService], Optional[str]]:
-        """查找房間類型資訊"""
-        room_type_obj = {}
+    def find_room_type_info(self, boarding_services_queryset: QuerySet, room_type: str,
+                            species: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """查找房間類型資訊：狗房與貓房可能同名，優先取該物種的房型，沒有時回傳同名的其他物種房型供呼叫端判斷"""
+        room_type_obj = None
         for boarding_service in boarding_services_queryset:
-            if boarding_service.room_type == room_type:
-                room_type_obj["room_count"] = boarding_service.room_count
-                room_type_obj["species"] = boarding_service.species
-                return room_type_obj, None
-        
-        return None, f'找不到房型 "{room_type}"'
+            if boarding_service.room_type != room_type:
+                continue
+            if room_type_obj is None or boarding_service.species == species:
+                room_type_obj = {
+                    'room_count': boarding_service.room_count,
+                    'species': boarding_service.species,
+                    # 與住宿月曆相同的容量計算（貓房以房數 × 每房可住隻數計）
+                    'capacity': room_capacity(
+                        boarding_service.species, boarding_service.room_count, boarding_service.pet_available_amount
+                    ),
+                }
+            if boarding_service.species == species:
+                break
+
+        if room_type_obj is None:
+            return None, f'找不到房型 "{room_type}"'
+        return room_type_obj, None
     
     def get_user_coupon_queryset(self, user_id: int) -> QuerySet:
         """獲取用戶優惠券 QuerySet"""
@@ -1657,12 +1954,8 @@ class BoardingReservationManager:
             coupon_queryset = self.get_user_coupon_queryset(user_id)
             coupon = coupon_queryset.first()
             
-            if coupon and coupon.status == CouponStatus.NOT_USED:
-                # 更新預約ID和店家ID
-                coupon.reservation_id = reservation_id
-                coupon.store_id = store_id
-                coupon.save()
-                
+            if coupon and coupon.status == CouponStatus.NOT_USED and claim_coupon(coupon, reservation_id, store_id):
+                # 已更新預約ID和店家ID（首次綁定時扣除活動額度）
                 return coupon.coupon_number, None
             else:
                 # 沒有可用優惠券或已使用
@@ -1681,64 +1974,11 @@ class BoardingReservationViewSet(viewsets.ModelViewSet):
         super().__init__(**kwargs)
         self.manager = BoardingReservationManager()
     
-    def calculate_boarding_total_price(self, store_id: str, room_type: str, pet_species: str, boarding_duration: int) -> Optional[int]:
-        """計算住宿總價格 - 複用 BoardingCalculationViewSet 的邏輯"""
+    def calculate_boarding_total_price(self, store_id: str, room_type: str, pet_species: str, boarding_duration: int,
+                                       overtime: int = 0) -> Optional[int]:
+        """計算住宿總價格 - 與 BoardingCalculationViewSet 共用住宿價目"""
         try:
-            boarding_services_queryset = self.manager.get_boarding_services_queryset(store_id)
-            service_details = []
-            
-            for boarding_service in boarding_services_queryset:
-                if boarding_service.room_type == room_type and boarding_service.species == pet_species:
-                    try:
-                        from pet_booking.services.models import BoardingServicePricing
-
-                        pricing_queryset = BoardingServicePricing.objects.filter(boarding_service_id=boarding_service.id)
-                        
-                        for pricing in pricing_queryset:
-                            duration_in_days = pricing.duration
-                            
-                            # 轉換時間單位為天數
-                            if pricing.duration_unit == 'week':
-                                duration_in_days = int(pricing.duration) * 7
-                            elif pricing.duration_unit == 'month':
-                                duration_in_days = int(pricing.duration) * 30
-                            elif pricing.duration_unit == 'day':
-                                duration_in_days = int(pricing.duration)
-                                
-                            service_details.append({
-                                "duration_in_days": duration_in_days,
-                                "duration_unit": 'day',
-                                "pricing": pricing.pricing,
-                                "overtime_charging": pricing.overtime_charging,
-                                "overtime_rate": pricing.overtime_rate
-                            })
-                    except Exception:
-                        continue
-            
-            if not service_details:
-                return None
-            
-            # 選擇最佳定價選項 - 複用 BoardingCalculationViewSet 的邏輯
-            valid_pricing_options = [detail for detail in service_details if 'pricing' in detail]
-
-            if not valid_pricing_options:
-                return None
-            
-            # 選擇最適合的價格選項
-            suitable_options = [
-                option for option in valid_pricing_options 
-                if option['duration_in_days'] <= boarding_duration
-            ]
-            
-            if suitable_options:
-                best_pricing_option = max(suitable_options, key=lambda x: x['duration_in_days'])
-            else:
-                best_pricing_option = min(valid_pricing_options, key=lambda x: x['duration_in_days'])
-            
-            # 計算總價格
-            total_cost = boarding_duration * best_pricing_option['pricing']
-            return total_cost
-            
+            return BoardingTariff.for_store(store_id).quote(room_type, boarding_duration, pet_species, overtime)
         except Exception as e:
             print(f"計算住宿費用時發生錯誤: {str(e)}")
             return None
@@ -1847,7 +2087,7 @@ class BoardingReservationViewSet(viewsets.ModelViewSet):
 
             # 查找房間類型
             room_type_obj, room_error = self.manager.find_room_type_info(
-                boarding_services_queryset, request_data['room_type']
+                boarding_services_queryset, request_data['room_type'], pet.species
             )
             
             if room_error:
@@ -1870,13 +2110,10 @@ class BoardingReservationViewSet(viewsets.ModelViewSet):
             if datetime_error:
                 return self.create_error_response(datetime_error, status.HTTP_400_BAD_REQUEST)
 
-            # 生成時間段
-            time_slots = self.manager.generate_time_slots(checkin_datetime, checkout_datetime)
-            
             # 驗證房間可用性
             availability_error = self.manager.validate_room_availability(
-                request_data['store_name'], request_data['room_type'], 
-                time_slots, room_type_obj['room_count']
+                request_data['store_name'], request_data['room_type'], pet.species,
+                checkin_datetime, checkout_datetime, room_type_obj['capacity']
             )
 
             if availability_error:
@@ -1884,7 +2121,7 @@ class BoardingReservationViewSet(viewsets.ModelViewSet):
             # 計算住宿費用 - 使用 BoardingCalculationViewSet 的邏輯
             total_price = self.calculate_boarding_total_price(
                 request_data['store_id'], request_data['room_type'], 
-                pet.species, boarding_duration
+                pet.species, boarding_duration, overtime_hours(checkin_datetime, checkout_datetime)
             )
             if total_price is None:
                 return self.create_error_response(
@@ -1899,13 +2136,16 @@ class BoardingReservationViewSet(viewsets.ModelViewSet):
             reservation_data = self.manager.create_reservation_data_dict(
                 reservation_id, request_data['store_name'], customer_profile.full_name,
                 customer_profile.phone or '', request_data['pet_name'], request_data['room_type'],
-                checkin_datetime, checkout_datetime, total_price, request_data['customer_note']
+                checkin_datetime, checkout_datetime, total_price, request_data['customer_note'], '',
+                store, request_data['user_id'], pet.id
             )
             
             serializer = ReservationBoardingSerializer(data=reservation_data)
 
             if serializer.is_valid():
-                serializer.save()
+                with transaction.atomic():
+                    reservation = serializer.save()
+                    record_status_change(reservation, None, reservation.status)
 
             # 檢查並處理用戶優惠券
             coupon_number, coupon_error = self.manager.check_and_process_user_coupon(
@@ -1955,9 +2195,6 @@ class BoardingReservationViewSet(viewsets.ModelViewSet):
             if datetime_error:
                 return self.create_error_response(datetime_error, status.HTTP_400_BAD_REQUEST)
             
-            # 生成時間段
-            time_slots = self.manager.generate_time_slots(checkin_datetime, checkout_datetime)
-
             # 獲取住宿服務
             boarding_services_queryset = self.manager.get_boarding_services_queryset(request_data['store_id'])
             
@@ -1966,16 +2203,23 @@ class BoardingReservationViewSet(viewsets.ModelViewSet):
             
             # 查找房間類型
             room_type_obj, room_error = self.manager.find_room_type_info(
-                boarding_services_queryset, request_data['room_type']
+                boarding_services_queryset, request_data['room_type'], request_data['pet_type']
             )
             
             if room_error:
                 return self.create_error_response(room_error, status.HTTP_404_NOT_FOUND)
+
+            # 驗證寵物類型與房型的物種是否一致
+            if request_data['pet_type'] != room_type_obj['species']:
+                return self.create_error_response(
+                    f"寵物類型 ({request_data['pet_type']}) 與房型的物種 ({room_type_obj['species']}) 不一致，無法預約。",
+                    status.HTTP_400_BAD_REQUEST
+                )
             
             # 驗證房間可用性
             availability_error = self.manager.validate_room_availability(
-                store.store_name, request_data['room_type'], 
-                time_slots, room_type_obj['room_count']
+                store.store_name, request_data['room_type'], request_data['pet_type'],
+                checkin_datetime, checkout_datetime, room_type_obj['capacity']
             )
             
             if availability_error:
@@ -1983,22 +2227,27 @@ class BoardingReservationViewSet(viewsets.ModelViewSet):
             
             total_price = self.calculate_boarding_total_price(
                 request_data['store_id'], request_data['room_type'], 
-                request_data['pet_type'], boarding_duration
+                request_data['pet_type'], boarding_duration, overtime_hours(checkin_datetime, checkout_datetime)
             )
             # 創建預約ID
             reservation_id = create_reservation_id(request_data['service_type'])
             
-            # 創建預約資料
+            # 創建預約資料，顧客為會員時一併關聯會員與寵物
+            customer_user_id, pet_pk = resolve_customer_pet(
+                request_data['user_name'], request_data['user_phone'], request_data['pet_name']
+            )
             reservation_data = self.manager.create_reservation_data_dict(
                 reservation_id, store.store_name, request_data['user_name'],
                 request_data['user_phone'], request_data['pet_name'], request_data['room_type'],
-                checkin_datetime, checkout_datetime, total_price, '', request_data['store_note'], 
-                
+                checkin_datetime, checkout_datetime, total_price, '', request_data['store_note'],
+                store, customer_user_id, pet_pk
             )
             serializer = ReservationBoardingSerializer(data=reservation_data)
 
             if serializer.is_valid():
-                serializer.save()
+                with transaction.atomic():
+                    reservation = serializer.save()
+                    record_status_change(reservation, None, reservation.status)
             
             # 創建成功回應
             response_data = self.manager.create_success_response_data(
@@ -1,31 +1,31 @@
 # origin 
 from collections import defaultdict
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 # third-party
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Count
+from django.db import transaction
 
 from pet_booking.stores.models import Store
 from pet_booking.services.models import BoardingService
 from pet_booking.reservations.models import ReservationBoarding
+from pet_booking.reservations.pagination import ReservationPagination
+from pet_booking.reservations.occupancy import BoardingCalendar, day_start, room_capacity
+from pet_booking.reservations.resolvers import CustomerPetResolver, store_reservations
 from pet_booking.reservations.serializers import BoardingStoreNoteUpdateSerializer, OrdersSerializer
+from pet_booking.reservations.stats import get_daily_stats, record_status_change
 from pet_booking.customers.models import CustomersProfile  
-from pet_booking.customers.models import Pet
-from pet_booking.coupon.models import Coupon, CouponStatus
+from pet_booking.coupon.quota import store_used_coupons, use_coupon
 
 
-
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 5
-    page_size_query_param = 'page_size'
-    max_page_size = 10
+# 住宿月曆預設及最大查詢天數
+DEFAULT_CALENDAR_DAYS = 90
+MAX_CALENDAR_DAYS = 366
 
 
 class BoardingRoomAvailabilityViewSet(viewsets.ReadOnlyModelViewSet):
@@ -35,7 +35,7 @@ class BoardingRoomAvailabilityViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        today = timezone.now().date()
+        today = timezone.localdate()
         store_id = self.request.query_params.get('store_id')
         if not store_id:
             return ReservationBoarding.objects.none()
@@ -45,14 +45,14 @@ class BoardingRoomAvailabilityViewSet(viewsets.ReadOnlyModelViewSet):
             return ReservationBoarding.objects.filter(
                 store_name=store.store_name,
                 status='confirmed',
-                checkin_date__date__lte=today,
-                checkout_date__date__gte=today
+                checkin_date__lt=day_start(today + timedelta(days=1)),
+                checkout_date__gte=day_start(today)
             )
         except Store.DoesNotExist:
             return ReservationBoarding.objects.none()
     
     def list(self, request, *args, **kwargs):
-        today = timezone.now().date()
+        today = timezone.localdate()
         store_id = request.query_params.get('store_id')
 
         if not store_id:
@@ -73,81 +73,96 @@ class BoardingRoomAvailabilityViewSet(viewsets.ReadOnlyModelViewSet):
                 'error': 'No boarding services found for this store'
             }, status=status.HTTP_404_NOT_FOUND)
 
-        # 2. 取得 status=confirmed 且今日在 checkin_date 和 checkout_date 之間的預訂
-        confirmed_reservations = ReservationBoarding.objects.filter(
-            store_name=store_name,
-            status='confirmed',
-            checkin_date__date__lte=today,
-            checkout_date__date__gte=today
-        ).values('room_type').annotate(count=Count('id'))
-
-        # 3. 取得 pending 和 confirmed 的總統計
-        pending_count = ReservationBoarding.objects.filter(
-            store_name=store_name,
-            status='pending'
-        ).count()
-
-        
-
-        # 4. 組織資料結構
-        # 先建立房型使用數量的字典
-        room_usage = {}
-        for reservation in confirmed_reservations:
-            room_usage[reservation['room_type']] = reservation['count']
+        # 2. 今日待審核與已確認筆數由每日統計以唯一鍵取得
+        daily_stats = get_daily_stats(store.id, today, 'boarding')
 
-        # 5. 按 pet_type (species) 組織結果
+        # 3. 按 pet_type (species) 組織各房型的房間數與可收容數，每日佔用數請見住宿月曆
         result_by_species = defaultdict(lambda: {
             'room_types': [],
         })
-        count_usage = 0
         for service in boarding_services:
             species = service['species']
-            room_type = service['room_type']
-            total_rooms = service['room_count']
-            pet_available_count = service['pet_available_amount']
-
-            # 計算該房型目前被使用的數量
-            used_rooms = room_usage.get(room_type, 0)
-
+            room_type = {'room_type': service['room_type'], 'total_count': service['room_count']}
             if species == 'cat':
-                # 計算剩餘空位數量
-                total_pet_slots = total_rooms * pet_available_count
-                remaining_pet_slots = max(0, total_pet_slots - used_rooms)
-                result_by_species[species]['room_types'].append({
-                    'room_type': room_type,
-                    'total_count': total_rooms,
-                    'pet_available_count': pet_available_count,
-                    'total_slots': total_pet_slots,
-                    'used_slots': used_rooms,
-                    'remaining_pet_slots': remaining_pet_slots
-                })
-
-                count_usage += used_rooms
-            elif species == 'dog':
-                # 計算剩餘房間數量
-                remaining_rooms = max(0, total_rooms - used_rooms)
-                result_by_species[species]['room_types'].append({
-                    'room_type': room_type,
-                    'total_count': total_rooms,
-                    'used_count': used_rooms,
-                    'remaining_count': remaining_rooms,
-                })
-                count_usage += used_rooms
+                room_type['pet_available_count'] = service['pet_available_amount']
+                room_type['total_slots'] = room_capacity(species, service['room_count'], service['pet_available_amount'])
+            result_by_species[species]['room_types'].append(room_type)
 
-        confirmed_total_count = ReservationBoarding.objects.filter(
-            store_name=store_name,
-            status='confirmed',
-            checkin_date__date__gte=today
-        ).count() + count_usage
-
-        # 6. 格式化最終回傳資料
+        # 4. 格式化最終回傳資料
         return Response({
             'store_id': store_id,
             'store_name': store_name,
             'date': today.isoformat(),
             'species_data': dict(result_by_species),
-            'pending_count': pending_count,
-            'confirmed_count': confirmed_total_count
+            'pending_count': daily_stats.pending,
+            'confirmed_count': daily_stats.confirmed
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='calendar')
+    def calendar(self, request):
+        """
+        住宿月曆：日期區間內每個房型每日的剩餘房間數（狗）或剩餘空位數（貓）
+        """
+        store_id = request.query_params.get('store_id')
+        if not store_id:
+            return Response({
+                'error': 'store_id is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            today = timezone.localdate()
+            start_param = request.query_params.get('start_date')
+            end_param = request.query_params.get('end_date')
+            start_date = datetime.strptime(start_param, '%Y-%m-%d').date() if start_param else today
+            end_date = datetime.strptime(end_param, '%Y-%m-%d').date() if end_param \
+                else start_date + timedelta(days=DEFAULT_CALENDAR_DAYS - 1)
+        except ValueError:
+            return Response({
+                'error': 'Invalid date format. Use YYYY-MM-DD'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if end_date < start_date:
+            return Response({
+                'error': 'end_date must not be earlier than start_date'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if (end_date - start_date).days >= MAX_CALENDAR_DAYS:
+            return Response({
+                'error': f'Date range cannot exceed {MAX_CALENDAR_DAYS} days'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        store = get_object_or_404(Store, user_id__user_id=store_id)
+
+        boarding_services = BoardingService.objects.filter(
+            store_id=store
+        ).values('species', 'room_type', 'room_count', 'pet_available_amount')
+
+        if not boarding_services:
+            return Response({
+                'error': 'No boarding services found for this store'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        # 一次查詢載入區間內所有住宿預約，以前綴和展開為每日佔用數
+        calendar = BoardingCalendar.load(store.store_name, start_date, end_date)
+
+        room_types = []
+        for service in boarding_services:
+            capacity = room_capacity(service['species'], service['room_count'], service['pet_available_amount'])
+            room_types.append({
+                'species': service['species'],
+                'room_type': service['room_type'],
+                'total_count': service['room_count'],
+                'capacity': capacity,
+                'used': calendar.used(service['room_type'], service['species']),
+                'remaining': calendar.remaining(service['room_type'], capacity, service['species']),
+            })
+
+        return Response({
+            'store_id': store_id,
+            'store_name': store.store_name,
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'dates': [day.isoformat() for day in calendar.dates()],
+            'room_types': room_types
         }, status=status.HTTP_200_OK)
 
 
@@ -206,9 +221,11 @@ class BoardingReservationManagementViewSet(viewsets.ViewSet):
                 status='pending'
             )
             
-            reservation.status = 'confirmed'
-            reservation.store_note = store_note
-            reservation.save()
+            with transaction.atomic():
+                reservation.status = 'confirmed'
+                reservation.store_note = store_note
+                reservation.save()
+                record_status_change(reservation, 'pending', 'confirmed')
 
             response_data = {
                 'message': 'Reservation confirmed successfully',
@@ -241,8 +258,10 @@ class BoardingReservationManagementViewSet(viewsets.ViewSet):
                 status='pending'
             )
             
-            reservation.status = 'cancelled'
-            reservation.save()
+            with transaction.atomic():
+                reservation.status = 'cancelled'
+                reservation.save()
+                record_status_change(reservation, 'pending', 'cancelled')
 
             return Response({
                 'message': 'Reservation cancelled successfully',
@@ -272,8 +291,10 @@ class BoardingReservationManagementViewSet(viewsets.ViewSet):
                 status='confirmed'
             )
             
-            reservation.status = 'cancelled'
-            reservation.save()
+            with transaction.atomic():
+                reservation.status = 'cancelled'
+                reservation.save()
+                record_status_change(reservation, 'confirmed', 'cancelled')
 
             return Response({
                 'message': 'Confirmed reservation cancelled successfully',
@@ -298,17 +319,21 @@ class BoardingReservationManagementViewSet(viewsets.ViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            reservation = ReservationBoarding.objects.get(
+            reservation = ReservationBoarding.objects.select_related('store_id').get(
                 reservation_id=reservation_id,
                 status='confirmed'
             )
 
+            # 預約已關聯會員時直接使用，舊資料才以 user_name 和 user_phone 查找 user_id
             try:
-                customer_profile = CustomersProfile.objects.get(
-                    full_name=reservation.user_name,
-                    phone=reservation.user_phone
-                )
-                user_id = customer_profile.user_id.user_id
+                if reservation.user_id_id:
+                    user_id = reservation.user_id_id
+                else:
+                    customer_profile = CustomersProfile.objects.get(
+                        full_name=reservation.user_name,
+                        phone=reservation.user_phone
+                    )
+                    user_id = customer_profile.user_id.user_id
 
             except CustomersProfile.DoesNotExist:
                 return Response({
@@ -338,27 +363,22 @@ class BoardingReservationManagementViewSet(viewsets.ViewSet):
                     'details': order_serializer.errors
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            reservation.status = 'finished'
-            reservation.save()
-            order = order_serializer.save()
+            with transaction.atomic():
+                reservation.status = 'finished'
+                reservation.save()
+                order = order_serializer.save()
+                record_status_change(reservation, 'confirmed', 'finished')
 
             # 處理優惠券：根據 reservation_id 找到對應的優惠券並更新狀態
             try:
-                coupon = Coupon.objects.get(reservation_id=reservation_id)
-                coupon.status = CouponStatus.USED
-                coupon.order_id = str(order.id)
-                coupon.save()
-            except Coupon.DoesNotExist:
-                pass
+                use_coupon(reservation_id, str(order.id))
             except Exception as coupon_error:
                 print(f"優惠券處理錯誤: {coupon_error}")
 
             try:
-                store = Store.objects.get(store_name=reservation.store_name)
-                used_coupons_count = Coupon.objects.filter(
-                    store_id=store.id,
-                    status=CouponStatus.USED
-                ).count()
+                store = reservation.store_id or Store.objects.get(store_name=reservation.store_name)
+                # 優惠券的 store_id 記錄的是店家的 user_id
+                used_coupons_count = store_used_coupons(store.user_id_id)
                 used_coupons_total_revenue = 50 * int(used_coupons_count)
             except Store.DoesNotExist:
                 used_coupons_count = 0
@@ -400,6 +420,19 @@ class BoardingAllReservationsViewSet(viewsets.ViewSet):
     """所有預約資料（待審核 + 近期預約）"""
     permission_classes = [IsAuthenticated]
 
+    def create_reservation_dict(self, reservation, resolver: CustomerPetResolver):
+        pet = resolver.pet(reservation)
+        return {
+            'reservation_id': reservation.reservation_id,
+            'user_name': reservation.user_name,
+            'user_phone': reservation.user_phone,
+            'pet_name': reservation.pet_name,
+            'pet_breed': pet['breed'] if pet else None,
+            'pick_up_service': reservation.pick_up_service,
+            'checkin_date': reservation.checkin_date.date(),
+            'status': reservation.status,
+        }
+
     def list(self, request, *args, **kwargs):
         '''取得所有住宿預約資料（待審核 + 近期預約）'''
         store_id = request.user.user_id
@@ -412,53 +445,27 @@ class BoardingAllReservationsViewSet(viewsets.ViewSet):
         store = Store.objects.filter(user_id=store_id).first()
         store_name = store.store_name
 
-        pending_reservations = ReservationBoarding.objects.filter(
-            store_name=store_name,
+        pending_reservations = list(store_reservations(ReservationBoarding.objects, store).filter(
             status='pending'
-        ).order_by('-created_at')
+        ).select_related('pet_id').order_by('-created_at'))
 
         # get boarding reservation with confirmed status
-        confirmed_reservations = ReservationBoarding.objects.filter(
-            store_name=store_name,
+        confirmed_reservations = list(store_reservations(ReservationBoarding.objects, store).filter(
             status='confirmed'
-        ).order_by('checkin_date')
-
-        pending_count = pending_reservations.count()
-        confirmed_count = confirmed_reservations.count()
-        confirmed_reservations_data = []
-
-        for reservation in confirmed_reservations:
-            user_id = CustomersProfile.objects.filter(full_name=reservation.user_name, phone=reservation.user_phone).first().user_id.user_id
-            pet = Pet.objects.filter(user_id=user_id, name=reservation.pet_name).values('breed', 'size').first()
-            pet_breed = pet['breed'] if pet else None
-
-            confirmed_reservations_data.append({
-                'reservation_id': reservation.reservation_id,
-                'user_name': reservation.user_name,
-                'user_phone': reservation.user_phone,
-                'pet_name': reservation.pet_name,
-                'pet_breed': pet_breed,
-                'pick_up_service': reservation.pick_up_service,
-                'checkin_date': reservation.checkin_date.date(),
-                'status': reservation.status,
-            })
+        ).select_related('pet_id').order_by('checkin_date'))
 
-        pending_reservations_data = []
+        pending_count = len(pending_reservations)
+        confirmed_count = len(confirmed_reservations)
 
-        for reservation in pending_reservations:
-            pet = Pet.objects.filter(user_id=user_id, name=reservation.pet_name).values('breed', 'size').first()
-            pet_breed = pet['breed'] if pet else None
+        # 一次解析所有預約的顧客與寵物資料
+        resolver = CustomerPetResolver(pending_reservations + confirmed_reservations)
 
-            pending_reservations_data.append({
-                'reservation_id': reservation.reservation_id,
-                'user_name': reservation.user_name,
-                'user_phone': reservation.user_phone,
-                'pet_name': reservation.pet_name,
-                'pet_breed': pet_breed,
-                'pick_up_service': reservation.pick_up_service,
-                'checkin_date': reservation.checkin_date.date(),
-                'status': reservation.status,
-            })
+        confirmed_reservations_data = [
+            self.create_reservation_dict(reservation, resolver) for reservation in confirmed_reservations
+        ]
+        pending_reservations_data = [
+            self.create_reservation_dict(reservation, resolver) for reservation in pending_reservations
+        ]
 
         return Response({
             'store_name': store_name,
@@ -482,7 +489,7 @@ class BoardingReservationDetailsViewSet(viewsets.ViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            current_reservation = ReservationBoarding.objects.filter(
+            current_reservation = ReservationBoarding.objects.select_related('pet_id').filter(
                 reservation_id=reservation_id,
                 status='confirmed'
             ).first()
@@ -496,11 +503,8 @@ class BoardingReservationDetailsViewSet(viewsets.ViewSet):
             user_name = current_reservation.user_name
             user_phone = current_reservation.user_phone
 
-            user_id = CustomersProfile.objects.filter(full_name=user_name, phone=user_phone).first().user_id.user_id
-
-            pet = Pet.objects.filter(user_id=user_id, name=current_reservation.pet_name).values('breed', 'size').first()
+            pet = CustomerPetResolver([current_reservation]).pet(current_reservation)
             pet_name = current_reservation.pet_name
-            print(pet)
             pet_breed = pet['breed'] if pet else None
             pet_size = pet['size'] if pet else None
             checkin_date = current_reservation.checkin_date.date()
@@ -550,10 +554,10 @@ class BoardingReservationDetailsViewSet(viewsets.ViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
 
-class BoardingPendingReservationViewSet(viewsets.ViewSet):
+class BoardingPendingReservationViewSet(viewsets.GenericViewSet):
     """待審核預約"""
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = ReservationPagination
     
     def list(self, request, *args, **kwargs):
         store_id = request.user.user_id
@@ -566,17 +570,18 @@ class BoardingPendingReservationViewSet(viewsets.ViewSet):
         store = Store.objects.filter(user_id=store_id).first()
         store_name = store.store_name
 
-        queryset = ReservationBoarding.objects.filter(
-            store_name=store_name,
+        queryset = store_reservations(ReservationBoarding.objects, store).filter(
             status='pending'
-        ).order_by('-created_at')
+        ).select_related('pet_id').order_by('-created_at')
 
         page = self.paginate_queryset(queryset)
 
         if page is not None:
             serialized_data = []
+            resolver = CustomerPetResolver(page)
             for reservation in page:
-                pet_breed = Pet.objects.filter(name=reservation.pet_name).first().breed
+                pet = resolver.pet(reservation)
+                pet_breed = pet['breed'] if pet else None
                 serialized_data.append({
                     'reservation_id': reservation.reservation_id,
                     'user_name': reservation.user_name,
@@ -591,7 +596,7 @@ class BoardingPendingReservationViewSet(viewsets.ViewSet):
             return self.get_paginated_response({
                 'store_name': store_name,
                 'reservations': serialized_data,
-                'total_count': queryset.count()
+                'total_count': self.paginator.total_count
             })
         
         return Response({
@@ -604,7 +609,7 @@ class BoardingPendingReservationViewSet(viewsets.ViewSet):
 class BoardingUpcomingReservationViewSet(viewsets.ReadOnlyModelViewSet):
     """近期預約"""
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = ReservationPagination
     
     def list(self, request, *args, **kwargs):
         store_id = request.user.user_id
@@ -616,16 +621,17 @@ class BoardingUpcomingReservationViewSet(viewsets.ReadOnlyModelViewSet):
         store = Store.objects.filter(user_id=store_id).first()
         store_name = store.store_name
 
-        queryset = ReservationBoarding.objects.filter(
-                store_name=store_name,
-                status='confirmed'
-            ).order_by('checkin_date')
+        queryset = store_reservations(ReservationBoarding.objects, store).filter(
+            status='confirmed'
+        ).select_related('pet_id').order_by('checkin_date')
         page = self.paginate_queryset(queryset)
 
         if page is not None:
             serialized_data = []
+            resolver = CustomerPetResolver(page)
             for reservation in page:
-                pet_breed = Pet.objects.filter(name=reservation.pet_name).first().breed
+                pet = resolver.pet(reservation)
+                pet_breed = pet['breed'] if pet else None
                 serialized_data.append({
                     'reservation_id': reservation.reservation_id,
                     'user_name': reservation.user_name,
@@ -640,7 +646,7 @@ class BoardingUpcomingReservationViewSet(viewsets.ReadOnlyModelViewSet):
             return self.get_paginated_response({
                 'store_name': store_name,
                 'reservations': serialized_data,
-                'total_count': queryset.count()
+                'total_count': self.paginator.total_count
             })
         
         return Response({
@@ -658,18 +664,15 @@ class BoardingPendingReservationDetailViewSet(viewsets.ViewSet):
         '''根據 reservation_id 取得待審核預約的詳細資訊'''
         try:
             reservation_id = request.query_params.get('reservation_id')
-            reservation = ReservationBoarding.objects.get(
+            reservation = ReservationBoarding.objects.select_related('pet_id').get(
                 reservation_id=reservation_id,
                 status='pending'
             )
-            user_name = reservation.user_name
-            user_phone = reservation.user_phone
-            user_id = CustomersProfile.objects.filter(full_name=user_name, phone=user_phone).first().user_id.user_id
             
             # 取得寵物品種資訊
-            pet = Pet.objects.filter(user_id=user_id, name=reservation.pet_name).values('breed', 'size').first()
-            pet_breed = pet['breed']
-            pet_size = pet['size']
+            pet = CustomerPetResolver([reservation]).pet(reservation)
+            pet_breed = pet['breed'] if pet else None
+            pet_size = pet['size'] if pet else None
             
             # 計算住宿天數
             checkin_date = reservation.checkin_date.date()
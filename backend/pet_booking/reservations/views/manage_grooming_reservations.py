@@ -6,21 +6,19 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.db import transaction
 
 # app
-from pet_booking.reservations.models import ReservationGrooming, Orders
+from pet_booking.reservations.models import ReservationGrooming, GroomingSchedules, Orders
+from pet_booking.reservations.occupancy import day_start
+from pet_booking.reservations.pagination import ReservationPagination
 from pet_booking.reservations.serializers import StoreNoteUpdateSerializer, OrdersSerializer
+from pet_booking.reservations.stats import get_daily_stats, record_status_change
 from pet_booking.stores.models import Store
 from pet_booking.customers.models import CustomersProfile  
-from pet_booking.coupon.models import Coupon, CouponStatus
-
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 5
-    page_size_query_param = 'page_size'
-    max_page_size = 10
+from pet_booking.coupon.quota import store_used_coupons, use_coupon
 
 class GroomingReservationInfoViewSet(viewsets.ReadOnlyModelViewSet):
     '''顧客當日美容預約資訊'''
@@ -36,7 +34,8 @@ class GroomingReservationInfoViewSet(viewsets.ReadOnlyModelViewSet):
             store = Store.objects.get(id=store_id)
             return ReservationGrooming.objects.filter(
                 store_name=store.store_name,
-                reservation_time__date=current_date,
+                reservation_time__gte=day_start(current_date),
+                reservation_time__lt=day_start(current_date + timedelta(days=1)),
                 status='confirmed'
             )
         except Store.DoesNotExist:
@@ -58,18 +57,15 @@ class GroomingReservationInfoViewSet(viewsets.ReadOnlyModelViewSet):
         # get customer booking with confirmed status
         confirmed_reservations = ReservationGrooming.objects.filter(
             store_name=store_name,
-            reservation_time__date=current_date,
+            reservation_time__gte=day_start(current_date),
+            reservation_time__lt=day_start(current_date + timedelta(days=1)),
             status='confirmed'
         )
 
-        confirmed_reservations_count = confirmed_reservations.count()
-
-        # count customer booking with pending status
-        pending_reservations_count = ReservationGrooming.objects.filter(
-            store_name=store_name,
-            reservation_time__date=current_date,
-            status='pending'
-        ).count()
+        # 當日待審核與已確認筆數由每日統計取得
+        daily_stats = get_daily_stats(store.id, current_date, 'grooming')
+        confirmed_reservations_count = daily_stats.confirmed
+        pending_reservations_count = daily_stats.pending
 
         return Response({
             'store_name': store_name,
@@ -147,9 +143,11 @@ class GroomingReservationManagementViewSet(viewsets.ViewSet):
                 status='pending'
             )
             
-            reservation.status = 'confirmed'
-            reservation.store_note = store_note
-            reservation.save()
+            with transaction.atomic():
+                reservation.status = 'confirmed'
+                reservation.store_note = store_note
+                reservation.save()
+                record_status_change(reservation, 'pending', 'confirmed')
 
             response_data = {
                 'message': 'Reservation confirmed successfully',
@@ -182,8 +180,12 @@ class GroomingReservationManagementViewSet(viewsets.ViewSet):
                 status='pending'
             )
             
-            reservation.status = 'cancelled'
-            reservation.save()
+            # 取消後釋放佔用的時段
+            with transaction.atomic():
+                reservation.status = 'cancelled'
+                reservation.save()
+                GroomingSchedules.objects.filter(reservation_grooming_id=reservation).delete()
+                record_status_change(reservation, 'pending', 'cancelled')
 
             return Response({
                 'message': 'Reservation cancelled successfully',
@@ -213,8 +215,12 @@ class GroomingReservationManagementViewSet(viewsets.ViewSet):
                 status='confirmed'
             )
             
-            reservation.status = 'cancelled'
-            reservation.save()
+            # 取消後釋放佔用的時段
+            with transaction.atomic():
+                reservation.status = 'cancelled'
+                reservation.save()
+                GroomingSchedules.objects.filter(reservation_grooming_id=reservation).delete()
+                record_status_change(reservation, 'confirmed', 'cancelled')
 
             return Response({
                 'message': 'Confirmed reservation cancelled successfully',
@@ -239,18 +245,21 @@ class GroomingReservationManagementViewSet(viewsets.ViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            reservation = ReservationGrooming.objects.get(
+            reservation = ReservationGrooming.objects.select_related('store_id').get(
                 reservation_id=reservation_id,
                 status='confirmed'
             )
             
-            # 根據 user_name 和 user_phone 查找 user_id
+            # 預約已關聯會員時直接使用，舊資料才以 user_name 和 user_phone 查找 user_id
             try:
-                customer_profile = CustomersProfile.objects.get(
-                    full_name=reservation.user_name,
-                    phone=reservation.user_phone
-                )
-                user_id = customer_profile.user_id
+                if reservation.user_id_id:
+                    user_id = reservation.user_id_id
+                else:
+                    customer_profile = CustomersProfile.objects.get(
+                        full_name=reservation.user_name,
+                        phone=reservation.user_phone
+                    )
+                    user_id = customer_profile.user_id
 
             except CustomersProfile.DoesNotExist:
                 return Response({
@@ -280,27 +289,22 @@ class GroomingReservationManagementViewSet(viewsets.ViewSet):
                     'details': order_serializer.errors
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            reservation.status = 'finished'
-            reservation.save()
-            order = order_serializer.save()
+            with transaction.atomic():
+                reservation.status = 'finished'
+                reservation.save()
+                order = order_serializer.save()
+                record_status_change(reservation, 'confirmed', 'finished')
 
             # 處理優惠券：根據 reservation_id 找到對應的優惠券並更新狀態
             try:
-                coupon = Coupon.objects.get(reservation_id=reservation_id)
-                coupon.status = CouponStatus.USED
-                coupon.order_id = str(order.id)
-                coupon.save()
-            except Coupon.DoesNotExist:
-                pass
+                use_coupon(reservation_id, str(order.id))
             except Exception as coupon_error:
                 print(f"優惠券處理錯誤: {coupon_error}")
 
             try:
-                store = Store.objects.get(store_name=reservation.store_name)
-                used_coupons_count = Coupon.objects.filter(
-                    store_id=store.id,
-                    status=CouponStatus.USED
-                ).count()
+                store = reservation.store_id or Store.objects.get(store_name=reservation.store_name)
+                # 優惠券的 store_id 記錄的是店家的 user_id
+                used_coupons_count = store_used_coupons(store.user_id_id)
                 used_coupons_total_revenue = 50 * int(used_coupons_count)
             except Store.DoesNotExist:
                 used_coupons_count = 0
@@ -517,7 +521,7 @@ class GroomingReservationDetailsViewSet(viewsets.ViewSet):
 class PendingReservationViewSet(viewsets.ReadOnlyModelViewSet):
     """待審核預約"""
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = ReservationPagination
     
     def get_queryset(self):
         store_id = self.request.query_params.get('store_id')
@@ -583,7 +587,7 @@ class PendingReservationViewSet(viewsets.ReadOnlyModelViewSet):
             return self.get_paginated_response({
                 'store_name': store_name,
                 'reservations': serialized_data,
-                'total_count': queryset.count()
+                'total_count': self.paginator.total_count
             })
         
         return Response({
@@ -596,7 +600,7 @@ class PendingReservationViewSet(viewsets.ReadOnlyModelViewSet):
 class UpcomingReservationViewSet(viewsets.ReadOnlyModelViewSet):
     """近期預約"""
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = ReservationPagination
     
     def get_queryset(self):
         store_id = self.request.query_params.get('store_id')
@@ -659,7 +663,7 @@ class UpcomingReservationViewSet(viewsets.ReadOnlyModelViewSet):
             return self.get_paginated_response({
                 'store_name': store_name,
                 'reservations': serialized_data,
-                'total_count': queryset.count()
+                'total_count': self.paginator.total_count
             })
         
         return Response({
@@ -6,21 +6,30 @@ from rest_framework import viewsets, status
 from rest_framework import serializers
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404
 
 # app
 from ..models import ReservationGrooming, ReservationBoarding, Orders
+from ..pagination import ReservationPagination
 from ..serializers import ReservationGroomingSerializer, ReservationBoardingSerializer
 from ...stores.models import Store
 from ...customers.models import Pet
 
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 5
-    page_size_query_param = 'page_size'
-    max_page_size = 10
+def get_boarding_pet_info(reservation):
+    """住宿預約寵物的 (breed, size)：優先使用 pet_id 外鍵，舊資料透過 Orders 的 user_id 查詢"""
+    if reservation.pet_id_id is not None:
+        return reservation.pet_id.breed, reservation.pet_id.size
+
+    order = Orders.objects.filter(reservation_boarding=reservation).first()
+    if not order:
+        return None, None
+    pet = Pet.objects.filter(user_id=order.user_id, name=reservation.pet_name).values('breed', 'size').first()
+    if not pet:
+        return None, None
+    return pet['breed'], pet['size']
+
 
 class GroomingHistoryViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -33,7 +42,7 @@ class GroomingHistoryViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = ReservationGroomingSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = ReservationPagination
 
     def get_queryset(self):
         """
@@ -107,7 +116,7 @@ class BoardingHistoryViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = ReservationBoardingSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = ReservationPagination
 
     def get_queryset(self):
         """
@@ -292,23 +301,13 @@ class ReservationDetailsViewSet(viewsets.ViewSet):
 
         elif reservation_id[:2] == 'BD':
             try:
-                current_reservation = ReservationBoarding.objects.get(
+                current_reservation = ReservationBoarding.objects.select_related('pet_id').get(
                     reservation_id=reservation_id,
                     status='finished'
                 )
 
-                # 透過 Orders 模型來取得 user_id
-                order = Orders.objects.filter(reservation_boarding=current_reservation).first()
-                user_id = order.user_id
-                
                 # 取得寵物品種和尺寸資訊
-                pet = None
-                pet_breed = None
-                pet_size = None
-                if user_id:
-                    pet = Pet.objects.filter(user_id=user_id, name=current_reservation.pet_name).values('breed', 'size').first()
-                    pet_breed = pet['breed'] if pet else None
-                    pet_size = pet['size'] if pet else None
+                pet_breed, pet_size = get_boarding_pet_info(current_reservation)
                 
                 checkin_date = current_reservation.checkin_date.date()
                 checkout_date = current_reservation.checkout_date.date()
@@ -392,16 +391,8 @@ class CustomerObservationViewSet(viewsets.ViewSet):
         # 處理寄宿預約
         elif reservation_id[:2] == 'BD':
             try:
-                reservation = ReservationBoarding.objects.get(reservation_id=reservation_id)
-                order = Orders.objects.filter(reservation_boarding=reservation).first()
-                user_id = order.user_id if order else None
-                
-                pet_breed = None
-                pet_size = None
-                if user_id:
-                    pet = Pet.objects.filter(user_id=user_id, name=reservation.pet_name).values('breed', 'size').first()
-                    pet_breed = pet['breed'] if pet else None
-                    pet_size = pet['size'] if pet else None
+                reservation = ReservationBoarding.objects.select_related('pet_id').get(reservation_id=reservation_id)
+                pet_breed, pet_size = get_boarding_pet_info(reservation)
                 
                 customer_info = {
                     'reservation_id': reservation.reservation_id,
@@ -465,16 +456,8 @@ class CustomerObservationViewSet(viewsets.ViewSet):
         # 處理寄宿預約
         elif reservation_id[:2] == 'BD':
             try:
-                reservation = ReservationBoarding.objects.get(reservation_id=reservation_id)
-                order = Orders.objects.filter(reservation_boarding=reservation).first()
-                user_id = order.user_id if order else None
-                
-                pet_breed = None
-                pet_size = None
-                if user_id:
-                    pet = Pet.objects.filter(user_id=user_id, name=reservation.pet_name).values('breed', 'size').first()
-                    pet_breed = pet['breed'] if pet else None
-                    pet_size = pet['size'] if pet else None
+                reservation = ReservationBoarding.objects.select_related('pet_id').get(reservation_id=reservation_id)
+                pet_breed, pet_size = get_boarding_pet_info(reservation)
                 
                 customer_info = {
                     'reservation_id': reservation.reservation_id,
@@ -6,22 +6,16 @@ from rest_framework import viewsets, status
 from rest_framework import serializers
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
 from django.shortcuts import get_object_or_404
 
 # app
 from ..models import ReservationGrooming, ReservationBoarding
+from ..pagination import ReservationPagination
 from ..serializers import ReservationGroomingSerializer, ReservationBoardingSerializer
 from ...stores.models import Store
 from ...customers.models import Pet
 
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 5
-    page_size_query_param = 'page_size'
-    max_page_size = 10
-
-
 class RiskGroomingViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for managing risk grooming reservation history.
@@ -33,7 +27,7 @@ class RiskGroomingViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = ReservationGroomingSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = ReservationPagination
 
     def get_queryset(self):
         """
@@ -100,7 +94,7 @@ class RiskBoardingViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = ReservationBoardingSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = ReservationPagination
 
     def get_queryset(self):
         """
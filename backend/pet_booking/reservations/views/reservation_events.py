@@ -0,0 +1,49 @@
+# third-party
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+# app
+from pet_booking.stores.models import Store
+from ..events import stream_events
+
+
+DEFAULT_HEARTBEAT = 15
+
+
+async def get_stream_user(request):
+    """EventSource 無法自訂標頭，優先使用 session，其次接受 Authorization: Bearer"""
+    user = await request.auser()
+    if user.is_authenticated:
+        return user
+    try:
+        result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+async def reservation_event_stream(request):
+    """
+    店家預約事件串流（text/event-stream），需透過 pet_booking.asgi 執行
+    事件：reservation.created / confirmed / cancelled / finished
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    user = await get_stream_user(request)
+    if user is None:
+        return JsonResponse({'error': 'Authentication credentials were not provided'}, status=401)
+
+    store_pk = await Store.objects.filter(user_id=user).values_list('id', flat=True).afirst()
+    if store_pk is None:
+        return JsonResponse({'error': 'Store not found'}, status=404)
+
+    heartbeat = getattr(settings, 'RESERVATION_EVENT_HEARTBEAT', DEFAULT_HEARTBEAT)
+    response = StreamingHttpResponse(stream_events(store_pk, heartbeat), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # 避免反向代理緩衝事件
+    response['X-Accel-Buffering'] = 'no'
+    return response
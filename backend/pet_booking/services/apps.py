@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ServicesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "pet_booking.services"
+
+    def ready(self):
+        import pet_booking.services.signals
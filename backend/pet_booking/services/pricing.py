@@ -0,0 +1,228 @@
+# origin
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# third-party
+from django.core.cache import cache
+
+# app
+from .models import BoardingServicePricing, GroomingService
+
+
+GROOMING_PRICE_MATRIX_CACHE_KEY = 'grooming_price_matrix:v2:{store_id}'
+GROOMING_PRICE_MATRIX_TIMEOUT = 60 * 60
+BOARDING_TARIFF_CACHE_KEY = 'boarding_tariff:{store_id}'
+BOARDING_TARIFF_TIMEOUT = 60 * 60
+DURATION_UNIT_DAYS = {'day': 1, 'month': 30}
+
+
+class GroomingPriceMatrix:
+    """店家美容價目表：(species, service_title, pet_size, fur_amount) → (價格, 時長)"""
+
+    def __init__(self, store_id: str, rows: Iterable[Tuple] = ()):
+        self.store_id = store_id
+        self.service_titles: Set[str] = set()
+        self.entries: Dict[Tuple[str, str, str, str], Tuple[int, int]] = {}
+        for species, service_title, pet_size, fur_amount, pricing, grooming_duration in rows:
+            self.service_titles.add(service_title)
+            if pet_size is None:
+                continue
+            # 同物種同名服務重複設定時沿用第一筆，與原本 .first() 的行為一致
+            self.entries.setdefault(
+                (species, service_title, pet_size, fur_amount), (int(pricing), int(grooming_duration))
+            )
+
+    @classmethod
+    def build(cls, store_id: str) -> 'GroomingPriceMatrix':
+        """一次查詢（LEFT JOIN 定價）編譯店家所有美容服務的價目表，store_id 為店家的 user_id"""
+        rows = GroomingService.objects.filter(
+            store_id__user_id=store_id
+        ).order_by('id', 'groomingservicepricing__id').values_list(
+            'species',
+            'service_title',
+            'groomingservicepricing__pet_size',
+            'groomingservicepricing__fur_amount',
+            'groomingservicepricing__pricing',
+            'groomingservicepricing__grooming_duration'
+        )
+        return cls(store_id, rows)
+
+    @classmethod
+    def for_store(cls, store_id: str) -> 'GroomingPriceMatrix':
+        """取得快取的價目表，未命中時重新編譯"""
+        key = GROOMING_PRICE_MATRIX_CACHE_KEY.format(store_id=store_id)
+        matrix = cache.get(key)
+        if matrix is None:
+            matrix = cls.build(store_id)
+            cache.set(key, matrix, GROOMING_PRICE_MATRIX_TIMEOUT)
+        return matrix
+
+    @classmethod
+    def for_stores(cls, store_ids: Iterable[str]) -> Dict[str, 'GroomingPriceMatrix']:
+        """批次取得多家店家的價目表：先讀快取，未命中的店家以一次查詢一併編譯"""
+        keys = {store_id: GROOMING_PRICE_MATRIX_CACHE_KEY.format(store_id=store_id) for store_id in store_ids}
+        cached = cache.get_many(keys.values())
+        matrices = {store_id: cached[key] for store_id, key in keys.items() if key in cached}
+        missing = [store_id for store_id in keys if store_id not in matrices]
+        if missing:
+            rows_by_store: Dict[str, List[Tuple]] = {store_id: [] for store_id in missing}
+            rows = GroomingService.objects.filter(
+                store_id__user_id__in=missing
+            ).order_by('id', 'groomingservicepricing__id').values_list(
+                'store_id__user_id',
+                'species',
+                'service_title',
+                'groomingservicepricing__pet_size',
+                'groomingservicepricing__fur_amount',
+                'groomingservicepricing__pricing',
+                'groomingservicepricing__grooming_duration'
+            )
+            for store_id, *row in rows:
+                rows_by_store[store_id].append(row)
+            built = {store_id: cls(store_id, store_rows) for store_id, store_rows in rows_by_store.items()}
+            cache.set_many({keys[store_id]: matrix for store_id, matrix in built.items()}, GROOMING_PRICE_MATRIX_TIMEOUT)
+            matrices.update(built)
+        return matrices
+
+    @staticmethod
+    def invalidate(store_id: str):
+        """店家美容服務或定價異動時清除快取"""
+        cache.delete(GROOMING_PRICE_MATRIX_CACHE_KEY.format(store_id=store_id))
+
+    def has_service(self, service_title: str) -> bool:
+        return service_title in self.service_titles
+
+    def lookup(self, service_title: str, species: str, pet_size: str, fur_amount: str) -> Optional[Tuple[int, int]]:
+        """查詢單項服務的 (價格, 時長)，無對應定價時回傳 None"""
+        return self.entries.get((species, service_title, pet_size, fur_amount))
+
+    def quote(self, selected_services: List[str], species: str, pet_size: str,
+              fur_amount: str) -> Tuple[int, int, Optional[str]]:
+        """計算多項服務的 (總價格, 總時長, 錯誤訊息)"""
+        total_price = 0
+        total_duration = 0
+        for service_title in selected_services:
+            if not self.has_service(service_title):
+                return 0, 0, f'服務項目 "{service_title}" 不存在或不屬於此店家'
+            entry = self.lookup(service_title, species, pet_size, fur_amount)
+            if entry is None:
+                return 0, 0, f'找不到服務 "{service_title}" 對應此寵物類型的定價資訊'
+            total_price += entry[0]
+            total_duration += entry[1]
+        return total_price, total_duration, None
+
+
+class RoomTariff:
+    """單一房型的住宿價目
+
+    pricing 為每晚價格：住宿 n 晚時可套用 duration_in_days ≤ n 的方案（皆不適用時以最短方案計），
+    總價為「晚數 × 每晚價格」加上超時費，取最低者。
+    overtime_rate 為超時每小時加收的費用；方案勾選 overtime_charging（不加收）時不計超時費。
+    """
+
+    def __init__(self, tiers: Iterable[Dict]):
+        self.tiers = sorted(
+            (tier for tier in tiers if tier['duration_in_days'] > 0),
+            key=lambda tier: (tier['duration_in_days'], tier['pricing'])
+        )
+
+    @staticmethod
+    def overtime_rate(tier: Dict) -> int:
+        """方案的超時每小時費用，不加收或未設定時為 0"""
+        if tier.get('overtime_charging') or not tier.get('overtime_rate'):
+            return 0
+        return int(tier['overtime_rate'])
+
+    def plan(self, nights: int, overtime_hours: int = 0) -> Optional[Dict]:
+        """住宿 nights 晚（至少以 1 晚計）總價最低的方案，無任何價目時回傳 None"""
+        if not self.tiers:
+            return None
+        nights = max(1, int(nights))
+        suitable = [tier for tier in self.tiers if tier['duration_in_days'] <= nights] or self.tiers[:1]
+        best = None
+        for tier in suitable:
+            overtime_cost = overtime_hours * self.overtime_rate(tier)
+            total = nights * tier['pricing'] + overtime_cost
+            # 總價相同時沿用天數較長的方案
+            if best is None or total <= best['total_cost']:
+                best = dict(tier, overtime_hours=overtime_hours, overtime_cost=overtime_cost, total_cost=total)
+        return best
+
+    def quote(self, nights: int, overtime_hours: int = 0) -> Optional[int]:
+        """住宿 nights 晚的最低總價，無任何價目時回傳 None"""
+        best = self.plan(nights, overtime_hours)
+        return best['total_cost'] if best else None
+
+
+class BoardingTariff:
+    """店家所有住宿房型的價目，一次查詢建立並快取"""
+
+    def __init__(self, store_id: str, rows: Iterable[Tuple] = ()):
+        self.store_id = store_id
+        tiers_by_room: Dict[Tuple[str, str], List[Dict]] = {}
+        for species, room_type, duration, duration_unit, pricing, overtime_rate, overtime_charging in rows:
+            tier = {
+                'duration_in_days': int(duration) * DURATION_UNIT_DAYS.get(duration_unit, 1),
+                'duration_unit': 'day',
+                'pricing': int(pricing),
+                'overtime_charging': overtime_charging,
+                'overtime_rate': overtime_rate,
+            }
+            tiers_by_room.setdefault((species, room_type), []).append(tier)
+            # 未指定物種時合併同名房型的所有價目
+            tiers_by_room.setdefault((None, room_type), []).append(tier)
+        self.rooms: Dict[Tuple[Optional[str], str], RoomTariff] = {
+            key: RoomTariff(tiers) for key, tiers in tiers_by_room.items()
+        }
+
+    @classmethod
+    def build(cls, store_id: str) -> 'BoardingTariff':
+        """一次查詢載入店家所有住宿價目，store_id 為店家的 user_id"""
+        rows = BoardingServicePricing.objects.filter(
+            boarding_service__store_id__user_id=store_id
+        ).order_by('id').values_list(
+            'boarding_service__species',
+            'boarding_service__room_type',
+            'duration',
+            'duration_unit',
+            'pricing',
+            'overtime_rate',
+            'overtime_charging'
+        )
+        return cls(store_id, rows)
+
+    @classmethod
+    def for_store(cls, store_id: str) -> 'BoardingTariff':
+        """取得快取的住宿價目，未命中時重新建立"""
+        key = BOARDING_TARIFF_CACHE_KEY.format(store_id=store_id)
+        tariff = cache.get(key)
+        if tariff is None:
+            tariff = cls.build(store_id)
+            cache.set(key, tariff, BOARDING_TARIFF_TIMEOUT)
+        return tariff
+
+    @staticmethod
+    def invalidate(store_id: str):
+        """店家住宿服務或價目異動時清除快取"""
+        cache.delete(BOARDING_TARIFF_CACHE_KEY.format(store_id=store_id))
+
+    def room(self, room_type: str, species: Optional[str] = None) -> Optional[RoomTariff]:
+        return self.rooms.get((species, room_type))
+
+    def quote(self, room_type: str, nights: int, species: Optional[str] = None,
+              overtime_hours: int = 0) -> Optional[int]:
+        """房型住宿 nights 晚的最低總價，房型或價目不存在時回傳 None"""
+        room = self.room(room_type, species)
+        return room.quote(nights, overtime_hours) if room else None
+
+
+def overtime_hours(checkin_datetime: datetime, checkout_datetime: datetime) -> int:
+    """退房時刻晚於入住時刻的時數（不足 1 小時以 1 小時計），同日入住退房不計"""
+    nights = (checkout_datetime.date() - checkin_datetime.date()).days
+    if nights <= 0:
+        return 0
+    overtime = checkout_datetime - (checkin_datetime + timedelta(days=nights))
+    if overtime <= timedelta(0):
+        return 0
+    return math.ceil(overtime.total_seconds() / 3600)
@@ -0,0 +1,51 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from pet_booking.stores.models import Store
+from pet_booking.stores.signals import schedule_search_index_refresh, schedule_store_version_bump
+from .models import BoardingService, BoardingServicePricing, GroomingService, GroomingServicePricing
+from .pricing import BoardingTariff, GroomingPriceMatrix
+
+
+def schedule_pricing_invalidation(pricing_cache, store_id):
+    """交易提交後才清除價目快取，避免提交前被其他請求以舊資料重建"""
+    transaction.on_commit(partial(pricing_cache.invalidate, store_id))
+
+
+def bump_store_version_by_pk(store_pk):
+    store_id = Store.objects.filter(pk=store_pk).values_list('user_id', flat=True).first()
+    if store_id:
+        schedule_store_version_bump(store_id)
+    return store_id
+
+
+@receiver([post_save, post_delete], sender=GroomingService)
+@receiver([post_save, post_delete], sender=BoardingService)
+def service_changed(sender, instance, **kwargs):
+    store_id = bump_store_version_by_pk(instance.store_id_id)
+    schedule_search_index_refresh(instance.store_id_id)
+    if store_id:
+        schedule_pricing_invalidation(GroomingPriceMatrix if sender is GroomingService else BoardingTariff, store_id)
+
+
+@receiver([post_save, post_delete], sender=GroomingServicePricing)
+def grooming_pricing_changed(sender, instance, **kwargs):
+    store_id = GroomingService.objects.filter(
+        pk=instance.grooming_service_id_id
+    ).values_list('store_id__user_id', flat=True).first()
+    if store_id:
+        schedule_store_version_bump(store_id)
+        schedule_pricing_invalidation(GroomingPriceMatrix, store_id)
+
+
+@receiver([post_save, post_delete], sender=BoardingServicePricing)
+def boarding_pricing_changed(sender, instance, **kwargs):
+    store_id = BoardingService.objects.filter(
+        pk=instance.boarding_service_id
+    ).values_list('store_id__user_id', flat=True).first()
+    if store_id:
+        schedule_store_version_bump(store_id)
+        schedule_pricing_invalidation(BoardingTariff, store_id)
@@ -1,3 +1,130 @@
-from django.test import TestCase
+from datetime import datetime, time
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from pet_booking.test_fixtures import create_store
+from .models import BoardingService, BoardingServicePricing, GroomingService, GroomingServicePricing
+from .pricing import BoardingTariff, GroomingPriceMatrix, RoomTariff, overtime_hours
+from .serializers import GroomingServiceSerializer
+
+
+class GroomingPriceMatrixTestCase(TestCase):
+    """店家美容價目表快取測試"""
+
+    def setUp(self):
+        cache.clear()
+        self.store = create_store(daily_opening_time=time(9, 0), daily_closing_hours=time(18, 0))
+        self.bath = GroomingService.objects.create(store_id=self.store, species='dog', service_title='洗澡', introduction='')
+        GroomingServicePricing.objects.create(
+            grooming_service_id=self.bath, pet_size='small', fur_amount='short', pricing=500, grooming_duration=60
+        )
+        GroomingService.objects.create(store_id=self.store, species='dog', service_title='剪毛', introduction='')
+
+    def test_build_in_one_query(self):
+        with self.assertNumQueries(1):
+            matrix = GroomingPriceMatrix.build('S1')
+        self.assertEqual(matrix.lookup('洗澡', 'dog', 'small', 'short'), (500, 60))
+        self.assertTrue(matrix.has_service('剪毛'))
+        self.assertIsNone(matrix.lookup('剪毛', 'dog', 'small', 'short'))
+
+    def test_quote(self):
+        matrix = GroomingPriceMatrix.for_store('S1')
+        self.assertEqual(matrix.quote(['洗澡'], 'dog', 'small', 'short'), (500, 60, None))
+        self.assertIn('不存在', matrix.quote(['美甲'], 'dog', 'small', 'short')[2])
+        self.assertIn('定價', matrix.quote(['剪毛'], 'dog', 'small', 'short')[2])
+
+    def test_species_in_key(self):
+        cat_bath = GroomingService.objects.create(store_id=self.store, species='cat', service_title='洗澡', introduction='')
+        GroomingServicePricing.objects.create(
+            grooming_service_id=cat_bath, pet_size='small', fur_amount='short', pricing=800, grooming_duration=90
+        )
+        matrix = GroomingPriceMatrix.build('S1')
+        self.assertEqual(matrix.quote(['洗澡'], 'dog', 'small', 'short'), (500, 60, None))
+        self.assertEqual(matrix.quote(['洗澡'], 'cat', 'small', 'short'), (800, 90, None))
+        self.assertIn('定價', matrix.quote(['剪毛'], 'cat', 'small', 'short')[2])
+
+    def test_serializer_update_invalidates_cache(self):
+        GroomingPriceMatrix.for_store('S1')
+        with self.assertNumQueries(0):
+            GroomingPriceMatrix.for_store('S1')
+
+        serializer = GroomingServiceSerializer(self.bath, data={
+            'species': 'dog', 'service_title': '洗澡', 'introduction': '基本洗澡',
+            'pricings': [{'pet_size': 'small', 'fur_amount': 'short', 'pricing': 650, 'grooming_duration': 75}]
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.captureOnCommitCallbacks(execute=True):
+            serializer.save()
+
+        self.assertEqual(GroomingPriceMatrix.for_store('S1').lookup('洗澡', 'dog', 'small', 'short'), (650, 75))
+
+    def test_orm_changes_invalidate_cache(self):
+        """不經 API（例如後台或 shell）直接修改定價或刪除服務時也會清除快取"""
+        GroomingPriceMatrix.for_store('S1')
+        pricing = GroomingServicePricing.objects.get(grooming_service_id=self.bath)
+        pricing.pricing = 700
+        with self.captureOnCommitCallbacks(execute=True):
+            pricing.save()
+        self.assertEqual(GroomingPriceMatrix.for_store('S1').lookup('洗澡', 'dog', 'small', 'short'), (700, 60))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bath.delete()
+        self.assertFalse(GroomingPriceMatrix.for_store('S1').has_service('洗澡'))
+
+    def test_boarding_pricing_changes_invalidate_tariff(self):
+        service = BoardingService.objects.create(
+            store_id=self.store, species='dog', cleaning_frequency='daily', room_type='Standard', room_count=1,
+            pet_available_amount=1
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            BoardingServicePricing.objects.create(boarding_service=service, duration=1, duration_unit='day', pricing=1000)
+        self.assertEqual(BoardingTariff.for_store('S1').quote('Standard', 2, 'dog'), 2000)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BoardingServicePricing.objects.filter(boarding_service=service).get().delete()
+        self.assertIsNone(BoardingTariff.for_store('S1').quote('Standard', 2, 'dog'))
+
+
+class RoomTariffTestCase(SimpleTestCase):
+    """住宿每晚價格方案測試"""
+
+    def setUp(self):
+        self.tariff = RoomTariff([
+            {'duration_in_days': 1, 'pricing': 1000},
+            {'duration_in_days': 7, 'pricing': 900, 'overtime_rate': 100},
+            {'duration_in_days': 30, 'pricing': 800, 'overtime_charging': True, 'overtime_rate': 50},
+        ])
+
+    def test_quote_charges_nights_times_nightly_price(self):
+        self.assertEqual(self.tariff.quote(0), 1000)
+        self.assertEqual(self.tariff.quote(6), 6000)
+        self.assertEqual(self.tariff.quote(7), 6300)
+        self.assertEqual(self.tariff.quote(33), 26400)
+        self.assertEqual(self.tariff.plan(33)['duration_in_days'], 30)
+
+    def test_overtime_is_hourly_unless_waived(self):
+        plan = self.tariff.plan(7, overtime_hours=3)
+        self.assertEqual((plan['duration_in_days'], plan['overtime_cost'], plan['total_cost']), (7, 300, 6600))
+        # 月方案勾選「不加收」
+        self.assertEqual(self.tariff.quote(30, overtime_hours=3), 24000)
+
+    def test_shortest_tier_when_stay_is_shorter(self):
+        self.assertEqual(RoomTariff([{'duration_in_days': 7, 'pricing': 900}]).quote(2), 1800)
+
+    def test_overtime_hours(self):
+        self.assertEqual(overtime_hours(datetime(2030, 1, 1, 14), datetime(2030, 1, 3, 11)), 0)
+        self.assertEqual(overtime_hours(datetime(2030, 1, 1, 14), datetime(2030, 1, 3, 16, 30)), 3)
+        self.assertEqual(overtime_hours(datetime(2030, 1, 1, 9), datetime(2030, 1, 1, 18)), 0)
+
+    def test_boarding_tariff_converts_months(self):
+        tariff = BoardingTariff('S1', [
+            ('dog', 'Standard', 1, 'day', 1000, None, False),
+            ('dog', 'Standard', 1, 'month', 700, None, False),
+        ])
+        self.assertEqual(tariff.quote('Standard', 29, 'dog'), 29000)
+        self.assertEqual(tariff.quote('Standard', 30, 'dog'), 21000)
+        self.assertIsNone(tariff.quote('Suite', 3, 'dog'))
+
+    def test_empty_tariff(self):
+        self.assertIsNone(RoomTariff([]).quote(3))
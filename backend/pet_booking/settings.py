@@ -116,6 +116,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "pet_booking.wsgi.application"
+ASGI_APPLICATION = "pet_booking.asgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -127,6 +128,15 @@ DATABASES = {
     }
 }
 
+# Cache
+# 店家資料版本號、價目表與快照皆存放於此。預設的 LocMem 僅在單一程序內有效（本機開發、測試），
+# 多個 worker / 多台主機部署時需以 CACHE_URL 指定共用的快取，否則其他程序收不到失效通知，例如：
+#   CACHE_URL=rediscache://127.0.0.1:6379/1
+#   CACHE_URL=dbcache://django_cache（需先執行 python manage.py createcachetable）
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -206,4 +216,11 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:8080",  # Vue CLI 預設
 ]
 
-CORS_ALLOW_CREDENTIALS = True
\ No newline at end of file
+CORS_ALLOW_CREDENTIALS = True
+
+# 預約事件串流（SSE）的訊息代理；預設為單一程序內的 pub/sub，多個 worker 部署時需替換為跨程序的實作
+RESERVATION_EVENT_BROKER = 'pet_booking.reservations.events.InProcessBroker'
+# SSE 連線無事件時送出 keepalive 的間隔（秒）
+RESERVATION_EVENT_HEARTBEAT = 15
+# 預約編號產生器的機器編號（0 ~ 255），多台主機部署時每台需設定不同值
+RESERVATION_ID_MACHINE = env.int('RESERVATION_ID_MACHINE', default=0)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class StoresConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "pet_booking.stores"
+
+    def ready(self):
+        import pet_booking.stores.signals
@@ -0,0 +1,21 @@
+# origin
+import time
+
+# third-party
+from django.core.cache import cache
+
+
+STORE_VERSION_CACHE_KEY = 'store_version:{store_id}'
+
+
+def get_store_version(store_id: str) -> int:
+    """取得店家資料版本號，store_id 為店家的 user_id"""
+    # 初始版本以時間產生，快取被清除後不會沿用舊版本號
+    return cache.get_or_set(STORE_VERSION_CACHE_KEY.format(store_id=store_id), time.time_ns, None)
+
+
+def bump_store_version(store_id: str):
+    """店家或服務資料異動時換上新的版本號，使舊的快取內容失效"""
+    # 直接寫入新的時間值而不用 incr：不依賴快取後端的原子遞增（DatabaseCache 的 incr 為讀後寫），
+    # 版本號存於 CACHES 設定的共用快取，其他 worker 下次讀取即取得新版本
+    cache.set(STORE_VERSION_CACHE_KEY.format(store_id=store_id), time.time_ns(), None)
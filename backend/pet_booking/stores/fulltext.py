@@ -0,0 +1,168 @@
+# origin
+import math
+import re
+import unicodedata
+from collections import Counter
+from functools import partial
+from typing import Dict, List
+
+# third-party
+from django.apps import apps as global_apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+
+
+# 文件類型: (模型, 收錄條件, ((欄位, 權重), ...))
+DOCUMENTS = {
+    'store': ('Store', {'status': 'confirmed'}, (('store_name', 3), ('description', 1), ('traffic_info', 1))),
+    'post': ('Post', {'status': 'confirmed'}, (('title', 3), ('tags', 2), ('content', 1))),
+}
+DOCUMENT_COUNT_CACHE_KEY = 'fulltext_documents:{doc_type}'
+DOCUMENT_COUNT_CACHE_TIMEOUT = 300
+MAX_TERM_LENGTH = 32
+MAX_QUERY_TERMS = 32
+
+# 中日韓文字連續片段 / 英數字詞
+TOKEN_PATTERN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[0-9a-z]+')
+
+
+def text_runs(text: str) -> List[str]:
+    """全形轉半形、轉小寫後切出中文片段與英數字詞"""
+    return TOKEN_PATTERN.findall(unicodedata.normalize('NFKC', text or '').lower())
+
+
+def bigrams(run: str) -> List[str]:
+    return [run[index:index + 2] for index in range(len(run) - 1)]
+
+
+def tokenize(text: str) -> List[str]:
+    """索引用斷詞：中文取單字與相鄰二字（bigram），英數字取整個詞"""
+    terms = []
+    for run in text_runs(text):
+        if run.isascii():
+            terms.append(run[:MAX_TERM_LENGTH])
+        else:
+            terms.extend(run)
+            terms.extend(bigrams(run))
+    return terms
+
+
+def query_terms(keyword: str) -> List[str]:
+    """查詢用斷詞：中文只取 bigram（單一字才用單字），英數字取整個詞；去除重複並保留順序"""
+    terms = []
+    for run in text_runs(keyword):
+        if run.isascii():
+            terms.append(run[:MAX_TERM_LENGTH])
+        else:
+            terms.extend(bigrams(run) or [run])
+    return list(dict.fromkeys(terms))[:MAX_QUERY_TERMS]
+
+
+def field_text(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return ' '.join(str(item) for item in value)
+    return value or ''
+
+
+def document_terms(instance, fields) -> Counter:
+    """文件各詞的加權詞頻"""
+    weights = Counter()
+    for field, weight in fields:
+        for term in tokenize(field_text(getattr(instance, field))):
+            weights[term] += weight
+    return weights
+
+
+def postings(doc_type: str, instance, apps=global_apps) -> List:
+    FullTextPosting = apps.get_model('stores', 'FullTextPosting')
+    _, _, fields = DOCUMENTS[doc_type]
+    return [
+        FullTextPosting(doc_type=doc_type, doc_id=instance.pk, term=term, weight=weight)
+        for term, weight in document_terms(instance, fields).items()
+    ]
+
+
+def refresh_document(doc_type: str, doc_id: int, apps=global_apps):
+    """重新建立單一文件的倒排索引；文件不存在或不符收錄條件時只移除"""
+    FullTextPosting = apps.get_model('stores', 'FullTextPosting')
+    model_name, conditions, _ = DOCUMENTS[doc_type]
+    instance = apps.get_model('stores', model_name).objects.filter(pk=doc_id, **conditions).first()
+    with transaction.atomic():
+        FullTextPosting.objects.filter(doc_type=doc_type, doc_id=doc_id).delete()
+        if instance is not None:
+            FullTextPosting.objects.bulk_create(postings(doc_type, instance, apps))
+
+
+def schedule_document_refresh(doc_type: str, doc_id: int):
+    transaction.on_commit(partial(refresh_document, doc_type, doc_id))
+
+
+def remove_document(doc_type: str, doc_id: int):
+    global_apps.get_model('stores', 'FullTextPosting').objects.filter(doc_type=doc_type, doc_id=doc_id).delete()
+
+
+def rebuild_fulltext_index(apps=global_apps) -> Dict[str, int]:
+    """清空並重建全部文件的倒排索引，回傳各類型收錄的文件數"""
+    FullTextPosting = apps.get_model('stores', 'FullTextPosting')
+    counts = {}
+    with transaction.atomic():
+        FullTextPosting.objects.all().delete()
+        for doc_type, (model_name, conditions, _) in DOCUMENTS.items():
+            counts[doc_type] = 0
+            batch = []
+            for instance in apps.get_model('stores', model_name).objects.filter(**conditions).iterator():
+                batch.extend(postings(doc_type, instance, apps))
+                counts[doc_type] += 1
+                if len(batch) >= 1000:
+                    FullTextPosting.objects.bulk_create(batch)
+                    batch = []
+            FullTextPosting.objects.bulk_create(batch)
+            cache.delete(DOCUMENT_COUNT_CACHE_KEY.format(doc_type=doc_type))
+    return counts
+
+
+def document_count(doc_type: str) -> int:
+    """已索引的文件數（計算 idf 用），短暫快取避免每次搜尋都計數"""
+    FullTextPosting = global_apps.get_model('stores', 'FullTextPosting')
+    return cache.get_or_set(
+        DOCUMENT_COUNT_CACHE_KEY.format(doc_type=doc_type),
+        lambda: FullTextPosting.objects.filter(doc_type=doc_type).values('doc_id').distinct().count(),
+        DOCUMENT_COUNT_CACHE_TIMEOUT
+    )
+
+
+def search_documents(doc_type: str, keyword: str, queryset=None):
+    """
+    以倒排索引搜尋文件，回傳依相關度排序的 values queryset（doc_id, matched, score），可直接分頁
+    排序：命中的查詢詞數 → Σ 加權詞頻 × idf → 較新的文件；queryset 用於套用額外篩選條件
+    """
+    FullTextPosting = global_apps.get_model('stores', 'FullTextPosting')
+    terms = query_terms(keyword)
+    matches = FullTextPosting.objects.filter(doc_type=doc_type, term__in=terms)
+    frequencies = dict(matches.values_list('term').annotate(df=Count('id')).order_by())
+    if not frequencies:
+        return matches.none().values('doc_id')
+
+    total = max(document_count(doc_type), max(frequencies.values()))
+    idf = Case(
+        *[When(term=term, then=Value(math.log(1 + total / df))) for term, df in frequencies.items()],
+        output_field=FloatField()
+    )
+    if queryset is not None:
+        matches = matches.filter(doc_id__in=queryset.values('pk'))
+    return matches.values('doc_id').annotate(
+        matched=Count('id'), score=Sum(F('weight') * idf, output_field=FloatField())
+    ).order_by('-matched', '-score', '-doc_id')
+
+
+def ranked_instances(page, queryset) -> List:
+    """將一頁搜尋結果轉回模型物件（維持排序），並附上相關度分數"""
+    instances = queryset.in_bulk([hit['doc_id'] for hit in page])
+    results = []
+    for hit in page:
+        instance = instances.get(hit['doc_id'])
+        if instance is not None:
+            instance.search_score = round(hit['score'], 4)
+            results.append(instance)
+    return results
@@ -0,0 +1,105 @@
+# origin
+import csv
+import math
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'taiwan_districts.csv'
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 6
+EARTH_RADIUS_KM = 6371.0
+# 鄰近查詢最多展開的 geohash 格數，決定可用的最細精度
+MAX_COVER_CELLS = 16
+MAX_RADIUS_KM = 50
+
+
+def normalize_county(county: str) -> str:
+    """地址常見「台」寫法統一為「臺」"""
+    return (county or '').strip().replace('台', '臺')
+
+
+@lru_cache(maxsize=1)
+def gazetteer() -> Dict[Tuple[str, str], Tuple[float, float]]:
+    """離線鄉鎮市區座標表（各區約略中心點）：{(縣市, 鄉鎮市區): (緯度, 經度)}"""
+    with GAZETTEER_PATH.open(encoding='utf-8') as file:
+        return {
+            (row['county'], row['district']): (float(row['latitude']), float(row['longitude']))
+            for row in csv.DictReader(file)
+        }
+
+
+def locate(county: str, district: str) -> Optional[Tuple[float, float]]:
+    return gazetteer().get((normalize_county(county), (district or '').strip()))
+
+
+def locate_address(address) -> Optional[Tuple[float, float]]:
+    """由店家地址 JSON 的 county / district 取得座標，查無時回傳 None"""
+    if not isinstance(address, dict):
+        return None
+    return locate(address.get('county'), address.get('district'))
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        target, span = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (span[0] + span[1]) / 2
+        value <<= 1
+        if target >= middle:
+            value |= 1
+            span[0] = middle
+        else:
+            span[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """geohash 單格的 (緯度, 經度) 度數"""
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def distance_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Haversine 球面距離"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi, d_lambda = phi2 - phi1, math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def covering_cells(latitude: float, longitude: float, radius_km: float) -> List[str]:
+    """
+    涵蓋以 (latitude, longitude) 為圓心、radius_km 為半徑範圍外接矩形的 geohash 前綴
+    從最細精度往粗找，取展開格數不超過 MAX_COVER_CELLS 的最細精度，查詢範圍固定有上限
+    """
+    d_lat = radius_km / 111.32
+    d_lng = radius_km / (111.32 * max(math.cos(math.radians(latitude)), 0.01))
+    south, north = latitude - d_lat, latitude + d_lat
+    west, east = longitude - d_lng, longitude + d_lng
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lng_step = cell_size(precision)
+        rows = math.floor(north / lat_step) - math.floor(south / lat_step) + 1
+        cols = math.floor(east / lng_step) - math.floor(west / lng_step) + 1
+        if rows * cols <= MAX_COVER_CELLS:
+            break
+
+    cells = []
+    for row in range(rows):
+        lat = min(south + row * lat_step, north)
+        for col in range(cols):
+            lng = min(west + col * lng_step, east)
+            cells.append(encode_geohash(lat, lng, precision))
+    # 保險起見補上四個角落，避免浮點誤差使邊界格被略過
+    for lat in (south, north):
+        for lng in (west, east):
+            cells.append(encode_geohash(lat, lng, precision))
+    return sorted(set(cells))
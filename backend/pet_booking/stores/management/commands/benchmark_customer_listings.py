@@ -0,0 +1,185 @@
+# origin
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+from wsgiref.util import setup_testing_defaults
+
+# third-party
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+# app
+from pet_booking.stores.models import Post, Store
+from pet_booking.users.models import User
+
+
+ENDPOINTS = {
+    'store': '/api/customer/store',
+    'post': '/api/customer/post',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        '比較顧客端店家/貼文列表分別由 WSGI 與 ASGI application 提供時的併發表現；'
+        '於測試資料庫建立假資料，在相同 worker 數下逐一提高同時連線數，輸出 req/s 與 p50/p95 延遲'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='store')
+        parser.add_argument('--workers', type=int, default=4, help='WSGI 執行緒數 / ASGI event loop 數')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 64], help='同時連線數')
+        parser.add_argument('--requests', type=int, default=200, help='每個併發等級的請求數')
+        parser.add_argument('--stores', type=int, default=100, help='建立的店家數（每家 3 篇貼文）')
+        parser.add_argument('--query', default='', help='附加的查詢字串，例如 type=news')
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.seed(options['stores'])
+            with override_settings(DEBUG=False, ALLOWED_HOSTS=['localhost']):
+                self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def seed(self, count: int):
+        users = User.objects.bulk_create(
+            User(username=f'store{index}', role='store', user_id=f'S{index}') for index in range(1, count + 1)
+        )
+        stores = Store.objects.bulk_create(
+            Store(
+                user_id=user, store_name=f'Store {user.user_id}', owner_name='Owner', email=f'{user.username}@example.com',
+                phone='0912345678', address={'county': '臺北市', 'district': '大安區', 'detail': ''}, status='confirmed',
+                grooming_service=True, service_item=['洗澡', '美容'], description='寵物美容與住宿'
+            )
+            for user in users
+        )
+        Post.objects.bulk_create(
+            Post(store=store, title=f'{store.store_name} 最新消息 {index}', content='本月優惠', type='news',
+                 status='confirmed', tags=['優惠'])
+            for store in stores for index in range(3)
+        )
+
+    def run(self, options):
+        from pet_booking.asgi import application as asgi_application
+        from pet_booking.wsgi import application as wsgi_application
+
+        path = ENDPOINTS[options['endpoint']]
+        query = options['query']
+        workers = options['workers']
+        total = options['requests']
+
+        self.stdout.write(f'endpoint={options["endpoint"]} workers={workers} requests={total} query={query!r}')
+        self.stdout.write(f'{"server":<6} {"conc":>5} {"req/s":>9} {"p50 ms":>8} {"p95 ms":>8} {"errors":>6}')
+        for concurrency in options['concurrency']:
+            rows = [
+                ('wsgi', self.bench_wsgi(wsgi_application, path, query, workers, concurrency, total)),
+                ('asgi', self.bench_asgi(asgi_application, path, query, workers, concurrency, total)),
+            ]
+            for server, (elapsed, latencies, errors) in rows:
+                self.stdout.write(
+                    f'{server:<6} {concurrency:>5} {total / elapsed:>9.1f} '
+                    f'{percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} {errors:>6}'
+                )
+
+    def bench_wsgi(self, application, path, query, workers, concurrency, total):
+        """同步 worker 一次只處理一個請求：同時連線數超過 worker 數時在佇列中等候，延遲含排隊時間"""
+        def request() -> int:
+            environ = {'PATH_INFO': path, 'QUERY_STRING': query, 'HTTP_HOST': 'localhost', 'SERVER_NAME': 'localhost'}
+            setup_testing_defaults(environ)
+            status = []
+            body = application(environ, lambda code, headers, exc_info=None: status.append(code))
+            try:
+                for _ in body:
+                    pass
+            finally:
+                body.close()
+            return int(status[0].split()[0])
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return measure(lambda send: pool.submit(send).result(), request, concurrency, total)
+
+    def bench_asgi(self, application, path, query, workers, concurrency, total):
+        """
+        每個 worker 一個 event loop，同時連線平均分配到各 worker（連線數少於 worker 數時只啟用部分 worker）
+        同步 ViewSet 由 Django 的 ASGIHandler 以 sync_to_async 執行
+        """
+        async def request() -> int:
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+                'path': path, 'raw_path': path.encode(), 'query_string': query.encode(), 'root_path': '',
+                'headers': [(b'host', b'localhost')], 'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+            }
+            messages = iter([{'type': 'http.request', 'body': b'', 'more_body': False}])
+            status = []
+
+            async def receive():
+                message = next(messages, None)
+                if message is None:
+                    # 連線保持開啟，直到回應結束由 Django 取消
+                    await asyncio.Event().wait()
+                return message
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+
+            await application(scope, receive, send)
+            return status[0]
+
+        async def worker(share: int, slots: int) -> Tuple[List[float], int]:
+            semaphore = asyncio.Semaphore(slots)
+            latencies, errors = [], 0
+
+            async def one():
+                nonlocal errors
+                async with semaphore:
+                    start = time.perf_counter()
+                    if await request() != 200:
+                        errors += 1
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+            await asyncio.gather(*(one() for _ in range(share)))
+            return latencies, errors
+
+        active = min(workers, concurrency)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=active) as pool:
+            results = list(pool.map(
+                lambda args: asyncio.run(worker(*args)), zip(split(total, active), split(concurrency, active))
+            ))
+        elapsed = time.perf_counter() - start
+        latencies = [latency for worker_latencies, _ in results for latency in worker_latencies]
+        return elapsed, latencies, sum(errors for _, errors in results)
+
+
+def measure(dispatch: Callable, request: Callable, concurrency: int, total: int):
+    """以 concurrency 個客戶端各自循序送出請求，共 total 個；回傳 (總秒數, 各請求毫秒, 錯誤數)"""
+    latencies, errors = [], 0
+
+    def client(count: int):
+        nonlocal errors
+        for _ in range(count):
+            start = time.perf_counter()
+            if dispatch(request) != 200:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        list(clients.map(client, split(total, concurrency)))
+    return time.perf_counter() - start, latencies, errors
+
+
+def split(total: int, parts: int) -> List[int]:
+    base, extra = divmod(total, parts)
+    return [base + (1 if index < extra else 0) for index in range(parts)]
+
+
+def percentile(values: List[float], percent: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[percent - 1]
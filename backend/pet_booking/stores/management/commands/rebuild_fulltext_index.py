@@ -0,0 +1,13 @@
+# third-party
+from django.core.management.base import BaseCommand
+
+# app
+from pet_booking.stores.fulltext import rebuild_fulltext_index
+
+
+class Command(BaseCommand):
+    help = '重建店家 / 貼文全文搜尋的倒排索引（fulltext_postings）'
+
+    def handle(self, *args, **options):
+        counts = rebuild_fulltext_index()
+        self.stdout.write(', '.join(f'{doc_type}: {count} documents indexed' for doc_type, count in counts.items()))
@@ -0,0 +1,13 @@
+# third-party
+from django.core.management.base import BaseCommand
+
+# app
+from pet_booking.stores.search_index import rebuild_store_search_index
+
+
+class Command(BaseCommand):
+    help = '由店家與服務資料重建顧客端店家搜尋索引（store_search_index / store_search_tokens）'
+
+    def handle(self, *args, **options):
+        count = rebuild_store_search_index()
+        self.stdout.write(f'store_search_index: {count} stores indexed')
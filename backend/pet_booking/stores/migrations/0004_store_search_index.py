@@ -0,0 +1,114 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:16
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_search_index(apps, schema_editor):
+    """
+    由已審核通過的店家與服務物種建立索引列與搜尋標記
+    邏輯複製自本 migration 建立時的 rebuild_store_search_index，只使用 apps.get_model，不隨 app 程式碼變動
+    """
+    Store = apps.get_model('stores', 'Store')
+    StoreSearchIndex = apps.get_model('stores', 'StoreSearchIndex')
+    StoreSearchToken = apps.get_model('stores', 'StoreSearchToken')
+
+    species_by_service = {}
+    for model_name in ('GroomingService', 'BoardingService'):
+        species = defaultdict(set)
+        for store_pk, value in apps.get_model('services', model_name).objects.values_list('store_id', 'species'):
+            species[store_pk].add(value)
+        species_by_service[model_name] = species
+
+    indexes, tokens = [], []
+    for store in Store.objects.filter(status='confirmed'):
+        address = store.address if isinstance(store.address, dict) else {}
+        indexes.append(StoreSearchIndex(
+            store_id=store.pk,
+            county=(address.get('county') or '')[:16], district=(address.get('district') or '')[:16],
+            grooming_service=store.grooming_service, boarding_service=store.boarding_service,
+        ))
+        grooming = species_by_service['GroomingService'][store.pk] if store.grooming_service else set()
+        boarding = species_by_service['BoardingService'][store.pk] if store.boarding_service else set()
+        store_tokens = {f'grooming:{species}' for species in grooming}
+        store_tokens |= {f'boarding:{species}' for species in boarding}
+        store_tokens |= {f'species:{species}' for species in grooming | boarding}
+        if isinstance(store.service_item, list):
+            store_tokens |= {
+                f'service:{item.strip()}'[:100] for item in store.service_item if isinstance(item, str) and item.strip()
+            }
+        tokens.extend(StoreSearchToken(store_id=store.pk, token=token) for token in store_tokens)
+
+    StoreSearchIndex.objects.bulk_create(indexes, batch_size=500)
+    StoreSearchToken.objects.bulk_create(tokens, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("stores", "0003_alter_store_user_id"),
+        ("services", "0005_alter_boardingservice_store_id_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoreSearchIndex",
+            fields=[
+                (
+                    "store",
+                    models.OneToOneField(
+                        db_column="store_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_index",
+                        serialize=False,
+                        to="stores.store",
+                    ),
+                ),
+                ("county", models.CharField(blank=True, default="", max_length=16)),
+                ("district", models.CharField(blank=True, default="", max_length=16)),
+                ("grooming_service", models.BooleanField(default=False)),
+                ("boarding_service", models.BooleanField(default=False)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "store_search_index",
+                "indexes": [
+                    models.Index(
+                        fields=["county", "district"], name="store_search_area"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="StoreSearchToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token", models.CharField(max_length=100)),
+                (
+                    "store",
+                    models.ForeignKey(
+                        db_column="store_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tokens",
+                        to="stores.storesearchindex",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "store_search_tokens",
+                "unique_together": {("token", "store")},
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:18
+
+import re
+import unicodedata
+from collections import Counter
+
+from django.db import migrations, models
+
+# 以下斷詞規則複製自 migration 當下的 stores.fulltext，避免日後程式異動影響本 migration
+DOCUMENTS = {
+    'store': ('Store', (('store_name', 3), ('description', 1), ('traffic_info', 1))),
+    'post': ('Post', (('title', 3), ('tags', 2), ('content', 1))),
+}
+MAX_TERM_LENGTH = 32
+TOKEN_PATTERN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[0-9a-z]+')
+
+
+def tokenize(text):
+    terms = []
+    for run in TOKEN_PATTERN.findall(unicodedata.normalize('NFKC', text or '').lower()):
+        if run.isascii():
+            terms.append(run[:MAX_TERM_LENGTH])
+        else:
+            terms.extend(run)
+            terms.extend(run[index:index + 2] for index in range(len(run) - 1))
+    return terms
+
+
+def build_fulltext_index(apps, schema_editor):
+    # 為既有已審核的店家與貼文建立倒排索引
+    FullTextPosting = apps.get_model('stores', 'FullTextPosting')
+    for doc_type, (model_name, fields) in DOCUMENTS.items():
+        batch = []
+        for instance in apps.get_model('stores', model_name).objects.filter(status='confirmed').iterator():
+            weights = Counter()
+            for field, weight in fields:
+                value = getattr(instance, field)
+                text = ' '.join(str(item) for item in value) if isinstance(value, (list, tuple)) else value or ''
+                for term in tokenize(text):
+                    weights[term] += weight
+            batch.extend(
+                FullTextPosting(doc_type=doc_type, doc_id=instance.pk, term=term, weight=weight)
+                for term, weight in weights.items()
+            )
+            if len(batch) >= 1000:
+                FullTextPosting.objects.bulk_create(batch)
+                batch = []
+        FullTextPosting.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("stores", "0004_store_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FullTextPosting",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "doc_type",
+                    models.CharField(
+                        choices=[("store", "Store"), ("post", "Post")], max_length=8
+                    ),
+                ),
+                ("doc_id", models.BigIntegerField()),
+                ("term", models.CharField(max_length=32)),
+                ("weight", models.IntegerField()),
+            ],
+            options={
+                "db_table": "fulltext_postings",
+                "indexes": [models.Index(fields=["doc_id"], name="fulltext_doc")],
+                "unique_together": {("doc_type", "term", "doc_id")},
+            },
+        ),
+        migrations.RunPython(build_fulltext_index, migrations.RunPython.noop),
+    ]
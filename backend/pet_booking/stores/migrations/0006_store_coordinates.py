@@ -0,0 +1,103 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:37
+
+import csv
+from pathlib import Path
+
+from django.db import migrations, models
+
+GAZETTEER_PATH = Path(__file__).resolve().parents[1] / 'data' / 'taiwan_districts.csv'
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 6
+
+
+def encode_geohash(latitude, longitude):
+    # 與建立 migration 時的 stores.geo.encode_geohash 相同
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < GEOHASH_PRECISION:
+        target, span = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (span[0] + span[1]) / 2
+        value <<= 1
+        if target >= middle:
+            value |= 1
+            span[0] = middle
+        else:
+            span[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def fill_coordinates(apps, schema_editor):
+    # 依離線鄉鎮市區座標表帶入既有店家座標，並更新 0004 已建立的搜尋索引
+    Store = apps.get_model('stores', 'Store')
+    StoreSearchIndex = apps.get_model('stores', 'StoreSearchIndex')
+    with GAZETTEER_PATH.open(encoding='utf-8') as file:
+        gazetteer = {
+            (row['county'], row['district']): (float(row['latitude']), float(row['longitude']))
+            for row in csv.DictReader(file)
+        }
+
+    located = []
+    for store in Store.objects.filter(latitude__isnull=True):
+        address = store.address if isinstance(store.address, dict) else {}
+        county = (address.get('county') or '').strip().replace('台', '臺')
+        location = gazetteer.get((county, (address.get('district') or '').strip()))
+        if location:
+            store.latitude, store.longitude = location
+            located.append(store)
+    Store.objects.bulk_update(located, ['latitude', 'longitude'], batch_size=500)
+
+    coordinates = {
+        pk: (latitude, longitude)
+        for pk, latitude, longitude in Store.objects.filter(latitude__isnull=False, longitude__isnull=False)
+        .values_list('pk', 'latitude', 'longitude')
+    }
+    indexes = list(StoreSearchIndex.objects.filter(store_id__in=coordinates))
+    for index in indexes:
+        index.latitude, index.longitude = coordinates[index.store_id]
+        index.geohash = encode_geohash(index.latitude, index.longitude)
+    StoreSearchIndex.objects.bulk_update(indexes, ['latitude', 'longitude', 'geohash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("stores", "0005_fulltext_postings"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="store",
+            name="latitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="store",
+            name="longitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="storesearchindex",
+            name="geohash",
+            field=models.CharField(blank=True, default="", max_length=12),
+        ),
+        migrations.AddField(
+            model_name="storesearchindex",
+            name="latitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="storesearchindex",
+            name="longitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="storesearchindex",
+            index=models.Index(fields=["geohash"], name="store_search_geohash"),
+        ),
+        migrations.RunPython(fill_coordinates, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,9 @@
+import copy
+
 from django.db import models
 
+from .geo import locate_address
+
 
 # Create your models here.
 class Store(models.Model):
@@ -32,7 +36,34 @@ class Store(models.Model):
     line_link = models.URLField(blank=True, null=True, max_length=200)
     facebook_link = models.URLField(blank=True, null=True, max_length=200)
     google_map_link = models.URLField(blank=True, null=True, max_length=200)
+    latitude = models.FloatField(blank=True, null=True)
+    longitude = models.FloatField(blank=True, null=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 記錄載入時的地址，save 時據以判斷地址是否變更
+        if 'address' in field_names:
+            instance._loaded_address = copy.deepcopy(instance.address)
+        return instance
+
+    def address_changed(self) -> bool:
+        # 延遲載入且未讀取 / 指定過的地址視為未變更
+        if 'address' not in self.__dict__:
+            return False
+        return self.address != getattr(self, '_loaded_address', self.address)
 
+    def save(self, *args, **kwargs):
+        # 座標為空或地址變更時，依地址的縣市 / 鄉鎮市區由離線座標表帶入；其餘保留既有（可能為手動校正的）座標
+        if self.latitude is None or self.longitude is None or self.address_changed():
+            coordinates = locate_address(self.address) or (None, None)
+            if coordinates != (self.latitude, self.longitude):
+                self.latitude, self.longitude = coordinates
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = {*kwargs['update_fields'], 'latitude', 'longitude'}
+        super().save(*args, **kwargs)
+        if 'address' in self.__dict__:
+            self._loaded_address = copy.deepcopy(self.address)
 
     def __str__(self):
         return self.store_name
@@ -60,3 +91,49 @@ class Post(models.Model):
     def __str__(self):
         return f"{self.store_id.store_name} - {self.title}"
 
+
+
+class StoreSearchIndex(models.Model):
+    """顧客端店家搜尋用的反正規化索引，只收錄已審核通過的店家，由 signals 與 rebuild_store_search_index 維護"""
+    store = models.OneToOneField(Store, on_delete=models.CASCADE, primary_key=True, db_column='store_id', related_name='search_index')
+    county = models.CharField(max_length=16, blank=True, default='')
+    district = models.CharField(max_length=16, blank=True, default='')
+    grooming_service = models.BooleanField(default=False)
+    boarding_service = models.BooleanField(default=False)
+    latitude = models.FloatField(blank=True, null=True)
+    longitude = models.FloatField(blank=True, null=True)
+    geohash = models.CharField(max_length=12, blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'store_search_index'
+        indexes = [
+            models.Index(fields=['county', 'district'], name='store_search_area'),
+            models.Index(fields=['geohash'], name='store_search_geohash'),
+        ]
+
+
+class StoreSearchToken(models.Model):
+    """店家搜尋標記：species:<物種>、grooming:<物種>、boarding:<物種>、service:<服務項目>"""
+    store = models.ForeignKey(StoreSearchIndex, on_delete=models.CASCADE, db_column='store_id', related_name='tokens')
+    token = models.CharField(max_length=100)
+
+    class Meta:
+        db_table = 'store_search_tokens'
+        unique_together = ('token', 'store')
+
+
+class FullTextPosting(models.Model):
+    """店家 / 貼文全文搜尋的倒排索引：每筆為 (文件類型, 詞, 文件 id) 與加權詞頻，由 stores/fulltext.py 維護"""
+    doc_type = models.CharField(max_length=8, choices=[('store', 'Store'), ('post', 'Post')])
+    doc_id = models.BigIntegerField()
+    term = models.CharField(max_length=32)
+    weight = models.IntegerField()
+
+    class Meta:
+        db_table = 'fulltext_postings'
+        unique_together = ('doc_type', 'term', 'doc_id')
+        indexes = [
+            # 只以 doc_id 建索引：供重建單一文件時刪除舊資料，避免搜尋時被選來做 GROUP BY 而掃描整個文件類型
+            models.Index(fields=['doc_id'], name='fulltext_doc'),
+        ]
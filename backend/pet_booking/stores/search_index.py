@@ -0,0 +1,109 @@
+# origin
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+# third-party
+from django.apps import apps as global_apps
+from django.db import transaction
+
+# app
+from .geo import encode_geohash, locate_address
+
+
+def store_tokens(store, grooming_species: Iterable[str], boarding_species: Iterable[str]) -> Set[str]:
+    """由店家資料與服務物種產生搜尋標記；未開啟的服務類型不列入"""
+    grooming_species = set(grooming_species) if store.grooming_service else set()
+    boarding_species = set(boarding_species) if store.boarding_service else set()
+    tokens = {f'grooming:{species}' for species in grooming_species}
+    tokens |= {f'boarding:{species}' for species in boarding_species}
+    tokens |= {f'species:{species}' for species in grooming_species | boarding_species}
+    if isinstance(store.service_item, list):
+        tokens |= {f'service:{item.strip()}'[:100] for item in store.service_item if isinstance(item, str) and item.strip()}
+    return tokens
+
+
+def store_area(store) -> Tuple[str, str]:
+    address = store.address if isinstance(store.address, dict) else {}
+    return (address.get('county') or '')[:16], (address.get('district') or '')[:16]
+
+
+def index_fields(store) -> Dict:
+    """索引列由店家資料衍生的欄位"""
+    county, district = store_area(store)
+    located = store.latitude is not None and store.longitude is not None
+    return {
+        'county': county, 'district': district,
+        'grooming_service': store.grooming_service, 'boarding_service': store.boarding_service,
+        'latitude': store.latitude, 'longitude': store.longitude,
+        'geohash': encode_geohash(store.latitude, store.longitude) if located else '',
+    }
+
+
+def service_species(store_pks=None, apps=global_apps) -> Tuple[Dict[int, Set[str]], Dict[int, Set[str]]]:
+    """各店家美容 / 住宿服務的物種，store_pks 為 None 時查詢全部店家"""
+    result = []
+    for model_name in ('GroomingService', 'BoardingService'):
+        queryset = apps.get_model('services', model_name).objects.all()
+        if store_pks is not None:
+            queryset = queryset.filter(store_id__in=store_pks)
+        species = defaultdict(set)
+        for store_pk, value in queryset.values_list('store_id', 'species').distinct():
+            species[store_pk].add(value)
+        result.append(species)
+    return result[0], result[1]
+
+
+def refresh_store_search_index(store_pk: int, apps=global_apps):
+    """
+    重新計算單一店家的索引列；店家不存在或未審核通過時移除
+    平時由 Store 的 post_save signal 觸發；以 QuerySet.update 修改店家（例如批次審核）不會觸發 signal，需自行呼叫
+    """
+    Store = apps.get_model('stores', 'Store')
+    StoreSearchIndex = apps.get_model('stores', 'StoreSearchIndex')
+    StoreSearchToken = apps.get_model('stores', 'StoreSearchToken')
+
+    with transaction.atomic():
+        store = Store.objects.filter(pk=store_pk, status='confirmed').first()
+        if store is None:
+            StoreSearchIndex.objects.filter(store_id=store_pk).delete()
+            return
+
+        index, _ = StoreSearchIndex.objects.update_or_create(store_id=store.pk, defaults=index_fields(store))
+        grooming, boarding = service_species([store.pk], apps)
+        tokens = store_tokens(store, grooming[store.pk], boarding[store.pk])
+        existing = set(StoreSearchToken.objects.filter(store=index).values_list('token', flat=True))
+        StoreSearchToken.objects.filter(store=index, token__in=existing - tokens).delete()
+        StoreSearchToken.objects.bulk_create(StoreSearchToken(store=index, token=token) for token in tokens - existing)
+
+
+def rebuild_store_search_index(apps=global_apps) -> int:
+    """依離線座標表補上缺少的店家座標後，清空並重建全部店家索引，回傳收錄的店家數"""
+    Store = apps.get_model('stores', 'Store')
+    StoreSearchIndex = apps.get_model('stores', 'StoreSearchIndex')
+    StoreSearchToken = apps.get_model('stores', 'StoreSearchToken')
+
+    grooming, boarding = service_species(apps=apps)
+    relocated: List = []
+    indexes: List = []
+    tokens: List = []
+    for store in Store.objects.all():
+        # 與 Store.save 相同，已有的座標（可能為手動校正）不覆寫
+        if store.latitude is None or store.longitude is None:
+            location = locate_address(store.address)
+            if location:
+                store.latitude, store.longitude = location
+                relocated.append(store)
+        if store.status != 'confirmed':
+            continue
+        indexes.append(StoreSearchIndex(store_id=store.pk, **index_fields(store)))
+        tokens.extend(
+            StoreSearchToken(store_id=store.pk, token=token)
+            for token in store_tokens(store, grooming[store.pk], boarding[store.pk])
+        )
+
+    with transaction.atomic():
+        Store.objects.bulk_update(relocated, ['latitude', 'longitude'], batch_size=500)
+        StoreSearchIndex.objects.all().delete()
+        StoreSearchIndex.objects.bulk_create(indexes, batch_size=500)
+        StoreSearchToken.objects.bulk_create(tokens, batch_size=500)
+    return len(indexes)
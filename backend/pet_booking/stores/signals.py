@@ -0,0 +1,47 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_store_version
+from .fulltext import remove_document, schedule_document_refresh
+from .models import Post, Store
+from .search_index import refresh_store_search_index
+
+
+def schedule_search_index_refresh(store_pk):
+    """交易提交後才更新搜尋索引，避免與串聯刪除中的店家互相衝突"""
+    transaction.on_commit(partial(refresh_store_search_index, store_pk))
+
+
+def schedule_store_version_bump(store_id):
+    """交易提交後才換版本號，避免提交前被其他請求以舊資料重建快取"""
+    transaction.on_commit(partial(bump_store_version, store_id))
+
+
+@receiver([post_save, post_delete], sender=Store)
+def store_changed(sender, instance, **kwargs):
+    schedule_store_version_bump(instance.user_id_id)
+
+
+@receiver(post_save, sender=Store)
+def store_saved(sender, instance, **kwargs):
+    # 刪除時索引列隨 CASCADE 移除
+    schedule_search_index_refresh(instance.pk)
+    schedule_document_refresh('store', instance.pk)
+
+
+@receiver(post_delete, sender=Store)
+def store_deleted(sender, instance, **kwargs):
+    remove_document('store', instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, **kwargs):
+    schedule_document_refresh('post', instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    remove_document('post', instance.pk)
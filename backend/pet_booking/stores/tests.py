@@ -1,3 +1,476 @@
-from django.test import TestCase
+import json
+import math
+import unittest
+from datetime import time
 
-# Create your tests here.
+from django.core.cache.backends.db import DatabaseCache
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from pet_booking.services.models import BoardingService, GroomingService
+from pet_booking.test_fixtures import api_client, create_store
+from pet_booking.users.models import User
+from .cache import STORE_VERSION_CACHE_KEY, get_store_version
+from .fulltext import rebuild_fulltext_index
+from .geo import MAX_COVER_CELLS, MAX_RADIUS_KM, covering_cells, distance_km, encode_geohash
+from .models import FullTextPosting, Post, Store, StoreSearchIndex, StoreSearchToken
+from .search_index import rebuild_store_search_index, refresh_store_search_index
+
+
+class CustomerListingTestCase(TestCase):
+    """顧客端店家/貼文列表測試"""
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_stores()
+
+    def create_stores(self):
+        for index in range(1, 4):
+            owner = User.objects.create(username=f'owner{index}', role='store', user_id=f'S{index}')
+            store = Store.objects.create(
+                user_id=owner, store_name=f'Store {index}', owner_name='Owner', email=f'store{index}@example.com',
+                phone='0912345678', address={'county': '臺北市', 'district': '大安區' if index < 3 else '信義區'},
+                status='confirmed', daily_opening_time=time(9, 0), daily_closing_hours=time(18, 0)
+            )
+            Post.objects.create(store=store, title=f'Post {index}', content='內容', type='news', status='confirmed')
+            Post.objects.create(store=store, title=f'Draft {index}', content='內容', type='news', status='pending')
+
+    def test_list_query_count_is_constant(self):
+        for url in ('/api/customer/store', '/api/customer/post'):
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as context:
+                    self.client.get(url)
+                self.assertEqual(len(context.captured_queries), 1)
+
+
+class StoreSearchIndexTestCase(TestCase):
+    """店家搜尋索引同步與篩選測試"""
+
+    def create_store(self, index, **fields):
+        owner = User.objects.create(username=f'owner{index}', role='store', user_id=f'S{index}')
+        defaults = {
+            'store_name': f'Store {index}', 'owner_name': 'Owner', 'email': f'store{index}@example.com',
+            'phone': '0912345678', 'address': {'county': '臺北市', 'district': '大安區'}, 'status': 'confirmed',
+        }
+        return Store.objects.create(user_id=owner, **{**defaults, **fields})
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.groomer = self.create_store(1, grooming_service=True, service_item=['洗澡', '美容'])
+            GroomingService.objects.create(store_id=self.groomer, species='dog', service_title='洗澡', introduction='')
+            self.boarder = self.create_store(
+                2, boarding_service=True, address={'county': '臺中市', 'district': '西屯區'}, service_item=['住宿']
+            )
+            BoardingService.objects.create(store_id=self.boarder, species='cat', cleaning_frequency='daily')
+            self.pending = self.create_store(3, status='pending', grooming_service=True)
+
+    def snapshot(self):
+        rows = StoreSearchIndex.objects.values_list('store_id', 'county', 'district', 'grooming_service', 'boarding_service')
+        tokens = StoreSearchToken.objects.values_list('store_id', 'token')
+        return sorted(rows), sorted(tokens)
+
+    def ids(self, query=''):
+        return sorted(store['id'] for store in self.client.get(f'/api/customer/store{query}').json())
+
+    def test_signals_match_rebuild(self):
+        self.assertEqual(self.snapshot()[1], sorted([
+            (self.groomer.pk, 'grooming:dog'), (self.groomer.pk, 'species:dog'),
+            (self.groomer.pk, 'service:洗澡'), (self.groomer.pk, 'service:美容'),
+            (self.boarder.pk, 'boarding:cat'), (self.boarder.pk, 'species:cat'), (self.boarder.pk, 'service:住宿'),
+        ]))
+        incremental = self.snapshot()
+        self.assertEqual(rebuild_store_search_index(), 2)
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_index_follows_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pending.status = 'confirmed'
+            self.pending.save()
+            self.groomer.address = {'county': '新北市', 'district': '板橋區'}
+            self.groomer.service_item = ['美容']
+            self.groomer.save()
+            BoardingService.objects.filter(store_id=self.boarder).get().delete()
+        self.assertEqual(StoreSearchIndex.objects.get(store=self.groomer).county, '新北市')
+        self.assertFalse(StoreSearchToken.objects.filter(token__in=['service:洗澡', 'species:cat']).exists())
+        self.assertEqual(self.ids(), sorted([self.groomer.pk, self.boarder.pk, self.pending.pk]))
+        incremental = self.snapshot()
+        rebuild_store_search_index()
+        self.assertEqual(self.snapshot(), incremental)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.boarder.delete()
+        self.assertFalse(StoreSearchIndex.objects.filter(store_id=self.boarder.pk).exists())
+
+    def test_admin_approval_indexes_store(self):
+        client = api_client(User.objects.create(username='admin', role='admin', user_id='A1'))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.patch(f'/api/admin/stores/{self.pending.pk}', {'status': 'confirmed'}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertIn(self.pending.pk, self.ids())
+
+    def test_queryset_update_requires_refresh(self):
+        """QuerySet.update 不觸發 signal，需自行呼叫 refresh_store_search_index 才會出現在列表"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Store.objects.filter(pk=self.pending.pk).update(status='confirmed')
+        self.assertNotIn(self.pending.pk, self.ids())
+        refresh_store_search_index(self.pending.pk)
+        self.assertIn(self.pending.pk, self.ids())
+
+    def test_filters(self):
+        self.assertEqual(self.ids(), sorted([self.groomer.pk, self.boarder.pk]))
+        self.assertEqual(self.ids('?county=臺中市'), [self.boarder.pk])
+        self.assertEqual(self.ids('?county=臺北市&district=大安區'), [self.groomer.pk])
+        self.assertEqual(self.ids('?service_item=美容'), [self.groomer.pk])
+        self.assertEqual(self.ids('?species=cat'), [self.boarder.pk])
+        self.assertEqual(self.ids('?species=dog&county=臺中市'), [])
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN 格式僅適用於 SQLite')
+    def test_filters_use_indexes(self):
+        for query in ('?county=臺中市&district=西屯區', '?service_item=美容'):
+            with self.subTest(query=query):
+                with CaptureQueriesContext(connection) as context:
+                    self.client.get(f'/api/customer/store{query}')
+                with connection.cursor() as cursor:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {context.captured_queries[0]["sql"]}')
+                    plan = [row[-1] for row in cursor.fetchall()]
+                self.assertFalse([detail for detail in plan if detail.startswith('SCAN')], plan)
+
+
+class FullTextSearchTestCase(TestCase):
+    """店家 / 貼文全文搜尋測試"""
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            stores = []
+            for index, (name, description, county) in enumerate([
+                ('毛孩美容沙龍', '提供洗澡與造型修剪', '臺北市'),
+                ('汪汪旅館', '寵物住宿，近捷運站', '臺中市'),
+                ('喵喵之家', '貓咪美容與住宿', '臺北市'),
+            ], start=1):
+                owner = User.objects.create(username=f'owner{index}', role='store', user_id=f'S{index}')
+                stores.append(Store.objects.create(
+                    user_id=owner, store_name=name, owner_name='Owner', email=f'store{index}@example.com',
+                    phone='0912345678', address={'county': county, 'district': ''}, status='confirmed',
+                    description=description, traffic_info='MRT 古亭站' if index == 2 else None
+                ))
+            self.salon, self.hotel, self.cattery = stores
+            self.news = Post.objects.create(
+                store=self.salon, title='夏季洗澡優惠', content='全館八折', type='news', status='confirmed', tags=['優惠']
+            )
+            self.draft = Post.objects.create(
+                store=self.hotel, title='洗澡活動', content='草稿', type='news', status='pending'
+            )
+
+    def search(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_ranked_store_search(self):
+        data = self.search('/api/customer/store/search?q=美容')
+        # 店名命中的權重高於描述
+        self.assertEqual([store['id'] for store in data['results']], [self.salon.pk, self.cattery.pk])
+        self.assertEqual(data['count'], 2)
+        self.assertGreater(data['results'][0]['score'], data['results'][1]['score'])
+
+        data = self.search('/api/customer/store/search?q=mrt')
+        self.assertEqual([store['id'] for store in data['results']], [self.hotel.pk])
+        data = self.search('/api/customer/store/search?q=住宿&county=臺北市')
+        self.assertEqual([store['id'] for store in data['results']], [self.cattery.pk])
+        data = self.search('/api/customer/store/search?q=美容&page_size=1&page=2')
+        self.assertEqual([store['id'] for store in data['results']], [self.cattery.pk])
+        self.assertEqual(self.client.get('/api/customer/store/search?q=  ').status_code, 400)
+
+    def test_post_search_follows_changes(self):
+        self.assertEqual([post['id'] for post in self.search('/api/customer/post/search?q=洗澡')['results']], [self.news.pk])
+        self.assertEqual([post['id'] for post in self.search('/api/customer/post/search?q=優惠')['results']], [self.news.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.status = 'confirmed'
+            self.draft.save()
+            self.news.title = '秋季活動'
+            self.news.save()
+        self.assertEqual([post['id'] for post in self.search('/api/customer/post/search?q=洗澡')['results']], [self.draft.pk])
+
+        self.salon.delete()
+        self.assertEqual(self.search('/api/customer/post/search?q=秋季')['results'], [])
+        self.assertEqual(self.search('/api/customer/store/search?q=沙龍')['results'], [])
+
+    def test_rebuild_matches_signals(self):
+        incremental = sorted(FullTextPosting.objects.values_list('doc_type', 'doc_id', 'term', 'weight'))
+        self.assertEqual(rebuild_fulltext_index(), {'store': 3, 'post': 1})
+        self.assertEqual(sorted(FullTextPosting.objects.values_list('doc_type', 'doc_id', 'term', 'weight')), incremental)
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN 格式僅適用於 SQLite')
+    def test_search_uses_term_index(self):
+        with CaptureQueriesContext(connection) as context:
+            self.search('/api/customer/post/search?q=洗澡優惠')
+        for query in context.captured_queries:
+            if '"term" IN' not in query['sql']:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                plan = [row[-1] for row in cursor.fetchall()]
+            # 多個查詢詞時不可改走 doc_id 索引逐文件掃描
+            self.assertTrue(any('(doc_type=? AND term=?)' in detail for detail in plan), plan)
+            self.assertFalse([detail for detail in plan if detail.startswith('SCAN fulltext_postings')], plan)
+
+
+class NearbyStoreTestCase(TestCase):
+    """附近店家查詢測試"""
+
+    def setUp(self):
+        areas = [('臺北市', '大安區'), ('臺北市', '信義區'), ('新北市', '板橋區'), ('臺中市', '西屯區'), ('臺北市', '未知區')]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.stores = []
+            for index, (county, district) in enumerate(areas, start=1):
+                owner = User.objects.create(username=f'owner{index}', role='store', user_id=f'S{index}')
+                store = Store.objects.create(
+                    user_id=owner, store_name=f'Store {index}', owner_name='Owner', email=f'store{index}@example.com',
+                    phone='0912345678', address={'county': county, 'district': district}, status='confirmed',
+                    grooming_service=True, boarding_service=index == 2
+                )
+                GroomingService.objects.create(store_id=store, species='dog', service_title='洗澡', introduction='')
+                self.stores.append(store)
+            BoardingService.objects.create(store_id=self.stores[1], species='cat', cleaning_frequency='daily')
+
+    def nearby(self, query):
+        response = self.client.get(f'/api/customer/store/nearby?{query}')
+        self.assertEqual(response.status_code, 200, response.content)
+        return [(store['id'], store['distance']) for store in response.json()['results']]
+
+    def test_coordinates_from_gazetteer(self):
+        daan, _, _, _, unknown = self.stores
+        self.assertEqual((daan.latitude, daan.longitude), (25.0264, 121.5436))
+        self.assertIsNone(unknown.latitude)
+        self.assertEqual(StoreSearchIndex.objects.get(store=daan).geohash, 'wsqqmg')
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), 'u4pruydqqvj')
+
+    def test_coordinates_kept_unless_address_changes(self):
+        daan, xinyi, _, _, unknown = self.stores
+        store = Store.objects.get(pk=daan.pk)
+        store.latitude, store.longitude = 25.0330, 121.5430
+        store.save()
+        store = Store.objects.get(pk=daan.pk)
+        store.description = '手動校正座標後修改其他欄位'
+        store.save(update_fields=['description'])
+        self.assertEqual(Store.objects.values_list('latitude', 'longitude').get(pk=daan.pk), (25.0330, 121.5430))
+
+        # 就地修改地址亦視為變更
+        store.address['district'] = '信義區'
+        store.save(update_fields=['address'])
+        self.assertEqual(
+            Store.objects.values_list('latitude', 'longitude').get(pk=daan.pk), (xinyi.latitude, xinyi.longitude)
+        )
+
+        # 座標為空時仍會補上
+        Store.objects.filter(pk=unknown.pk).update(address={'county': '臺北市', 'district': '大安區'})
+        store = Store.objects.get(pk=unknown.pk)
+        store.save(update_fields=['status'])
+        self.assertEqual(Store.objects.values_list('latitude', 'longitude').get(pk=unknown.pk), (25.0264, 121.5436))
+
+    def test_sorted_by_distance_within_radius(self):
+        daan, xinyi, banqiao, _, _ = self.stores
+        results = self.nearby('lat=25.0264&lng=121.5436&radius=5')
+        self.assertEqual([pk for pk, _ in results], [daan.pk, xinyi.pk])
+        self.assertEqual(results[0][1], 0)
+        self.assertAlmostEqual(results[1][1], 2.3, delta=0.2)
+
+        results = self.nearby('near_county=台北市&near_district=大安區&radius=10')
+        self.assertEqual([pk for pk, _ in results], [daan.pk, xinyi.pk, banqiao.pk])
+
+    def test_service_and_species_filters(self):
+        xinyi = self.stores[1]
+        results = self.nearby('lat=25.0264&lng=121.5436&radius=10&service_type=boarding&species=cat')
+        self.assertEqual([pk for pk, _ in results], [xinyi.pk])
+        self.assertEqual(self.nearby('lat=25.0264&lng=121.5436&radius=10&service_type=boarding&species=dog'), [])
+        self.assertEqual(len(self.nearby('lat=25.0264&lng=121.5436&radius=10&service_type=grooming&species=dog')), 3)
+
+    def test_invalid_origin_or_radius(self):
+        for query in ('', 'lat=25', 'lat=abc&lng=121', 'near_county=臺北市&near_district=未知區', 'lat=25&lng=121&radius=500'):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f'/api/customer/store/nearby?{query}').status_code, 400)
+
+    def test_bounded_cell_lookup(self):
+        for radius in (0.5, 5, 20, MAX_RADIUS_KM):
+            with self.subTest(radius=radius):
+                cells = covering_cells(25.0264, 121.5436, radius)
+                self.assertLessEqual(len(cells), MAX_COVER_CELLS)
+                # 範圍內任一點所在格都需被涵蓋
+                for bearing in range(0, 360, 15):
+                    lat = 25.0264 + radius / 111.32 * 0.999 * math.cos(math.radians(bearing))
+                    lng = 121.5436 + radius / 101.0 * 0.999 * math.sin(math.radians(bearing))
+                    if distance_km(25.0264, 121.5436, lat, lng) <= radius:
+                        self.assertTrue(any(encode_geohash(lat, lng).startswith(cell) for cell in cells))
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN 格式僅適用於 SQLite')
+    def test_nearby_uses_geohash_index(self):
+        with CaptureQueriesContext(connection) as context:
+            self.nearby('lat=25.0264&lng=121.5436&radius=5')
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {context.captured_queries[0]["sql"]}')
+            plan = [row[-1] for row in cursor.fetchall()]
+        self.assertFalse([detail for detail in plan if detail.startswith('SCAN')], plan)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'test_shared_cache'}
+})
+class SharedCacheStoreVersionTestCase(TestCase):
+    """共用快取後端下，店家異動需讓其他 worker 的快取一併失效"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('createcachetable', verbosity=0)
+
+    def setUp(self):
+        self.store = create_store()
+        # 另一個 worker 程序的快取連線
+        self.other_worker = DatabaseCache('test_shared_cache', {})
+        self.client = api_client(User.objects.create(username='member', role='member', user_id='M1'))
+
+    def test_version_bump_visible_to_other_workers(self):
+        key = STORE_VERSION_CACHE_KEY.format(store_id='S1')
+        version = get_store_version('S1')
+        self.assertEqual(self.other_worker.get(key), version)
+
+        self.store.store_name = 'Renamed Store'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.store.save()
+
+        self.assertNotEqual(self.other_worker.get(key), version)
+        self.assertEqual(self.other_worker.get(key), get_store_version('S1'))
+
+    def test_version_bumped_after_commit(self):
+        version = get_store_version('S1')
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.store.save()
+            # 提交前其他請求仍讀到舊版本，不會以未提交的資料重建快取
+            self.assertEqual(get_store_version('S1'), version)
+        for callback in callbacks:
+            callback()
+
+        self.assertNotEqual(get_store_version('S1'), version)
+
+    def test_snapshot_invalidated_across_save(self):
+        url = '/api/store-info/storedata2?store_id=S1&service_type=grooming'
+        self.assertEqual(self.client.get(url).data['store']['store_name'], 'Test Store')
+
+        store = Store.objects.get(pk=self.store.pk)
+        store.store_name = 'Renamed Store'
+        with self.captureOnCommitCallbacks(execute=True):
+            store.save()
+
+        self.assertEqual(self.client.get(url).data['store']['store_name'], 'Renamed Store')
+
+
+class MigrationTestCase(TransactionTestCase):
+    """由 migrate_from 的資料表狀態建立資料後執行至 migrate_to，測試資料 migration"""
+
+    migrate_from = []
+    migrate_to = []
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+
+class StoreSearchIndexMigrationTestCase(MigrationTestCase):
+    """建立搜尋索引的 migration 需由既有店家與服務建立索引"""
+
+    migrate_from = [
+        ('stores', '0003_alter_store_user_id'),
+        ('services', '0005_alter_boardingservice_store_id_and_more'),
+    ]
+    migrate_to = [('stores', '0004_store_search_index')]
+
+    def test_migration_builds_index_for_confirmed_stores(self):
+        apps = self.migrate(self.migrate_from)
+        Store = apps.get_model('stores', 'Store')
+        stores = []
+        for index, status in enumerate(('confirmed', 'pending'), start=1):
+            owner = apps.get_model('users', 'User').objects.create(
+                username=f'owner{index}', role='store', user_id=f'S{index}'
+            )
+            stores.append(Store.objects.create(
+                user_id=owner, store_name=f'Store {index}', owner_name='Owner', email=f'store{index}@example.com',
+                phone='0912345678', address={'county': '臺北市', 'district': '大安區'}, status=status,
+                grooming_service=True, service_item=['洗澡']
+            ))
+        apps.get_model('services', 'GroomingService').objects.create(
+            store_id=stores[0], species='dog', service_title='洗澡', introduction=''
+        )
+
+        apps = self.migrate(self.migrate_to)
+
+        index = apps.get_model('stores', 'StoreSearchIndex').objects.get()
+        self.assertEqual((index.pk, index.county, index.district), (stores[0].pk, '臺北市', '大安區'))
+        self.assertEqual(
+            sorted(apps.get_model('stores', 'StoreSearchToken').objects.values_list('token', flat=True)),
+            ['grooming:dog', 'service:洗澡', 'species:dog']
+        )
+
+
+class StoreCoordinatesMigrationTestCase(MigrationTestCase):
+    """帶入座標的 migration 需依鄉鎮市區座標表補上店家座標與搜尋索引的 geohash"""
+
+    migrate_from = [('stores', '0005_fulltext_postings')]
+    migrate_to = [('stores', '0006_store_coordinates')]
+
+    def test_migration_fills_coordinates(self):
+        apps = self.migrate(self.migrate_from)
+        owner = apps.get_model('users', 'User').objects.create(username='owner', role='store', user_id='S1')
+        store = apps.get_model('stores', 'Store').objects.create(
+            user_id=owner, store_name='Test Store', owner_name='Owner', email='store@example.com',
+            phone='0912345678', address={'county': '台北市 ', 'district': '大安區'}, status='confirmed'
+        )
+        apps.get_model('stores', 'StoreSearchIndex').objects.create(store_id=store.pk, county='臺北市', district='大安區')
+
+        apps = self.migrate(self.migrate_to)
+
+        store = apps.get_model('stores', 'Store').objects.get()
+        index = apps.get_model('stores', 'StoreSearchIndex').objects.get()
+        self.assertEqual((store.latitude, store.longitude), (25.0264, 121.5436))
+        self.assertEqual((index.latitude, index.longitude, index.geohash), (25.0264, 121.5436, 'wsqqmg'))
+
+
+class FullTextPostingMigrationTestCase(MigrationTestCase):
+    """建立全文索引的 migration 需為既有已審核的店家與貼文建立倒排索引"""
+
+    migrate_from = [('stores', '0004_store_search_index')]
+    migrate_to = [('stores', '0005_fulltext_postings')]
+
+    def test_migration_indexes_confirmed_documents(self):
+        apps = self.migrate(self.migrate_from)
+        Store = apps.get_model('stores', 'Store')
+        owner = apps.get_model('users', 'User').objects.create(username='owner', role='store', user_id='S1')
+        store = Store.objects.create(
+            user_id=owner, store_name='寵物 Spa', owner_name='Owner', email='store@example.com',
+            phone='0912345678', address={}, status='confirmed'
+        )
+        Post = apps.get_model('stores', 'Post')
+        post = Post.objects.create(store=store, title='美容', content='', type='news', status='confirmed', tags=['洗澡'])
+        Post.objects.create(store=store, title='住宿', content='', type='news', status='pending')
+
+        apps = self.migrate(self.migrate_to)
+
+        postings = apps.get_model('stores', 'FullTextPosting').objects.values_list('doc_type', 'doc_id', 'term', 'weight')
+        self.assertEqual(
+            sorted(postings),
+            sorted([
+                ('store', store.pk, '寵', 3), ('store', store.pk, '物', 3), ('store', store.pk, '寵物', 3),
+                ('store', store.pk, 'spa', 3),
+                ('post', post.pk, '美', 3), ('post', post.pk, '容', 3), ('post', post.pk, '美容', 3),
+                ('post', post.pk, '洗', 2), ('post', post.pk, '澡', 2), ('post', post.pk, '洗澡', 2),
+            ])
+        )
@@ -1,4 +1,6 @@
 import random
+from functools import reduce
+from operator import or_
 from django.core.mail import send_mail
 from django.core.cache import cache
 from django.contrib.auth.hashers import make_password
@@ -6,7 +8,10 @@ from rest_framework import viewsets
 from rest_framework import status
 from rest_framework.views import APIView
 from django.db import models
-from .models import Store, Post, StoreImage
+from django.db.models import Q
+from .fulltext import query_terms, ranked_instances, search_documents
+from .geo import MAX_RADIUS_KM, covering_cells, distance_km, locate
+from .models import Store, Post, StoreImage, StoreSearchToken
 from .serializers import StoreRegisterSendCodeSerializer, StoreRegisterConfirmCodeSerializer, StoreSerializer, PostSerializer, StoreImageSerializer, StoreListSerializer, StoreDetailSerializer
 from pet_booking.users.models import User, UserRole
 import django_filters
@@ -232,24 +237,58 @@ class AdminPostViewSet(viewsets.ModelViewSet):
 # 使用者
 # 使用者-店家清單
 
+# 顧客端搜尋結果（全文搜尋、附近店家）分頁
+class CustomerSearchPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+
+
+class FullTextSearchMixin:
+    """顧客端全文搜尋：GET <list>/search?q=關鍵字，依相關度排序並分頁，可與列表篩選條件併用"""
+    search_doc_type = None
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        keyword = request.query_params.get('q', '')
+        if not query_terms(keyword):
+            return Response({'msg': '請輸入搜尋關鍵字'}, status=400)
+
+        # 索引只收錄已審核通過的文件，有列表篩選條件時才需以子查詢限制範圍
+        filtered = any(request.query_params.get(name) for name in self.filterset_class.base_filters)
+        queryset = self.filter_queryset(self.get_queryset()) if filtered else None
+        paginator = CustomerSearchPagination()
+        page = paginator.paginate_queryset(search_documents(self.search_doc_type, keyword, queryset), request, view=self)
+        instances = ranked_instances(page, self.get_queryset())
+        data = self.get_serializer(instances, many=True).data
+        results = [{**item, 'score': instance.search_score} for item, instance in zip(data, instances)]
+        return paginator.get_paginated_response(results)
+
+
+# 條件皆查詢反正規化的 store_search_index / store_search_tokens，不掃描 Store 的 JSON 欄位
 class CustomerStoreFilter(django_filters.FilterSet):
-    county = django_filters.CharFilter(method='filter_county')
-    district = django_filters.CharFilter(method='filter_district')
+    service_item = django_filters.CharFilter(method='filter_token')
+    county = django_filters.CharFilter(field_name='search_index__county')
+    district = django_filters.CharFilter(field_name='search_index__district')
+    species = django_filters.ChoiceFilter(choices=[('cat', 'Cat'), ('dog', 'Dog')], method='filter_token')
+    service_type = django_filters.ChoiceFilter(
+        choices=[('grooming', 'Grooming'), ('boarding', 'Boarding')], method='filter_service_type'
+    )
 
     class Meta:
         model = Store
-        fields = ['service_item', 'county', 'district']
-        filter_overrides = {
-            models.JSONField: {
-                'filter_class': django_filters.CharFilter,
-            },
-        }
+        fields = ['service_item', 'county', 'district', 'species', 'service_type']
 
-    def filter_county(self, queryset, name, value):
-        return queryset.filter(address__county=value)
+    def filter_token(self, queryset, name, value):
+        if name == 'service_item':
+            prefix = 'service'
+        else:
+            # 同時指定服務類型時，需提供該物種的該類服務
+            prefix = self.form.cleaned_data.get('service_type') or name
+        return queryset.filter(pk__in=StoreSearchToken.objects.filter(token=f'{prefix}:{value}').values('store_id'))
 
-    def filter_district(self, queryset, name, value):
-        return queryset.filter(address__district=value)
+    def filter_service_type(self, queryset, name, value):
+        return queryset.filter(**{f'search_index__{value}_service': True})
 
 
 # class CustomerStorePagination(PageNumberPagination):
@@ -257,20 +296,71 @@ class CustomerStoreFilter(django_filters.FilterSet):
 #     page_size_query_param = 'page_size'
 #     max_page_size = 50
 
-class CustomerStoreViewSet(viewsets.ModelViewSet):
+class CustomerStoreViewSet(FullTextSearchMixin, viewsets.ModelViewSet):
     http_method_names = ['get']
     permission_classes = []
     serializer_class = StoreListSerializer
     # pagination_class = CustomerStorePagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = CustomerStoreFilter
-    queryset = Store.objects.filter(status='confirmed').order_by('-created_at')
+    search_doc_type = 'store'
+    # 搜尋索引只收錄已審核通過的店家；以 QuerySet.update 審核的店家需呼叫 refresh_store_search_index 才會列出
+    queryset = Store.objects.filter(search_index__isnull=False).select_related('user_id').order_by('-created_at')
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return StoreSerializer
         return StoreListSerializer
 
+    @action(detail=False, methods=['get'])
+    def nearby(self, request):
+        """
+        附近店家：以 lat / lng（或 near_county / near_district 的區中心）為圓心，
+        回傳 radius 公里內（預設 5，最多 50）的店家並依距離排序，可併用 service_type、species 等列表篩選條件
+        """
+        origin = self.get_origin(request)
+        if origin is None:
+            return Response({'msg': '請提供有效的座標或縣市區域'}, status=400)
+        try:
+            radius = float(request.query_params.get('radius', 5))
+        except ValueError:
+            return Response({'msg': '搜尋半徑格式錯誤'}, status=400)
+        if not 0 < radius <= MAX_RADIUS_KM:
+            return Response({'msg': f'搜尋半徑需介於 0 到 {MAX_RADIUS_KM} 公里'}, status=400)
+
+        # 只查詢涵蓋範圍內的 geohash 區間，再以實際距離過濾
+        cells = covering_cells(*origin, radius)
+        in_cells = reduce(or_, (
+            Q(search_index__geohash__gte=cell, search_index__geohash__lt=f'{cell}~') for cell in cells
+        ))
+        candidates = self.filter_queryset(self.get_queryset()).filter(in_cells).select_related('search_index')
+        stores = []
+        for store in candidates:
+            index = store.search_index
+            store.distance = distance_km(*origin, index.latitude, index.longitude)
+            if store.distance <= radius:
+                stores.append(store)
+        stores.sort(key=lambda store: store.distance)
+
+        paginator = CustomerSearchPagination()
+        page = paginator.paginate_queryset(stores, request, view=self)
+        data = self.get_serializer(page, many=True).data
+        results = [{**item, 'distance': round(store.distance, 2)} for item, store in zip(data, page)]
+        return paginator.get_paginated_response(results)
+
+    @staticmethod
+    def get_origin(request):
+        params = request.query_params
+        if 'lat' in params or 'lng' in params:
+            try:
+                latitude, longitude = float(params['lat']), float(params['lng'])
+            except (KeyError, ValueError):
+                return None
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                return None
+            return latitude, longitude
+        return locate(params.get('near_county'), params.get('near_district'))
+
 
 # class GroomingStoreViewSet(viewsets.ModelViewSet):
 #     http_method_names = ['get']
@@ -303,14 +393,15 @@ class CustomerPostFilter(django_filters.FilterSet):
 #     page_size_query_param = 'page_size'
 #     max_page_size = 50
 
-class CustomerPostViewSet(viewsets.ModelViewSet):
+class CustomerPostViewSet(FullTextSearchMixin, viewsets.ModelViewSet):
     permission_classes = []
     http_method_names = ['get']
     serializer_class = PostSerializer
     # pagination_class = CustomerPostPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = CustomerPostFilter
-    queryset = Post.objects.filter(status='confirmed').order_by('-created_at')
+    search_doc_type = 'post'
+    queryset = Post.objects.filter(status='confirmed').select_related('store').order_by('-created_at')
 
 
 
@@ -0,0 +1,25 @@
+"""測試共用資料，僅供各 app 的測試模組使用"""
+# third-party
+from rest_framework.test import APIClient
+
+# app
+from pet_booking.stores.models import Store
+from pet_booking.users.models import User
+
+
+def create_store(**fields) -> Store:
+    """店家帳號 S1 與已審核通過、位於臺北市大安區的 Test Store，其餘欄位由呼叫端指定"""
+    owner = User.objects.create(username='owner', role='store', user_id='S1')
+    defaults = {
+        'store_name': 'Test Store', 'owner_name': 'Owner', 'email': 'store@example.com', 'phone': '0912345678',
+        'address': {'county': '臺北市', 'district': '大安區', 'detail': ''}, 'status': 'confirmed',
+    }
+    return Store.objects.create(user_id=owner, **{**defaults, **fields})
+
+
+def api_client(user: User = None) -> APIClient:
+    """以指定使用者登入的 APIClient"""
+    client = APIClient()
+    if user is not None:
+        client.force_authenticate(user)
+    return client
@@ -18,6 +18,7 @@ from pet_booking.reservations.views.create_reservations import *
 from pet_booking.reservations.views.manage_grooming_reservations import *
 from pet_booking.reservations.views.manage_boarding_reservations import *
 from pet_booking.reservations.views.manage_history_reservations import *
+from pet_booking.reservations.views.reservation_events import reservation_event_stream
 from pet_booking.reservations.views.manage_risk_reservations import (
     RiskGroomingViewSet,
     RiskBoardingViewSet,
@@ -91,6 +92,7 @@ router.register(r'reservations/details', ReservationDetailsViewSet, basename='re
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path('api/reservations/events', reservation_event_stream, name='reservation_events'),
     path('api/', include(router.urls)),
     # path('api/token', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     # path('api/token/refresh', TokenRefreshView.as_view(), name='token_refresh'),
@@ -0,0 +1,89 @@
+# origin
+import os
+import threading
+from functools import partial
+from typing import Dict, Tuple
+
+# third-party
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, F, Max
+from django.db.models.functions import Cast, Substr
+
+
+DEFAULT_USER_ID_BLOCK_SIZE = 100
+
+
+def legacy_max_value(prefix: str, using: str) -> int:
+    """既有 user_id（舊版以時間戳記產生）中該前綴的最大數字"""
+    User = apps.get_model('users', 'User')
+    return User.objects.using(using).filter(user_id__regex=rf'^{prefix}[0-9]+$').annotate(
+        number=Cast(Substr('user_id', len(prefix) + 1), BigIntegerField())
+    ).aggregate(value=Max('number'))['value'] or 0
+
+
+def reserve_block(prefix: str, size: int, using: str) -> int:
+    """以條件式 UPDATE 原子地保留 [start, start + size) 並回傳 start；首次使用時由既有資料接續建立序號列"""
+    UserIdSequence = apps.get_model('users', 'UserIdSequence')
+    sequences = UserIdSequence.objects.using(using).filter(prefix=prefix)
+    with transaction.atomic(using=using):
+        if not sequences.update(next_value=F('next_value') + size):
+            try:
+                with transaction.atomic(using=using):
+                    UserIdSequence.objects.using(using).create(
+                        prefix=prefix, next_value=legacy_max_value(prefix, using) + 1
+                    )
+            except IntegrityError:
+                # 其他程序已同時建立
+                pass
+            sequences.update(next_value=F('next_value') + size)
+        return sequences.values_list('next_value', flat=True).get() - size
+
+
+class UserIdAllocator:
+    """
+    hi-lo 區段配置：每個程序向序號表一次保留 USER_ID_BLOCK_SIZE 個序號，用完才再存取資料庫
+    在交易中保留的區段要等交易提交後才放入程序快取，交易回滾時整段捨棄，不會與其他程序重複
+    """
+
+    def __init__(self, block_size: int = None):
+        self.block_size = block_size
+        self.lock = threading.Lock()
+        # 前綴: (下一個序號, 區段上限)
+        self.blocks: Dict[str, Tuple[int, int]] = {}
+
+    def get_block_size(self) -> int:
+        return self.block_size or getattr(settings, 'USER_ID_BLOCK_SIZE', DEFAULT_USER_ID_BLOCK_SIZE)
+
+    def allocate(self, prefix: str, using: str = 'default') -> str:
+        with self.lock:
+            next_value, limit = self.blocks.get(prefix, (0, 0))
+            if next_value < limit:
+                self.blocks[prefix] = (next_value + 1, limit)
+                return f'{prefix}{next_value}'
+
+        size = self.get_block_size()
+        start = reserve_block(prefix, size, using)
+        if transaction.get_connection(using).in_atomic_block:
+            transaction.on_commit(partial(self.release, prefix, start + 1, start + size), using=using)
+        else:
+            self.release(prefix, start + 1, start + size)
+        return f'{prefix}{start}'
+
+    def release(self, prefix: str, start: int, limit: int):
+        """將保留區段剩餘的序號放入程序快取；其他執行緒已補上新區段時捨棄"""
+        with self.lock:
+            next_value, current_limit = self.blocks.get(prefix, (0, 0))
+            if next_value >= current_limit:
+                self.blocks[prefix] = (start, limit)
+
+    def after_fork(self):
+        """fork 後的子程序不可沿用父程序的區段"""
+        self.lock = threading.Lock()
+        self.blocks = {}
+
+
+user_ids = UserIdAllocator()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=user_ids.after_fork)
@@ -0,0 +1,81 @@
+# origin
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Tuple
+
+# third-party
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, connection
+
+# app
+from pet_booking.users.identifiers import user_ids
+from pet_booking.users.models import User, UserIdSequence
+
+
+class Command(BaseCommand):
+    help = (
+        '多執行緒同時建立會員，比較 user_id 配置方式的吞吐量與碰撞數（不重試）；'
+        'hilo 為目前的區段配置，timestamp 為舊版「前綴 + 秒數」的寫法，allocate 只配置 user_id 不寫入會員'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scheme', choices=['hilo', 'timestamp', 'allocate'], nargs='+', default=['timestamp', 'hilo', 'allocate'])
+        parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16])
+        parser.add_argument('--users', type=int, default=4000, help='每輪建立的會員數')
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            # SQLite 記憶體資料庫的 shared cache 遇到並行寫入會直接失敗，改用暫存檔案
+            if connection.vendor == 'sqlite':
+                connection.settings_dict['TEST']['NAME'] = str(Path(directory) / 'benchmark.sqlite3')
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                self.run(options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, options):
+        self.stdout.write(f'users={options["users"]} block_size={user_ids.get_block_size()}')
+        self.stdout.write(f'{"scheme":<10} {"threads":>7} {"users/s":>9} {"created":>8} {"collisions":>10} {"blocks":>7}')
+        for scheme in options['scheme']:
+            for threads in options['threads']:
+                User.objects.all().delete()
+                UserIdSequence.objects.all().delete()
+                user_ids.blocks.clear()
+                elapsed, created, collisions = self.bench(scheme, threads, options['users'])
+                blocks = UserIdSequence.objects.filter(prefix='M').values_list('next_value', flat=True).first()
+                blocks = (blocks - 1) // user_ids.get_block_size() if blocks else 0
+                self.stdout.write(
+                    f'{scheme:<10} {threads:>7} {created / elapsed:>9.1f} {created:>8} {collisions:>10} {blocks:>7}'
+                )
+
+    def bench(self, scheme: str, threads: int, total: int) -> Tuple[float, int, int]:
+        """回傳 (總秒數, 成功建立數, 碰撞數)"""
+        def register(worker: int, count: int) -> Tuple[int, int]:
+            created = collisions = 0
+            try:
+                for index in range(count):
+                    if scheme == 'allocate':
+                        user_ids.allocate('M')
+                        created += 1
+                        continue
+                    user = User(username=f'member-{threads}-{worker}-{index}', role='member')
+                    if scheme == 'timestamp':
+                        user.user_id = f'M{int(time.time())}'
+                    try:
+                        user.save()
+                        created += 1
+                    except IntegrityError:
+                        collisions += 1
+            finally:
+                connection.close()
+            return created, collisions
+
+        shares = [total // threads + (1 if worker < total % threads else 0) for worker in range(threads)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(register, range(threads), shares))
+        elapsed = time.perf_counter() - start
+        return elapsed, sum(created for created, _ in results), sum(collisions for _, collisions in results)
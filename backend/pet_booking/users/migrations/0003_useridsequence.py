@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_userrefreshtoken"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserIdSequence",
+            fields=[
+                (
+                    "prefix",
+                    models.CharField(max_length=8, primary_key=True, serialize=False),
+                ),
+                ("next_value", models.BigIntegerField()),
+            ],
+            options={
+                "db_table": "user_id_sequences",
+            },
+        ),
+    ]
@@ -1,8 +1,8 @@
 # users/models.py
-import time
-from django.db import models
+from django.db import models, router
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
+from .identifiers import user_ids
 
 class UserRole(models.TextChoices):
     MEMBER = 'member', '一般會員'   
@@ -29,8 +29,8 @@ class User(AbstractUser):
     def save(self, *args, **kwargs):
         if not self.user_id and self.role:
             prefix = self.ROLE_PREFIX.get(self.role, 'X')
-            now_timestamp = int(time.time())
-            self.user_id = f"{prefix}{now_timestamp}"
+            # 以區段（hi-lo）配置序號，同一秒大量註冊也不會重複
+            self.user_id = user_ids.allocate(prefix, kwargs.get('using') or router.db_for_write(User, instance=self))
         super().save(*args, **kwargs)
 
     class Meta:
@@ -41,6 +41,18 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username}-{self.role}"
     
+class UserIdSequence(models.Model):
+    """各 user_id 前綴下一個可配置的序號，每次保留一個區段供單一程序使用"""
+    prefix = models.CharField(max_length=8, primary_key=True)
+    next_value = models.BigIntegerField()
+
+    class Meta:
+        db_table = 'user_id_sequences'
+
+    def __str__(self):
+        return f"{self.prefix}-{self.next_value}"
+
+
 class UserRefreshToken(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     refresh_token = models.TextField()  # 可用加密欄位加強安全
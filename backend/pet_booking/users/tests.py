@@ -1,3 +1,62 @@
-from django.test import TestCase
+import multiprocessing
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from .identifiers import UserIdAllocator, user_ids
+from .models import User, UserIdSequence
+
+
+def allocated_blocks(_):
+    """子程序：回傳繼承自父程序的區段快取"""
+    return dict(user_ids.blocks)
+
+
+class UserIdAllocationTestCase(TestCase):
+    """user_id 配置測試"""
+
+    def test_unique_ids_within_same_second(self):
+        users = [User.objects.create(username=f'member{index}', role='member') for index in range(20)]
+        store = User.objects.create(username='store', role='store')
+
+        self.assertEqual(len({user.user_id for user in users}), 20)
+        self.assertTrue(all(user.user_id.startswith('M') for user in users))
+        self.assertTrue(store.user_id.startswith('S'))
+
+    def test_continues_after_legacy_ids(self):
+        User.objects.create(username='legacy', role='member', user_id='M1760000000')
+        User.objects.create(username='other', role='member', user_id='Mabc')
+        self.assertEqual(User.objects.create(username='new', role='member').user_id, 'M1760000001')
+
+    def test_blocks_reserved_once_per_block(self):
+        allocator = UserIdAllocator(block_size=10)
+        # 交易提交後區段放入快取：每 10 個序號只存取一次序號表
+        with self.captureOnCommitCallbacks(execute=True):
+            first = allocator.allocate('M')
+        with CaptureQueriesContext(connection) as queries:
+            ids = [allocator.allocate('M') for _ in range(9)]
+        self.assertEqual(len(queries), 0)
+        self.assertEqual([int(user_id[1:]) for user_id in ids], list(range(int(first[1:]) + 1, int(first[1:]) + 10)))
+        self.assertEqual(UserIdSequence.objects.get(prefix='M').next_value, int(first[1:]) + 10)
+
+    def test_rolled_back_block_is_discarded(self):
+        allocator = UserIdAllocator(block_size=10)
+        # 交易未提交（on_commit 未執行）時不快取區段，下次重新保留
+        first = allocator.allocate('S')
+        second = allocator.allocate('S')
+        self.assertEqual(int(second[1:]), int(first[1:]) + 10)
+
+
+class UserIdForkTestCase(TransactionTestCase):
+    """fork 後子程序不沿用父程序的區段"""
+
+    def tearDown(self):
+        # 資料表已清空，不可讓其他測試沿用已提交的區段
+        user_ids.blocks.clear()
+
+    def test_child_process_drops_blocks(self):
+        User.objects.create(username='member', role='member')
+        self.assertTrue(user_ids.blocks)
+        with multiprocessing.get_context('fork').Pool(1) as pool:
+            self.assertEqual(pool.map(allocated_blocks, [None]), [{}])